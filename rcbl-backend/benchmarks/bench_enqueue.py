@@ -0,0 +1,94 @@
+"""Benchmark: enqueueing N OCR jobs one by one vs. the upload path.
+
+Enqueues N process_ocr jobs (default 1,000 — a large bulk upload) against the
+configured REDIS_URL and compares:
+
+  enqueue_job          arq's ArqRedis.enqueue_job per job (what upload_bulk
+                       used to do): one WATCH/MULTI/EXEC transaction each
+  fair_queue.submit    the upload path: one script into the company's bulk
+                       sub-queue plus one dispatch round
+  submit retry         the same call again with the same derived job IDs —
+                       a client retry; every job is skipped
+
+and prints wall time and time per job. Everything is written under a scratch
+queue name and company and deleted afterwards, but use a development Redis —
+`docker compose up redis` is enough.
+
+Run with: uv run python -m benchmarks.bench_enqueue [jobs]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from arq.constants import job_key_prefix, result_key_prefix
+
+from src.config import settings
+from src.core import fair_queue
+from src.core.queue import job_id
+
+QUEUE_NAME = "bench:arq:queue"
+TENANT = "bench-tenant"
+
+
+def _report(label: str, seconds: float, count: int) -> None:
+    print(f"{label:<20} {seconds * 1000:9.1f} ms  {seconds / count * 1e6:8.1f} µs/job")
+
+
+async def _cleanup(pool: ArqRedis, job_ids: list[str]) -> None:
+    keys = [prefix + id_ for id_ in job_ids for prefix in (job_key_prefix, result_key_prefix)]
+    for start in range(0, len(keys), 1000):
+        await pool.delete(*keys[start : start + 1000])
+    await pool.delete(
+        QUEUE_NAME,
+        fair_queue.tenant_key(TENANT, fair_queue.Priority.interactive),
+        fair_queue.tenant_key(TENANT, fair_queue.Priority.bulk),
+    )
+    await pool.lrem(fair_queue.RING_KEY, 0, TENANT)
+
+
+async def main(count: int) -> None:
+    pool = await create_pool(
+        RedisSettings.from_dsn(settings.REDIS_URL), default_queue_name=QUEUE_NAME
+    )
+    company_id = str(uuid.uuid4())
+    try:
+        print(f"{count} jobs against {settings.REDIS_URL}")
+
+        item_ids = [uuid.uuid4() for _ in range(count)]
+        start = time.perf_counter()
+        jobs = [
+            await pool.enqueue_job("process_ocr", str(item_id), company_id) for item_id in item_ids
+        ]
+        _report("enqueue_job", time.perf_counter() - start, count)
+        await _cleanup(pool, [job.job_id for job in jobs])
+
+        item_ids = [uuid.uuid4() for _ in range(count)]
+        args = [(str(item_id), company_id) for item_id in item_ids]
+        derived = [job_id("process_ocr", item_id) for item_id in item_ids]
+        for label in ("fair_queue.submit", "submit retry"):
+            start = time.perf_counter()
+            await fair_queue.submit(
+                pool,
+                TENANT,
+                "process_ocr",
+                args,
+                priority=fair_queue.Priority.bulk,
+                job_ids=derived,
+            )
+            _report(label, time.perf_counter() - start, count)
+        queued = await pool.zcard(QUEUE_NAME) + await pool.zcard(
+            fair_queue.tenant_key(TENANT, fair_queue.Priority.bulk)
+        )
+        print(f"{'':<20} {queued} jobs queued after the retry")
+        await _cleanup(pool, derived)
+    finally:
+        await pool.delete(QUEUE_NAME)
+        await pool.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,157 @@
+"""Benchmark: loading a batch's items with and without the OCR JSON column.
+
+Seeds one batch with N items whose ocr_extracted_data carries a realistic
+raw_text, then compares the ways the API reads them:
+
+  eager + OCR JSON   selectinload(items) with ocr_extracted_data undeferred
+                     (what get_batch_by_id(with_items=True) used to fetch)
+  eager, deferred    selectinload(items) with the column deferred (default now)
+  progress rows      repository.list_item_progress projection (SSE snapshot)
+
+For each it prints the median wall time over the repetitions (fresh session per
+run, so ORM hydration is included) and the bytes of column data fetched.
+
+Runs against a throwaway SQLite file, so absolute numbers are lower than over
+a network to Postgres — the ratios are the point.
+
+Run with: uv run python -m benchmarks.bench_item_loading [items] [repetitions]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+import src.modules.auth.models  # noqa: F401 — register FK targets
+from src.db.session import Base
+from src.modules.invoices import repository
+from src.modules.invoices.models import BatchStatus, ItemStatus, UploadBatch, UploadItem
+
+RAW_TEXT = json.dumps(
+    {
+        "invoice_number": "INV-2024-0001",
+        "lines": [{"description": f"Line item {i}", "amount": "120.00"} for i in range(60)],
+    }
+)
+
+
+def _value_bytes(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, dict | list):
+        return len(json.dumps(value))
+    return len(str(value))
+
+
+def _row_bytes(obj, columns) -> int:
+    return sum(_value_bytes(getattr(obj, c)) for c in columns)
+
+
+async def _seed(session_factory, items: int) -> tuple[uuid.UUID, uuid.UUID]:
+    company_id, batch_id = uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as db:
+        db.add(
+            UploadBatch(
+                id=batch_id,
+                company_id=company_id,
+                upload_type="bulk",
+                total_files=items,
+                processed_files=items,
+                successful_files=items,
+                status=BatchStatus.review_pending.value,
+            )
+        )
+        db.add_all(
+            UploadItem(
+                batch_id=batch_id,
+                company_id=company_id,
+                file_name=f"invoice-{i}.pdf",
+                file_url=f"invoices/{company_id}/{uuid.uuid4()}.pdf",
+                file_hash=uuid.uuid4().hex * 2,
+                file_size_bytes=250_000,
+                status=ItemStatus.ready.value,
+                ocr_confidence_score=0.93,
+                ocr_extracted_data={
+                    "invoice_number": f"INV-{i}",
+                    "amount": "1200.00",
+                    "currency": "EUR",
+                    "invoice_date": "2024-06-01",
+                    "due_date": "2024-06-30",
+                    "vendor_name": "Acme GmbH",
+                    "raw_text": RAW_TEXT,
+                },
+                ocr_processing_time_ms=1800,
+            )
+            for i in range(items)
+        )
+        await db.commit()
+    return company_id, batch_id
+
+
+async def _eager(db: AsyncSession, batch_id, company_id, with_ocr_data: bool) -> int:
+    loader = selectinload(UploadBatch.items)
+    if with_ocr_data:
+        loader = loader.undefer(UploadItem.ocr_extracted_data)
+    batch = (
+        await db.execute(select(UploadBatch).where(UploadBatch.id == batch_id).options(loader))
+    ).scalar_one()
+    columns = [
+        c.key
+        for c in UploadItem.__mapper__.column_attrs
+        if with_ocr_data or c.key != "ocr_extracted_data"
+    ]
+    return sum(_row_bytes(item, columns) for item in batch.items)
+
+
+async def _progress_rows(db: AsyncSession, batch_id, company_id) -> int:
+    rows = await repository.list_item_progress(db, batch_id, company_id)
+    return sum(_row_bytes(row, row._fields) for row in rows)
+
+
+async def main(items: int, repetitions: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        company_id, batch_id = await _seed(session_factory, items)
+
+        strategies = {
+            "eager + OCR JSON": lambda db: _eager(db, batch_id, company_id, True),
+            "eager, deferred": lambda db: _eager(db, batch_id, company_id, False),
+            "progress rows": lambda db: _progress_rows(db, batch_id, company_id),
+        }
+
+        print(f"{items} items, {repetitions} runs each (median)")
+        baseline = None
+        for label, load in strategies.items():
+            samples, fetched = [], 0
+            for _ in range(repetitions):
+                async with session_factory() as db:
+                    start = time.perf_counter()
+                    fetched = await load(db)
+                    samples.append((time.perf_counter() - start) * 1000)
+            median = statistics.median(samples)
+            baseline = baseline or (median, fetched)
+            print(
+                f"{label:<18} {median:8.2f} ms ({median / baseline[0]:5.1%})  "
+                f"{fetched / 1024:9.1f} KiB ({fetched / baseline[1]:5.1%})"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        )
+    )
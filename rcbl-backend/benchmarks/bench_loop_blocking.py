@@ -0,0 +1,80 @@
+"""Benchmark: event-loop stalls from encoding OCR provider requests.
+
+Encodes N multi-MB documents into provider request bodies (base64 + JSON, as
+ocr_client does before every vision call) while the loop monitor samples
+event-loop lag, comparing:
+
+  inline    encode_request called on the event loop (how the worker used to)
+  process   executor.run_cpu_bound with the worker's process pool
+
+and prints wall time, the total time the loop was blocked and the worst
+single stall. Other jobs on the worker wait for the whole of each stall.
+
+Run with: uv run python -m benchmarks.bench_loop_blocking [documents] [megabytes]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from src.clients.ocr_client import encode_request
+from src.core import executor, loop_monitor
+
+
+async def _encode_all(documents: list[bytes], offload: bool) -> None:
+    for document in documents:
+        if offload:
+            await executor.run_cpu_bound(
+                encode_request, [document], "application/pdf", payload_bytes=len(document)
+            )
+        else:
+            encode_request([document], "application/pdf")
+        await asyncio.sleep(0)
+
+
+_stalls: list[float] = []
+
+
+async def _sample_stalls(interval: float) -> None:
+    """Like loop_monitor, but keeps every sample so the worst stall can be reported."""
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        _stalls.append(max(0.0, loop.time() - scheduled))
+
+
+async def main(count: int, megabytes: float) -> None:
+    documents = [os.urandom(int(megabytes * 1024 * 1024)) for _ in range(count)]
+    executor.start_process_pool(2)
+    await executor.run_in_process(len, b"warm up")  # spawn workers before timing
+    loop_monitor.start(0.005)
+    sampler = asyncio.create_task(_sample_stalls(0.005))
+
+    print(f"{count} documents of {megabytes} MB")
+    print(f"{'mode':<9} {'wall':>10} {'loop blocked':>14} {'worst stall':>13}")
+    for label, offload in (("inline", False), ("process", True)):
+        _stalls.clear()
+        blocked_before = loop_monitor.blocked_seconds()
+        start = time.perf_counter()
+        await _encode_all(documents, offload)
+        wall = time.perf_counter() - start
+        blocked = loop_monitor.blocked_seconds() - blocked_before
+        print(
+            f"{label:<9} {wall * 1000:8.0f} ms {blocked * 1000:11.0f} ms "
+            f"{max(_stalls, default=0.0) * 1000:10.0f} ms"
+        )
+
+    sampler.cancel()
+    await loop_monitor.stop()
+    executor.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        )
+    )
@@ -0,0 +1,57 @@
+"""Microbenchmark: shared S3 client vs. a new client per operation.
+
+Runs N sequential HEAD bucket calls (the cheapest round trip) both ways against
+the configured S3_ENDPOINT_URL and prints per-call latency. Needs a reachable
+S3/MinIO — `docker compose up minio` is enough.
+
+Run with: uv run python -m benchmarks.bench_s3_client [iterations]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from src.clients import s3_client
+from src.config import settings
+
+
+async def _time_calls(iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await s3_client.head_bucket(settings.S3_BUCKET)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(samples):7.2f} ms  "
+        f"p50={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms"
+    )
+
+
+async def main(iterations: int) -> None:
+    await s3_client.ensure_bucket_exists()
+
+    per_call = await _time_calls(iterations)
+
+    await s3_client.start_client()
+    try:
+        await s3_client.head_bucket(settings.S3_BUCKET)  # warm the pool
+        shared = await _time_calls(iterations)
+    finally:
+        await s3_client.close_client()
+
+    print(f"{iterations} x head_bucket against {settings.S3_ENDPOINT_URL}")
+    _report("client per operation", per_call)
+    _report("shared client", shared)
+    saved = statistics.mean(per_call) - statistics.mean(shared)
+    print(f"saved per call: {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
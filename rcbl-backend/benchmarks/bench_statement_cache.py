@@ -0,0 +1,149 @@
+"""Benchmark: per-call statement overhead of the hot repository lookups.
+
+Compares three ways of issuing get_item_by_id / get_batch_by_id:
+
+  core       a new select(...).where(...) built on every call (how the
+             repository used to do it)
+  lambda     lambda_stmt, SQLAlchemy's closure-analysing statement cache
+  prebuilt   the repository's cached statements with named bind parameters
+             (what get_item_by_id / get_batch_by_id execute now)
+
+and reports, in µs per call:
+
+  build + cache key   constructing the statement and computing the cache key
+                      SQLAlchemy uses to find its compiled SQL — pure Python
+                      overhead paid before any I/O
+  execute             the full session.execute call against SQLite, including
+                      ORM row hydration
+
+Runs against a throwaway SQLite file, so the execute numbers leave out the
+network and asyncpg's prepared-statement cache (DB_STATEMENT_CACHE_SIZE).
+
+Run with: uv run python -m benchmarks.bench_statement_cache [calls]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import src.modules.auth.models  # noqa: F401 — register FK targets
+from src.db.session import Base
+from src.modules.invoices import repository
+from src.modules.invoices.models import BatchStatus, ItemStatus, UploadBatch, UploadItem
+
+
+def _item_core(item_id, company_id):
+    stmt = select(UploadItem).where(UploadItem.id == item_id, UploadItem.company_id == company_id)
+    return stmt, None
+
+
+def _item_lambda(item_id, company_id):
+    stmt = lambda_stmt(lambda: select(UploadItem).where(UploadItem.id == item_id))
+    stmt += lambda s: s.where(UploadItem.company_id == company_id)
+    return stmt, None
+
+
+def _item_prebuilt(item_id, company_id):
+    stmt = repository._item_by_id_stmt(True, False)
+    return stmt, {"item_id": item_id, "company_id": company_id}
+
+
+def _batch_core(batch_id, company_id):
+    stmt = select(UploadBatch).where(
+        UploadBatch.id == batch_id, UploadBatch.company_id == company_id
+    )
+    return stmt, None
+
+
+def _batch_lambda(batch_id, company_id):
+    stmt = lambda_stmt(lambda: select(UploadBatch).where(UploadBatch.id == batch_id))
+    stmt += lambda s: s.where(UploadBatch.company_id == company_id)
+    return stmt, None
+
+
+def _batch_prebuilt(batch_id, company_id):
+    stmt = repository._batch_by_id_stmt(True, False)
+    return stmt, {"batch_id": batch_id, "company_id": company_id}
+
+
+STATEMENTS = {
+    "get_item_by_id": {"core": _item_core, "lambda": _item_lambda, "prebuilt": _item_prebuilt},
+    "get_batch_by_id": {
+        "core": _batch_core,
+        "lambda": _batch_lambda,
+        "prebuilt": _batch_prebuilt,
+    },
+}
+
+
+async def _seed(session_factory) -> tuple[uuid.UUID, uuid.UUID, uuid.UUID]:
+    company_id, batch_id, item_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as db:
+        db.add(
+            UploadBatch(
+                id=batch_id,
+                company_id=company_id,
+                upload_type="single",
+                total_files=1,
+                status=BatchStatus.processing.value,
+            )
+        )
+        db.add(
+            UploadItem(
+                id=item_id,
+                batch_id=batch_id,
+                company_id=company_id,
+                file_name="invoice.pdf",
+                file_url=f"invoices/{company_id}/{item_id}.pdf",
+                status=ItemStatus.queued.value,
+            )
+        )
+        await db.commit()
+    return company_id, batch_id, item_id
+
+
+def _build_us(build, row_id, company_id, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        stmt, _params = build(row_id, company_id)
+        stmt._generate_cache_key()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def _execute_us(session_factory, build, row_id, company_id, calls: int) -> float:
+    async with session_factory() as db:
+        await db.execute(*build(row_id, company_id))  # warm the compiled cache
+        start = time.perf_counter()
+        for _ in range(calls):
+            (await db.execute(*build(row_id, company_id))).scalar_one()
+            db.expunge_all()
+        return (time.perf_counter() - start) / calls * 1e6
+
+
+async def main(calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        company_id, batch_id, item_id = await _seed(session_factory)
+        ids = {"get_item_by_id": item_id, "get_batch_by_id": batch_id}
+
+        print(f"{calls} calls each, µs per call")
+        print(f"{'query':<16} {'style':<9} {'build + cache key':>18} {'execute':>10}")
+        for name, styles in STATEMENTS.items():
+            for style, build in styles.items():
+                build_us = _build_us(build, ids[name], company_id, calls)
+                execute_us = await _execute_us(session_factory, build, ids[name], company_id, calls)
+                print(f"{name:<16} {style:<9} {build_us:18.1f} {execute_us:10.1f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -1,17 +1,88 @@
-"""OCR client: OpenAI Vision as primary, structured extraction with fallback."""
+"""OCR client: OpenAI Vision as primary, structured extraction with fallback.
 
+All provider calls share one process-wide httpx.AsyncClient (keep-alive, HTTP/2,
+bounded pool) so jobs don't pay a TCP + TLS handshake per call. The worker opens it
+in WorkerSettings.on_startup via start_http_client() and closes it on shutdown;
+other processes get one lazily on first use.
+
+Each call first takes capacity from the fleet-wide limiter in ocr_rate_limit and
+reports the provider's rate-limit headers back to it.
+
+Provider failures are classified rather than all degrading to a placeholder:
+
+  transient     timeouts, connection errors, 408 and 5xx — retried in-call with
+                full-jitter exponential backoff (OCR_RETRY_*)
+  unavailable   retries exhausted, other 4xx (auth, quota), or the circuit
+                breaker is open — OCRProviderUnavailable, so the job is deferred
+  unreadable    the provider answered but rejected the document (400/413/415/422)
+                or returned nothing parseable — placeholder for human review
+
+Callers with a deadline (the OCR job, which arq cancels at job_timeout) pass it
+down: limiter waits, request timeouts and retry backoff are all clamped to it,
+and an attempt that would not fit is not started — the provider counts as
+unavailable and the job is deferred instead of being cancelled mid-call.
+
+A per-process circuit breaker counts consecutive failed attempts and refuses
+calls while the provider is down instead of hammering it at full concurrency.
+
+Encoding a multi-MB document into the request body (base64 + JSON) and parsing
+the response go through src/core/executor.py, off the event loop once they are
+large enough to stall the worker's other jobs.
+"""
+
+import asyncio
 import base64
 import json
+import math
+import random
 import time
 from dataclasses import dataclass
 
 import httpx
 import structlog
 
+from src.clients import ocr_rate_limit
 from src.config import settings
+from src.core import executor
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpen
+from src.core.observability import (
+    ocr_failures_total,
+    ocr_provider_handshake_seconds,
+    ocr_provider_request_seconds,
+    ocr_provider_retries_total,
+    ocr_rate_limited_total,
+)
 
 logger = structlog.get_logger(__name__)
 
+OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+
+_http_client: httpx.AsyncClient | None = None
+
+_breaker = CircuitBreaker(
+    "ocr_provider",
+    failure_threshold=settings.OCR_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.OCR_BREAKER_RESET_SECONDS,
+)
+
+# The provider is up but will not read this document — retrying cannot help.
+_UNREADABLE_STATUS = frozenset({400, 413, 415, 422})
+
+# Shortest time before the caller's deadline worth starting a provider attempt in.
+_MIN_ATTEMPT_SECONDS = 5.0
+
+# Upload formats the vision model takes as an image; PDFs and TIFFs are only
+# sent as page renderings (ocr_preprocess).
+VISION_MEDIA_TYPES = frozenset({"image/jpeg", "image/png"})
+
+_MAGIC_MEDIA_TYPES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
 OCR_SYSTEM_PROMPT = """\
 You are an invoice data extraction specialist. Extract structured data from the invoice image.
 Return ONLY valid JSON with these exact fields (use null for any missing field):
@@ -39,70 +110,320 @@ class OCRResult:
     raw_text: str | None
     confidence: float
     processing_ms: int
+    failure: str | None = None  # placeholder results only: unreadable | provider
+
+
+class OCRProviderUnavailable(Exception):
+    """The provider is failing or its breaker is open; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float, reason: str) -> None:
+        super().__init__(f"OCR provider unavailable ({reason}) — retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class OCRUnreadable(Exception):
+    """The provider answered, but the document yielded no usable extraction."""
+
+
+def media_type(file_bytes: bytes) -> str:
+    """Content type of an upload, from its leading bytes (the accepted upload formats)."""
+    for magic, content_type in _MAGIC_MEDIA_TYPES:
+        if file_bytes.startswith(magic):
+            return content_type
+    return "application/octet-stream"
+
+
+# ── Shared HTTP client ────────────────────────────────────────────────────────
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=settings.OCR_HTTP2,
+        timeout=httpx.Timeout(settings.OCR_HTTP_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=settings.OCR_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OCR_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OCR_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+    )
+
+
+async def start_http_client() -> None:
+    """Create the process-wide provider client (idempotent)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = _build_http_client()
+        logger.info(
+            "ocr.http_client_started",
+            http2=settings.OCR_HTTP2,
+            max_connections=settings.OCR_HTTP_MAX_CONNECTIONS,
+        )
+
+
+async def close_http_client() -> None:
+    """Close the process-wide provider client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("ocr.http_client_closed")
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = _build_http_client()
+    return _http_client
+
 
+class _ConnectionTrace:
+    """httpx trace hook: did this call open a new connection, and how long did it take?"""
 
-async def extract_invoice(file_bytes: bytes) -> OCRResult:
+    def __init__(self) -> None:
+        self.new_connection = False
+        self._connect_started: float | None = None
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self.new_connection = True
+            self._connect_started = time.monotonic()
+        elif event_name.endswith("send_request_headers.started") and self._connect_started:
+            # TCP connect + TLS handshake (+ HTTP/2 preface) are done once headers go out
+            ocr_provider_handshake_seconds.observe(time.monotonic() - self._connect_started)
+            self._connect_started = None
+
+
+async def _post_chat_completion(body: bytes, timeout: float) -> httpx.Response:
+    """POST a pre-encoded JSON body on the shared client, recording latency and handshake cost."""
+    trace = _ConnectionTrace()
+    start = time.monotonic()
+    response = await _get_http_client().post(
+        OPENAI_CHAT_COMPLETIONS_URL,
+        content=body,
+        headers={"Content-Type": "application/json"},
+        extensions={"trace": trace},
+        timeout=timeout,
+    )
+    elapsed = time.monotonic() - start
+    ocr_provider_request_seconds.labels(
+        connection="new" if trace.new_connection else "reused"
+    ).observe(elapsed)
+    logger.debug(
+        "ocr.provider_call",
+        status_code=response.status_code,
+        http_version=response.http_version,
+        new_connection=trace.new_connection,
+        elapsed_ms=int(elapsed * 1000),
+    )
+    return response
+
+
+# ── Extraction ────────────────────────────────────────────────────────────────
+
+
+async def extract_invoice(
+    file_bytes: bytes,
+    *,
+    page_images: list[bytes] | None = None,
+    defer_when_unavailable: bool = True,
+    deadline: float | None = None,
+) -> OCRResult:
     """
-    Primary: OpenAI GPT-4o Vision.
-    On failure: returns a low-confidence placeholder so the item
-    is routed to review_pending rather than crashing.
+    Primary: OpenAI GPT-4o Vision — on `page_images` (JPEG renderings of the
+    relevant pages, see ocr_preprocess) when given, else on the upload itself,
+    which must then be a JPEG or PNG (a PDF or TIFF is unreadable without its
+    renderings). On failure: returns a low-confidence placeholder so the item
+    is routed to review_pending rather than crashing; its `failure` says
+    whether the document was unreadable or the provider was.
+
+    When the provider is rate limited or unavailable, raises
+    ocr_rate_limit.OCRRateLimited / OCRProviderUnavailable so the caller can
+    retry later — or, with defer_when_unavailable=False, degrades to the
+    placeholder. The provider call ends by `deadline` (time.monotonic()) when
+    given; if the next attempt would not fit it counts as unavailable.
     """
     start = time.monotonic()
     try:
-        result = await _openai_extract(file_bytes)
+        result = await _openai_extract(file_bytes, page_images, deadline)
         result.processing_ms = int((time.monotonic() - start) * 1000)
         return result
+    except (ocr_rate_limit.OCRRateLimited, OCRProviderUnavailable) as exc:
+        if defer_when_unavailable:
+            raise
+        logger.warning("ocr.provider_unavailable", error=str(exc))
+        failure = "provider"
+    except OCRUnreadable as exc:
+        logger.info("ocr.unreadable", error=str(exc))
+        failure = "unreadable"
     except Exception as exc:
         logger.warning("ocr.openai_failed", error=str(exc))
-        processing_ms = int((time.monotonic() - start) * 1000)
-        return OCRResult(
-            invoice_number=None,
-            amount=None,
-            currency=None,
-            invoice_date=None,
-            due_date=None,
-            vendor_name=None,
-            raw_text=None,
-            confidence=0.0,
-            processing_ms=processing_ms,
-        )
+        failure = "provider"
+    processing_ms = int((time.monotonic() - start) * 1000)
+    return OCRResult(
+        invoice_number=None,
+        amount=None,
+        currency=None,
+        invoice_date=None,
+        due_date=None,
+        vendor_name=None,
+        raw_text=None,
+        confidence=0.0,
+        processing_ms=processing_ms,
+        failure=failure,
+    )
 
 
-async def _openai_extract(file_bytes: bytes) -> OCRResult:
-    b64 = base64.b64encode(file_bytes).decode()
+def encode_request(documents: list[bytes], media_type: str) -> bytes:
+    """Chat-completions request body for `documents` (blocking: base64 + JSON of every byte)."""
+    content = [
+        {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:{media_type};base64,{base64.b64encode(document).decode()}",
+                "detail": "high",
+            },
+        }
+        for document in documents
+    ]
     payload = {
         "model": "gpt-4o",
         "messages": [
             {"role": "system", "content": OCR_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:application/pdf;base64,{b64}",
-                            "detail": "high",
-                        },
-                    }
-                ],
-            },
+            {"role": "user", "content": content},
         ],
         "max_tokens": 512,
         "response_format": {"type": "json_object"},
     }
+    return json.dumps(payload).encode()
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+
+async def _openai_extract(
+    file_bytes: bytes, page_images: list[bytes] | None = None, deadline: float | None = None
+) -> OCRResult:
+    if page_images:
+        documents, content_type = page_images, "image/jpeg"
+    else:
+        documents, content_type = [file_bytes], media_type(file_bytes)
+        if content_type not in VISION_MEDIA_TYPES:
+            ocr_failures_total.labels(kind="unreadable").inc()
+            raise OCRUnreadable(f"{content_type} upload without page images")
+    body = await executor.run_cpu_bound(
+        encode_request,
+        documents,
+        content_type,
+        payload_bytes=sum(len(document) for document in documents),
+    )
+
+    response = await _call_provider(body, deadline)
+    try:
+        return await executor.run_cpu_bound(
+            parse_completion, response.content, payload_bytes=len(response.content)
         )
-        response.raise_for_status()
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError) as exc:
+        ocr_failures_total.labels(kind="unreadable").inc()
+        raise OCRUnreadable(f"unparseable provider response: {exc!r}") from exc
+
+
+async def _call_provider(body: bytes, deadline: float | None = None) -> httpx.Response:
+    """POST behind the circuit breaker and rate limiter, retrying transient failures.
+
+    No limiter wait, request or backoff runs past `deadline`: with less than
+    _MIN_ATTEMPT_SECONDS left, no attempt is started.
+    """
+    started = time.monotonic()
+    if deadline is None:
+        deadline = math.inf
+    attempt = 0
+    while True:
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        if remaining < _MIN_ATTEMPT_SECONDS:
+            ocr_failures_total.labels(kind="provider").inc()
+            raise OCRProviderUnavailable(_unavailable_backoff(), "deadline")
+        try:
+            _breaker.before_call()
+        except CircuitOpen as exc:
+            ocr_failures_total.labels(kind="circuit_open").inc()
+            raise OCRProviderUnavailable(exc.retry_after, "circuit_open") from exc
+
+        try:
+            # Leave at least _MIN_ATTEMPT_SECONDS of the remaining time for the request.
+            await ocr_rate_limit.acquire(max_wait=remaining - _MIN_ATTEMPT_SECONDS)
+            timeout = min(settings.OCR_HTTP_TIMEOUT_SECONDS, deadline - time.monotonic())
+            response = await _post_chat_completion(body, timeout)
+            await ocr_rate_limit.observe(response)
+        except ocr_rate_limit.OCRRateLimited:
+            _breaker.release()
+            raise
+        except httpx.TimeoutException as exc:
+            reason, error = "timeout", str(exc) or type(exc).__name__
+        except httpx.TransportError as exc:
+            reason, error = "transport", str(exc) or type(exc).__name__
+        except BaseException:
+            # Cancelled (job timeout) or an unexpected error: the call proved nothing
+            # either way, so free the half-open probe slot for the next caller.
+            _breaker.release()
+            raise
+        else:
+            status = response.status_code
+            if status == 429:
+                _breaker.release()
+                ocr_rate_limited_total.labels(reason="provider_429").inc()
+                raise ocr_rate_limit.OCRRateLimited(
+                    ocr_rate_limit.retry_after(response), reason="provider_429"
+                )
+            if status < 400:
+                _breaker.record_success()
+                return response
+            if status in _UNREADABLE_STATUS:
+                _breaker.record_success()
+                ocr_failures_total.labels(kind="unreadable").inc()
+                raise OCRUnreadable(f"provider rejected the document: HTTP {status}")
+            if status != 408 and status < 500:
+                _breaker.record_failure()
+                ocr_failures_total.labels(kind="provider").inc()
+                raise OCRProviderUnavailable(_unavailable_backoff(), f"http_{status}")
+            reason, error = ("http_408" if status == 408 else "http_5xx"), f"HTTP {status}"
+
+        # Transient failure: count it against the breaker, then back off and retry.
+        _breaker.record_failure()
+        delay = _backoff_delay(attempt)
+        if (
+            attempt >= settings.OCR_RETRY_MAX_ATTEMPTS
+            or time.monotonic() - started + delay > settings.OCR_RETRY_MAX_ELAPSED_SECONDS
+            or time.monotonic() + delay + _MIN_ATTEMPT_SECONDS > deadline
+        ):
+            ocr_failures_total.labels(kind="provider").inc()
+            raise OCRProviderUnavailable(_unavailable_backoff(), reason)
+        ocr_provider_retries_total.labels(reason=reason).inc()
+        logger.warning(
+            "ocr.provider_retry",
+            attempt=attempt,
+            reason=reason,
+            error=error,
+            delay_ms=int(delay * 1000),
+        )
+        await asyncio.sleep(delay)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max delay, base * 2^(attempt-1))]."""
+    ceiling = min(
+        settings.OCR_RETRY_MAX_DELAY_SECONDS,
+        settings.OCR_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, ceiling)
+
+
+def _unavailable_backoff() -> float:
+    """How long a deferred job should wait: until the breaker probes again, at least."""
+    return max(_breaker.retry_after(), settings.OCR_RATE_LIMIT_DEFAULT_BACKOFF_SECONDS)
+
 
-    data = response.json()
+def parse_completion(body: bytes) -> OCRResult:
+    data = json.loads(body)
     raw_content = data["choices"][0]["message"]["content"]
     parsed = json.loads(raw_content)
 
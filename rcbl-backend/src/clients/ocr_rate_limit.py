@@ -0,0 +1,245 @@
+"""Shared OCR provider rate limiter — token buckets in Redis.
+
+Every worker process draws from the same two buckets before calling the
+provider, so the fleet as a whole stays under the account's limits:
+
+  ocr:ratelimit:rpm     requests per minute  (OCR_RATE_LIMIT_RPM)
+  ocr:ratelimit:tpm     tokens per minute    (OCR_RATE_LIMIT_TPM), charged
+                        OCR_ESTIMATED_TOKENS_PER_REQUEST per call
+
+Buckets refill continuously; taking from both is one Lua script, so
+concurrent workers never over-draw. The provider's own view is fed back after
+every call: when its x-ratelimit-remaining-* headers run out, or it answers
+429, `ocr:ratelimit:paused_until` holds every worker back until the reset time
+it reports.
+
+`acquire` waits for capacity up to OCR_RATE_LIMIT_MAX_WAIT_SECONDS, then raises
+OCRRateLimited so the job can be deferred instead of degraded.
+`wait_for_capacity` does the same without taking anything: jobs call it before
+downloading and preprocessing, so a deferral costs no work. Without a bound
+Redis (API process, tests) the limiter is a no-op, and a Redis error lets the
+call through — the provider's 429 is still the backstop.
+"""
+
+import asyncio
+import re
+import time
+
+import httpx
+import structlog
+
+from src.config import settings
+from src.core.observability import ocr_rate_limit_wait_seconds, ocr_rate_limited_total
+
+logger = structlog.get_logger(__name__)
+
+RPM_KEY = "ocr:ratelimit:rpm"
+TPM_KEY = "ocr:ratelimit:tpm"
+PAUSE_KEY = "ocr:ratelimit:paused_until"
+
+_redis = None
+
+
+class OCRRateLimited(Exception):
+    """No provider capacity now; retry the call after `retry_after` seconds.
+
+    `reason` is "limiter" when the fleet's own buckets ran dry (the provider was
+    never called), "provider_429" when the provider refused the call.
+    """
+
+    def __init__(self, retry_after: float, reason: str = "limiter") -> None:
+        super().__init__(f"OCR provider rate limit — retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def bind_redis(redis) -> None:
+    """Enable the shared limiter (called from worker startup)."""
+    global _redis
+    _redis = redis
+
+
+# KEYS: rpm bucket, tpm bucket, pause key — ARGV: now (ms), rpm, tpm, cost (tokens), take
+# Takes one request and `cost` tokens if both buckets allow (only checks when
+# take is 0); returns 0, or the milliseconds to wait before trying again.
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local paused_until = tonumber(redis.call('GET', KEYS[3]) or '0')
+if paused_until > now then
+  return paused_until - now
+end
+local function refill(key, capacity)
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local level = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  return math.min(capacity, level + math.max(0, now - ts) * capacity / 60000)
+end
+local rpm, tpm = tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost = math.min(tonumber(ARGV[4]), tpm)
+local requests = refill(KEYS[1], rpm)
+local tokens = refill(KEYS[2], tpm)
+local wait = 0
+if requests < 1 then
+  wait = math.max(wait, (1 - requests) * 60000 / rpm)
+end
+if tokens < cost then
+  wait = math.max(wait, (cost - tokens) * 60000 / tpm)
+end
+if wait == 0 and ARGV[5] == '1' then
+  requests = requests - 1
+  tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'level', requests, 'ts', now)
+redis.call('HSET', KEYS[2], 'level', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+redis.call('PEXPIRE', KEYS[2], 120000)
+return math.ceil(wait)
+"""
+
+# KEYS: pause key — ARGV: pause until (ms). Only ever extends an existing pause.
+_PAUSE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local until_ms = tonumber(ARGV[1])
+if until_ms > current then
+  redis.call('SET', KEYS[1], until_ms, 'PX', until_ms - tonumber(ARGV[2]))
+end
+return 0
+"""
+
+
+def _enabled() -> bool:
+    return (
+        _redis is not None and settings.OCR_RATE_LIMIT_RPM > 0 and settings.OCR_RATE_LIMIT_TPM > 0
+    )
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def acquire(cost_tokens: int | None = None, *, max_wait: float | None = None) -> None:
+    """Wait for one provider call's worth of capacity; OCRRateLimited if it takes too long.
+
+    The wait is bounded by OCR_RATE_LIMIT_MAX_WAIT_SECONDS, or by `max_wait` when shorter.
+    """
+    await _wait(cost_tokens, take=True, max_wait=max_wait)
+
+
+async def wait_for_capacity(
+    cost_tokens: int | None = None, *, max_wait: float | None = None
+) -> None:
+    """Like `acquire`, but leaves the capacity in the buckets for the call itself."""
+    await _wait(cost_tokens, take=False, max_wait=max_wait)
+
+
+async def _wait(cost_tokens: int | None, *, take: bool, max_wait: float | None) -> None:
+    redis = _redis
+    if redis is None or not _enabled():
+        return
+    cost = settings.OCR_ESTIMATED_TOKENS_PER_REQUEST if cost_tokens is None else cost_tokens
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    max_wait_seconds = settings.OCR_RATE_LIMIT_MAX_WAIT_SECONDS
+    if max_wait is not None:
+        max_wait_seconds = min(max_wait_seconds, max_wait)
+    deadline = start + max_wait_seconds
+    while True:
+        try:
+            wait_ms = await redis.eval(
+                _ACQUIRE_SCRIPT,
+                3,
+                RPM_KEY,
+                TPM_KEY,
+                PAUSE_KEY,
+                _now_ms(),
+                settings.OCR_RATE_LIMIT_RPM,
+                settings.OCR_RATE_LIMIT_TPM,
+                cost,
+                int(take),
+            )
+        except Exception as exc:
+            logger.warning("ocr.rate_limit_unavailable", error=str(exc))
+            return
+        if not wait_ms:
+            if take:
+                ocr_rate_limit_wait_seconds.observe(loop.time() - start)
+            return
+        wait = int(wait_ms) / 1000
+        if loop.time() + wait > deadline:
+            ocr_rate_limited_total.labels(reason="budget").inc()
+            raise OCRRateLimited(wait)
+        await asyncio.sleep(wait)
+
+
+async def observe(response: httpx.Response) -> None:
+    """Pause every worker when the provider reports its limits exhausted (or answers 429)."""
+    if _redis is None:
+        return
+    headers = response.headers
+    pause = None
+    if response.status_code == 429:
+        pause = _retry_after(headers) or settings.OCR_RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+    else:
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if remaining_requests is not None and remaining_requests < 1:
+            pause = parse_duration(headers.get("x-ratelimit-reset-requests"))
+        if (
+            remaining_tokens is not None
+            and remaining_tokens < settings.OCR_ESTIMATED_TOKENS_PER_REQUEST
+        ):
+            pause = max(pause or 0, parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0)
+    if not pause:
+        return
+    now = _now_ms()
+    try:
+        await _redis.eval(_PAUSE_SCRIPT, 1, PAUSE_KEY, now + int(pause * 1000), now)
+    except Exception as exc:
+        logger.warning("ocr.rate_limit_pause_failed", error=str(exc))
+        return
+    logger.info("ocr.rate_limit_paused", seconds=pause, status_code=response.status_code)
+
+
+def retry_after(response: httpx.Response) -> float:
+    """Seconds the provider asked us to back off after a 429."""
+    return _retry_after(response.headers) or settings.OCR_RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+
+
+def _retry_after(headers: httpx.Headers) -> float | None:
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if name == "retry-after-ms" else seconds
+    return (
+        max(
+            parse_duration(headers.get("x-ratelimit-reset-requests")) or 0,
+            parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0,
+        )
+        or None
+    )
+
+
+def _int_header(headers: httpx.Headers, name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse the provider's reset durations ("20ms", "1s", "6m0s", "1h2m3.5s") into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
@@ -1,11 +1,19 @@
-"""Async S3 / MinIO client wrapper using aioboto3."""
+"""Async S3 / MinIO client wrapper using aioboto3.
+
+One long-lived client (connection pool, credential resolver, adaptive retries) is
+shared by every operation. The API opens it in main.lifespan and the worker in
+WorkerSettings.on_startup via start_client(); code running outside either
+(scripts, tests) falls back to a short-lived client per operation.
+"""
 
 import hashlib
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Protocol
 
 import aioboto3
 import structlog
+from aiobotocore.config import AioConfig
 
 from src.config import settings
 
@@ -17,13 +25,55 @@ _session = aioboto3.Session(
 )
 
 
-@asynccontextmanager
-async def _s3_resource() -> AsyncGenerator:
-    async with _session.client(
+class AsyncReadable(Protocol):
+    """Anything with an async ``read(size)`` — e.g. FastAPI's UploadFile."""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+_client = None
+_client_stack: AsyncExitStack | None = None
+
+
+def _open_client():
+    return _session.client(
         "s3",
         endpoint_url=settings.S3_ENDPOINT_URL,
         region_name="us-east-1",
-    ) as client:
+        config=AioConfig(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={"mode": "adaptive", "max_attempts": settings.S3_MAX_ATTEMPTS},
+        ),
+    )
+
+
+async def start_client() -> None:
+    """Open the shared S3 client for this process (idempotent)."""
+    global _client, _client_stack
+    if _client is not None:
+        return
+    stack = AsyncExitStack()
+    _client = await stack.enter_async_context(_open_client())
+    _client_stack = stack
+    logger.info("s3.client_started", max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS)
+
+
+async def close_client() -> None:
+    """Close the shared S3 client and its connection pool."""
+    global _client, _client_stack
+    if _client_stack is not None:
+        await _client_stack.aclose()
+        logger.info("s3.client_closed")
+    _client = None
+    _client_stack = None
+
+
+@asynccontextmanager
+async def _s3_resource() -> AsyncGenerator:
+    if _client is not None:
+        yield _client
+        return
+    async with _open_client() as client:
         yield client
 
 
@@ -44,6 +94,67 @@ async def upload_file(
     return key
 
 
+async def upload_stream(
+    stream: AsyncReadable,
+    key: str,
+    content_type: str = "application/pdf",
+) -> int:
+    """Stream a file-like object to S3 without holding it in memory.
+
+    Reads one part (S3_MULTIPART_PART_SIZE_BYTES) at a time. A stream that fits in
+    a single part is sent as a plain PUT; anything larger becomes a multipart upload,
+    which is aborted if reading or uploading fails. Returns the number of bytes sent.
+    """
+    part_size = settings.S3_MULTIPART_PART_SIZE_BYTES
+    async with _s3_resource() as s3:
+        chunk = await stream.read(part_size)
+        if len(chunk) < part_size:
+            await s3.put_object(
+                Bucket=settings.S3_BUCKET,
+                Key=key,
+                Body=chunk,
+                ContentType=content_type,
+            )
+            logger.info("s3.uploaded", key=key, size_bytes=len(chunk))
+            return len(chunk)
+
+        upload = await s3.create_multipart_upload(
+            Bucket=settings.S3_BUCKET,
+            Key=key,
+            ContentType=content_type,
+        )
+        upload_id = upload["UploadId"]
+        parts: list[dict] = []
+        total = 0
+        try:
+            while chunk:
+                part_number = len(parts) + 1
+                response = await s3.upload_part(
+                    Bucket=settings.S3_BUCKET,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+                total += len(chunk)
+                chunk = await stream.read(part_size)
+
+            await s3.complete_multipart_upload(
+                Bucket=settings.S3_BUCKET,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await s3.abort_multipart_upload(Bucket=settings.S3_BUCKET, Key=key, UploadId=upload_id)
+            logger.warning("s3.multipart_aborted", key=key, parts_uploaded=len(parts))
+            raise
+
+    logger.info("s3.uploaded", key=key, size_bytes=total, parts=len(parts))
+    return total
+
+
 async def download_file(key: str) -> bytes:
     """Download object and return raw bytes."""
     async with _s3_resource() as s3:
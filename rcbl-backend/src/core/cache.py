@@ -0,0 +1,49 @@
+"""In-process LRU cache with per-entry TTL.
+
+Used as the first tier in front of Redis for hot, small lookups. Entries are
+per process — anything that must be shared between API instances or workers
+belongs in Redis, with this cache only absorbing repeat hits locally.
+
+Usage:
+    cache: TTLCache[str, dict] = TTLCache(maxsize=1024, ttl=300)
+    cache.set("key", value)
+    value = cache.get("key")  # None when missing or expired
+"""
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """Bounded LRU mapping whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
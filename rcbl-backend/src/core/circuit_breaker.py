@@ -0,0 +1,106 @@
+"""In-process circuit breaker for calls to an external dependency.
+
+  closed      calls go through; `failure_threshold` consecutive failures open it
+  open        calls are refused with CircuitOpen until `reset_timeout` passes
+  half_open   one probe call is let through — success closes the breaker,
+              failure opens it again for another `reset_timeout`
+
+State is per process, like TTLCache: each worker trips on its own failures,
+which is enough to stop a dead dependency being hammered at full concurrency.
+
+Usage:
+    breaker = CircuitBreaker("ocr_provider", failure_threshold=5, reset_timeout=30)
+    breaker.before_call()  # raises CircuitOpen while open
+    try:
+        response = await call()
+    except TransientError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+"""
+
+import time
+
+import structlog
+
+from src.core.observability import circuit_breaker_state, circuit_breaker_transitions_total
+
+logger = structlog.get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    """The breaker is refusing calls; try again after `retry_after` seconds."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"circuit {name} is open — retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        circuit_breaker_state.labels(name=name).set(_STATE_VALUES[CLOSED])
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 when not open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call, or raise CircuitOpen."""
+        if self.state == OPEN:
+            remaining = self.retry_after()
+            if remaining > 0:
+                raise CircuitOpen(self.name, remaining)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpen(self.name, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """End an admitted call that proved nothing either way (e.g. a 429)."""
+        self._probe_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        logger.warning(
+            "circuit_breaker.transition",
+            name=self.name,
+            from_state=self.state,
+            to_state=state,
+            consecutive_failures=self._failures,
+        )
+        self.state = state
+        circuit_breaker_state.labels(name=self.name).set(_STATE_VALUES[state])
+        circuit_breaker_transitions_total.labels(name=self.name, state=state).inc()
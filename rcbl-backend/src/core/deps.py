@@ -1,5 +1,6 @@
 """FastAPI dependency functions shared across all modules."""
 
+import time
 import uuid
 from collections.abc import AsyncGenerator
 from typing import Annotated
@@ -7,20 +8,35 @@ from typing import Annotated
 import structlog
 from fastapi import Cookie, Depends, Header, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.config import settings
 from src.core.exceptions import ForbiddenError, UnauthorizedError
+from src.core.observability import request_phase_seconds
 from src.core.security import ACCESS_TOKEN_TYPE, decode_token
 from src.core.tenant import require_company_id, set_company_id
-from src.db.session import get_session, set_tenant_context
+from src.db.session import (
+    async_session_factory,
+    get_read_session,
+    get_session,
+    has_recent_write,
+    mark_recent_write,
+    set_tenant_context,
+)
+from src.modules.auth import principal as principal_cache
 from src.modules.auth.models import User
+from src.modules.auth.principal import Principal
 
 logger = structlog.get_logger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+_ACTIVE_USER_STMT = select(User).where(
+    User.id == bindparam("user_id"),
+    User.deleted_at.is_(None),
+)
+
 
 # ── Database ──────────────────────────────────────────────────────────────────
 
@@ -31,6 +47,11 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Primary sessionmaker, for lookups whose session must close before the endpoint runs."""
+    return async_session_factory
+
+
 # ── arq pool ─────────────────────────────────────────────────────────────────
 
 
@@ -39,19 +60,16 @@ def get_arq_pool(request: Request):
     return request.app.state.arq_pool
 
 
+def get_redis(request: Request):
+    """Return the shared Redis connection (the arq pool) for cache and pub/sub use."""
+    return request.app.state.arq_pool
+
+
 # ── Auth + Tenant ─────────────────────────────────────────────────────────────
 
 
-async def get_current_user(
-    token: Annotated[str | None, Depends(oauth2_scheme)] = None,
-    access_token: Annotated[str | None, Cookie()] = None,
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """
-    Resolve the authenticated user from a Bearer token (header) or
-    access_token httpOnly cookie. Sets company context ContextVar.
-    """
-    raw_token = token or access_token
+def _decode_access_token(raw_token: str | None) -> tuple[uuid.UUID, uuid.UUID]:
+    """Validate an access token and return its (user_id, company_id) claims."""
     if not raw_token:
         raise UnauthorizedError("No authentication token provided")
 
@@ -70,33 +88,97 @@ async def get_current_user(
     except ValueError as exc:
         raise UnauthorizedError("Invalid user ID in token") from exc
 
-    result = await db.execute(
-        select(User).where(
-            User.id == user_uuid,
-            User.deleted_at.is_(None),
-        )
-    )
+    return user_uuid, uuid.UUID(company_id_str)
+
+
+async def get_current_principal(
+    token: Annotated[str | None, Depends(oauth2_scheme)] = None,
+    access_token: Annotated[str | None, Cookie()] = None,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> Principal:
+    """
+    Resolve the authenticated caller's user and company id from a Bearer token
+    or access_token cookie, served from the principal cache — no DB round trip
+    on a hit. Sets company context ContextVar. Use get_current_user instead only
+    when the full User row is needed.
+
+    A cache miss reads the user in a session of its own that is closed before
+    returning, so read-only endpoints (and long-lived SSE streams) never hold a
+    primary connection just for authentication.
+    """
+    start = time.perf_counter()
+    user_uuid, company_uuid = _decode_access_token(token or access_token)
+
+    async with session_factory() as db:
+        principal = await principal_cache.get(db, user_uuid)
+    request_phase_seconds.labels(phase="auth").observe(time.perf_counter() - start)
+    if principal is None:
+        raise UnauthorizedError("User not found")
+
+    set_company_id(company_uuid)
+    return principal
+
+
+async def get_current_user(
+    token: Annotated[str | None, Depends(oauth2_scheme)] = None,
+    access_token: Annotated[str | None, Cookie()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Resolve the authenticated user from a Bearer token (header) or
+    access_token httpOnly cookie. Sets company context ContextVar.
+    """
+    user_uuid, company_uuid = _decode_access_token(token or access_token)
+
+    result = await db.execute(_ACTIVE_USER_STMT, {"user_id": user_uuid})
     user = result.scalar_one_or_none()
     if user is None:
         raise UnauthorizedError("User not found")
 
-    set_company_id(uuid.UUID(company_id_str))
+    await principal_cache.put(Principal(id=user.id, company_id=user.company_id))
+    set_company_id(company_uuid)
     return user
 
 
 async def get_tenant_db(
-    user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis),
 ) -> AsyncGenerator[AsyncSession, None]:
     """
-    Yield a tenant-scoped session: RLS context variable is set at the
-    PostgreSQL transaction level before yielding.
+    Yield a tenant-scoped session. The RLS context variable is set with the
+    first statement of each transaction rather than in a round trip of its own
+    (see set_tenant_context).
+
+    Only endpoints that write use this session, so it opens the company's
+    read-your-writes window up front: dependency teardown (and so the commit)
+    runs after the response is sent, and the client's next read must already
+    be routed to the primary.
     """
     company_id = require_company_id()
+    await mark_recent_write(redis, company_id)
     await set_tenant_context(db, company_id)
     yield db
 
 
+async def get_tenant_read_db(
+    principal: Principal = Depends(get_current_principal),
+    redis=Depends(get_redis),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yield a tenant-scoped, read-only session for endpoints that never write.
+
+    Served by the read replica (DATABASE_REPLICA_URL) unless the company wrote
+    within REPLICA_READ_YOUR_WRITES_SECONDS — then by the primary, so a user
+    who just uploaded sees their own batch.
+    """
+    company_id = require_company_id()
+    use_replica = not await has_recent_write(redis, company_id)
+    async for session in get_read_session(use_replica=use_replica):
+        await set_tenant_context(session, company_id)
+        yield session
+
+
 # ── Cron secret ───────────────────────────────────────────────────────────────
 
 
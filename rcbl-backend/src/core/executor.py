@@ -0,0 +1,66 @@
+"""Process pool for CPU-bound work inside the arq worker.
+
+`run_in_process(fn, *args)` runs a picklable, module-level function in the
+worker's process pool so rasterising or parsing a document never stalls the
+other jobs sharing the event loop. The pool is started in
+WorkerSettings.on_startup; without one (API process, tests) calls fall back
+to a thread, which still keeps the loop free.
+
+`run_cpu_bound(fn, *args, payload_bytes=n)` is for steps whose cost scales
+with their input (base64 + JSON encoding of a provider request, parsing a
+response): below WORKER_OFFLOAD_MIN_BYTES they run inline, where shipping the
+arguments to another process would cost more than the work itself.
+
+Workers are spawned rather than forked: the parent runs an event loop and
+client threads that must not be duplicated into the children.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import anyio
+import structlog
+
+from src.config import settings
+from src.core.observability import executor_tasks_total
+
+logger = structlog.get_logger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def start_process_pool(workers: int) -> None:
+    """Create the process pool (idempotent; 0 workers keeps the thread fallback)."""
+    global _pool
+    if _pool is None and workers > 0:
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info("executor.process_pool_started", workers=workers)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the process pool, cancelling work that has not started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        logger.info("executor.process_pool_stopped")
+
+
+async def run_in_process(fn, *args):
+    """Run `fn(*args)` in the process pool (or a thread when there is none)."""
+    if _pool is None:
+        executor_tasks_total.labels(mode="thread").inc()
+        return await anyio.to_thread.run_sync(fn, *args)
+    executor_tasks_total.labels(mode="process").inc()
+    return await asyncio.wrap_future(_pool.submit(fn, *args))
+
+
+async def run_cpu_bound(fn, *args, payload_bytes: int):
+    """Run `fn(*args)` inline for small payloads, off the event loop for large ones."""
+    if payload_bytes < settings.WORKER_OFFLOAD_MIN_BYTES:
+        executor_tasks_total.labels(mode="inline").inc()
+        return fn(*args)
+    return await run_in_process(fn, *args)
@@ -0,0 +1,230 @@
+"""Per-tenant fair queueing in front of arq.
+
+arq has one FIFO queue per worker fleet, so one company uploading 2,000 files
+makes every other company's uploads wait behind them. Jobs are therefore not
+enqueued into arq directly but submitted to per-company sub-queues:
+
+  queue:tenant:{company_id}:interactive   single uploads
+  queue:tenant:{company_id}:bulk          bulk uploads, split multi-invoice PDFs
+  queue:tenants                           round-robin ring of companies with
+                                          queued jobs
+
+Sub-queues are sorted sets of job IDs scored by submission time (µs, one
+apart within a submission to keep it in order); the arq job payload is
+written to arq's job key at submission without an expiry, so a job can wait
+behind a busy company for any length of time. Dispatching a job adds it to
+arq's queue and only then gives the payload arq's expiry (expires_extra_ms).
+`dispatch` keeps at most FAIR_QUEUE_READY_JOBS jobs in
+arq's queue (running and deferred jobs included) and fills the free slots by
+weighted round robin: each company in turn gets up to
+FAIR_QUEUE_INTERACTIVE_WEIGHT interactive jobs, then up to
+FAIR_QUEUE_BULK_WEIGHT bulk jobs, before the next company is served. A single
+upload thus waits for at most one turn of each busy company, not for their
+backlog.
+
+As with src/core/queue.py, callers pass job IDs derived from the item
+(`queue.job_id`): a job whose ID is still waiting, queued, running or holding
+a result is not submitted again, so client retries are idempotent.
+
+Dispatch rounds run after every submission, after every worker job
+(WorkerSettings.after_job_end) and on a cron backstop. Submitting and
+dispatching are single Lua scripts, so concurrent API processes and workers
+never hand out a job twice. Queue depth and time spent in the sub-queue are
+exported per company (fair_queue_depth, fair_queue_wait_seconds).
+
+The scripts touch per-company keys derived inside Lua, which a single Redis
+instance allows but Redis Cluster would not.
+"""
+
+import time
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import Any
+
+import structlog
+from arq.connections import ArqRedis
+from arq.constants import job_key_prefix, result_key_prefix
+
+from src.config import settings
+from src.core.observability import fair_queue_depth, fair_queue_wait_seconds
+from src.core.queue import eval_script, serialize_jobs
+
+logger = structlog.get_logger(__name__)
+
+RING_KEY = "queue:tenants"
+TENANT_KEY_PREFIX = "queue:tenant:"
+
+
+class Priority(StrEnum):
+    interactive = "interactive"
+    bulk = "bulk"
+
+
+def tenant_key(tenant: str, priority: Priority) -> str:
+    return f"{TENANT_KEY_PREFIX}{tenant}:{priority}"
+
+
+# KEYS: ring, tenant's queue for this priority, tenant's other queue
+# ARGV: tenant, now (µs), job key prefix, result key prefix, then job_id, payload pairs
+# Stores each new payload under arq's job key (no expiry until dispatched) and
+# queues its ID (jobs with a job or result key already are skipped); a company
+# whose queues were empty joins the ring. Returns the number of newly queued jobs.
+_SUBMIT_SCRIPT = """
+local idle = redis.call('ZCARD', KEYS[2]) + redis.call('ZCARD', KEYS[3]) == 0
+local added = 0
+for i = 5, #ARGV, 2 do
+    local job_key = ARGV[3] .. ARGV[i]
+    if redis.call('EXISTS', job_key, ARGV[4] .. ARGV[i]) == 0 then
+        redis.call('SET', job_key, ARGV[i + 1])
+        local score = string.format('%.0f', tonumber(ARGV[2]) + (i - 5) / 2)
+        redis.call('ZADD', KEYS[2], score, ARGV[i])
+        added = added + 1
+    end
+end
+if idle and added > 0 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return added
+"""
+
+# KEYS: ring, arq queue
+# ARGV: now (ms), ready target, tenant key prefix, job key prefix, job key TTL (ms),
+#       then priority, weight pairs in priority order
+# Moves jobs from the companies' queues to arq's queue, one company per turn,
+# until arq's queue holds `ready target` jobs or every company is drained, and
+# starts each moved payload's expiry. A job whose payload is gone is dropped
+# rather than handed to arq, which would discard it anyway.
+# Returns {tenant, priority, submitted (µs) triples of the dispatched jobs,
+#          tenant, priority, depth triples of the companies served,
+#          IDs of the dropped jobs}.
+_DISPATCH_SCRIPT = """
+local budget = tonumber(ARGV[2]) - redis.call('ZCARD', KEYS[2])
+local dispatched, depths, missing = {}, {}, {}
+while budget > 0 do
+    local tenant = redis.call('LPOP', KEYS[1])
+    if not tenant then
+        break
+    end
+    local remaining = 0
+    for i = 6, #ARGV, 2 do
+        local key = ARGV[3] .. tenant .. ':' .. ARGV[i]
+        local take = math.min(tonumber(ARGV[i + 1]), budget)
+        if take > 0 then
+            local popped = redis.call('ZPOPMIN', key, take)
+            for j = 1, #popped, 2 do
+                if redis.call('PEXPIRE', ARGV[4] .. popped[j], ARGV[5]) == 1 then
+                    redis.call('ZADD', KEYS[2], ARGV[1], popped[j])
+                    table.insert(dispatched, tenant)
+                    table.insert(dispatched, ARGV[i])
+                    table.insert(dispatched, popped[j + 1])
+                else
+                    table.insert(missing, popped[j])
+                end
+            end
+            budget = budget - #popped / 2
+        end
+        local depth = redis.call('ZCARD', key)
+        remaining = remaining + depth
+        table.insert(depths, tenant)
+        table.insert(depths, ARGV[i])
+        table.insert(depths, depth)
+    end
+    if remaining > 0 then
+        redis.call('RPUSH', KEYS[1], tenant)
+    end
+end
+return {dispatched, depths, missing}
+"""
+
+
+async def submit(
+    pool: ArqRedis,
+    tenant: str,
+    function: str,
+    args_list: Sequence[tuple[Any, ...]],
+    *,
+    priority: Priority,
+    job_ids: Sequence[str] | None = None,
+) -> list[str]:
+    """Queue one `function` job per args tuple for `tenant`, then run a dispatch round.
+
+    Returns the job IDs in the same order as `args_list` — the given `job_ids`,
+    or generated ones. Jobs whose ID already exists are skipped. The jobs are
+    durable once submitted: a failed dispatch round is only logged, the next
+    one picks them up.
+    """
+    if not args_list:
+        return []
+
+    now_us = time.time_ns() // 1000
+    ids, pairs = serialize_jobs(pool, function, args_list, job_ids, now_us // 1000)
+    other = Priority.bulk if priority is Priority.interactive else Priority.interactive
+    added = await eval_script(
+        pool,
+        _SUBMIT_SCRIPT,
+        [RING_KEY, tenant_key(tenant, priority), tenant_key(tenant, other)],
+        [tenant, now_us, job_key_prefix, result_key_prefix, *pairs],
+    )
+    logger.info(
+        "queue.submitted",
+        function=function,
+        tenant=tenant,
+        priority=priority.value,
+        count=len(ids),
+        skipped=len(ids) - added,
+    )
+    await dispatch_safely(pool)
+    return ids
+
+
+async def dispatch(pool: ArqRedis) -> int:
+    """Move queued jobs into arq's queue by weighted round robin; returns how many."""
+    now_ms = int(time.time() * 1000)
+    dispatched, depths, missing = await eval_script(
+        pool,
+        _DISPATCH_SCRIPT,
+        [RING_KEY, pool.default_queue_name],
+        [
+            now_ms,
+            settings.FAIR_QUEUE_READY_JOBS,
+            TENANT_KEY_PREFIX,
+            job_key_prefix,
+            pool.expires_extra_ms,
+            Priority.interactive.value,
+            settings.FAIR_QUEUE_INTERACTIVE_WEIGHT,
+            Priority.bulk.value,
+            settings.FAIR_QUEUE_BULK_WEIGHT,
+        ],
+    )
+    for tenant, priority, submitted_us in _triples(dispatched):
+        fair_queue_wait_seconds.labels(tenant=tenant, priority=priority).observe(
+            max(0.0, now_ms * 1000 - float(submitted_us)) / 1e6
+        )
+    for tenant, priority, depth in _triples(depths):
+        fair_queue_depth.labels(tenant=tenant, priority=priority).set(int(depth))
+    if missing:
+        logger.error("queue.dispatch_payload_missing", job_ids=_decoded(missing))
+    return len(dispatched) // 3
+
+
+async def dispatch_safely(pool: ArqRedis) -> int:
+    """`dispatch`, logging instead of raising when Redis is unavailable."""
+    try:
+        return await dispatch(pool)
+    except Exception as exc:
+        logger.warning("queue.dispatch_failed", error=str(exc))
+        return 0
+
+
+async def dispatch_job(ctx: dict) -> int:
+    """arq cron job: the dispatch backstop for rounds no submission or job end triggered."""
+    return await dispatch(ctx["redis"])
+
+
+def _decoded(flat: list) -> list:
+    return [v.decode() if isinstance(v, bytes) else v for v in flat]
+
+
+def _triples(flat: list) -> list[tuple[str, str, Any]]:
+    values = _decoded(flat)
+    return list(zip(values[0::3], values[1::3], values[2::3], strict=True))
@@ -0,0 +1,57 @@
+"""Event-loop lag monitor for the arq worker.
+
+All jobs of a worker process share one event loop, so any synchronous work
+(encoding, parsing, hashing) stalls every other job for its duration. The
+monitor wakes up every WORKER_LOOP_MONITOR_INTERVAL_SECONDS and records how
+late it was — the time the loop spent blocked — in the event_loop_lag_seconds
+histogram and a running total.
+
+Jobs snapshot `blocked_seconds()` when they start and report the difference
+when they finish: the loop stall that happened while the job was in flight,
+whichever job caused it. Before the monitor is started it reports 0.
+"""
+
+import asyncio
+import contextlib
+
+import structlog
+
+from src.core.observability import event_loop_lag_seconds
+
+logger = structlog.get_logger(__name__)
+
+_task: asyncio.Task | None = None
+_blocked_seconds = 0.0
+
+
+def blocked_seconds() -> float:
+    """Total time the loop has been blocked since the monitor started."""
+    return _blocked_seconds
+
+
+async def _run(interval: float) -> None:
+    global _blocked_seconds
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        _blocked_seconds += lag
+        event_loop_lag_seconds.observe(lag)
+
+
+def start(interval: float) -> None:
+    """Start sampling on the running loop (idempotent; interval <= 0 disables)."""
+    global _task
+    if _task is None and interval > 0:
+        _task = asyncio.get_running_loop().create_task(_run(interval))
+        logger.info("loop_monitor.started", interval=interval)
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _task
+        _task = None
@@ -11,7 +11,7 @@ from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 from src.config import settings
 
@@ -20,7 +20,150 @@ from src.config import settings
 ocr_jobs_total = Counter(
     "ocr_jobs_total",
     "Total OCR jobs processed",
-    ["status"],  # success | failed
+    ["status"],  # success | failed | split (fanned out to child items)
+)
+
+ocr_cache_lookups_total = Counter(
+    "ocr_cache_lookups_total",
+    "OCR result cache lookups by tier",
+    ["tier", "result"],  # tier: local | redis | db — result: hit | miss
+)
+
+principal_cache_lookups_total = Counter(
+    "principal_cache_lookups_total",
+    "Authenticated principal cache lookups by tier",
+    ["tier", "result"],  # tier: local | redis — result: hit | miss
+)
+
+ocr_provider_request_seconds = Histogram(
+    "ocr_provider_request_seconds",
+    "OCR provider HTTP call latency",
+    ["connection"],  # new (paid a TCP/TLS handshake) | reused (keep-alive / HTTP/2 stream)
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+ocr_provider_handshake_seconds = Histogram(
+    "ocr_provider_handshake_seconds",
+    "Time spent opening new TCP + TLS connections to the OCR provider",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+
+ocr_rate_limit_wait_seconds = Histogram(
+    "ocr_rate_limit_wait_seconds",
+    "Time OCR calls waited for shared provider rate-limit capacity",
+    buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 20, 30),
+)
+
+ocr_rate_limited_total = Counter(
+    "ocr_rate_limited_total",
+    "OCR calls turned away for lack of provider capacity",
+    ["reason"],  # budget (limiter wait too long) | provider_429
+)
+
+ocr_provider_retries_total = Counter(
+    "ocr_provider_retries_total",
+    "OCR provider calls retried after a transient failure",
+    ["reason"],  # timeout | transport | http_5xx | http_408
+)
+
+ocr_failures_total = Counter(
+    "ocr_failures_total",
+    "OCR extractions that produced no usable result",
+    ["kind"],  # unreadable (document) | provider (infrastructure) | circuit_open
+)
+
+ocr_split_total = Counter(
+    "ocr_split_total",
+    "Invoice boundary detection on multi-page PDFs",
+    ["outcome"],  # split | single | no_text (scan) | too_long | error
+)
+
+ocr_split_children_total = Counter(
+    "ocr_split_children_total",
+    "Child upload items created by splitting multi-invoice PDFs",
+)
+
+ocr_text_layer_total = Counter(
+    "ocr_text_layer_total",
+    "PDF text-layer fast path outcomes",
+    ["outcome"],  # accepted | incomplete (escalated) | no_text (scan) | error
+)
+
+ocr_text_layer_seconds = Histogram(
+    "ocr_text_layer_seconds",
+    "Time to extract and parse a PDF text layer",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+
+ocr_payload_bytes = Histogram(
+    "ocr_payload_bytes",
+    "Size of the document per OCR job, as uploaded and as sent to the provider",
+    ["stage"],  # original | sent (rasterised pages, or the original when not smaller)
+    buckets=(50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6),
+)
+
+ocr_payload_bytes_saved_total = Counter(
+    "ocr_payload_bytes_saved_total",
+    "Bytes not sent to the OCR provider thanks to page rasterisation",
+)
+
+circuit_breaker_state = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per process: 0 closed, 1 half-open, 2 open",
+    ["name"],
+)
+
+circuit_breaker_transitions_total = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes",
+    ["name", "state"],  # state entered: closed | half_open | open
+)
+
+fair_queue_depth = Gauge(
+    "fair_queue_depth",
+    "Jobs waiting in a company's fair-queue sub-queue, as of the last dispatch round",
+    ["tenant", "priority"],  # priority: interactive (single upload) | bulk
+)
+
+fair_queue_wait_seconds = Histogram(
+    "fair_queue_wait_seconds",
+    "Time a job waited in its company's sub-queue before dispatch to arq",
+    ["tenant", "priority"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 15, 30, 60, 300, 900, 3600),
+)
+
+executor_tasks_total = Counter(
+    "executor_tasks_total",
+    "CPU-bound pipeline steps by where they ran",
+    ["mode"],  # inline (small payload) | process (worker pool) | thread (no pool)
+)
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the worker's loop monitor woke up — time the event loop was blocked",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+job_event_loop_blocked_seconds = Histogram(
+    "job_event_loop_blocked_seconds",
+    "Event-loop blocking observed while a job was running",
+    ["job"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+db_read_sessions_total = Counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened for read endpoints",
+    ["target"],  # replica | primary (no replica, or the company wrote recently)
+)
+
+request_phase_seconds = Histogram(
+    "request_phase_seconds",
+    "Time spent in per-request setup phases before the handler runs",
+    # auth (principal lookup) | tenant_setup (the BEGIN round trip carrying the
+    # RLS set_config, or the set_config statement itself)
+    ["phase"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
 )
 
 # ── Logging ───────────────────────────────────────────────────────────────────
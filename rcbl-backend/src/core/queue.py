@@ -0,0 +1,53 @@
+"""Job IDs and payloads for arq jobs submitted by Lua script.
+
+Uploads are not enqueued with `ArqRedis.enqueue_job` (a WATCH/MULTI/EXEC
+transaction per job) but submitted to the per-company fair queue
+(src/core/fair_queue.py), one script per submission. This module holds what
+that script needs from arq: serialized payloads under arq's job keys, and job
+IDs.
+
+Job IDs should be derived from what the job works on (`job_id("process_ocr",
+item_id)`) rather than generated: like arq's own `_job_id`, a job whose ID is
+still queued, running or holding a result is not submitted again, so a client
+retrying an upload, or a split running twice, never runs a job twice.
+"""
+
+import uuid
+from collections.abc import Awaitable, Sequence
+from typing import Any, cast
+from uuid import uuid4
+
+from arq.connections import ArqRedis
+from arq.jobs import serialize_job
+
+
+def job_id(function: str, key: uuid.UUID | str) -> str:
+    """Deterministic arq job ID for running `function` on `key` (e.g. an item ID)."""
+    return f"{function}:{key}"
+
+
+async def eval_script(pool: ArqRedis, script: str, keys: Sequence[str], args: Sequence[Any]) -> Any:
+    """Run a Lua script on `pool`, numbers sent as the strings redis-py would send."""
+    encoded: list[Any] = [arg if isinstance(arg, str | bytes) else str(arg) for arg in args]
+    return await cast(Awaitable[Any], pool.eval(script, len(keys), *keys, *encoded))
+
+
+def serialize_jobs(
+    pool: ArqRedis,
+    function: str,
+    args_list: Sequence[tuple[Any, ...]],
+    job_ids: Sequence[str] | None,
+    enqueue_time_ms: int,
+) -> tuple[list[str], list[Any]]:
+    """Job IDs (generated when not given) and the flat job_id, payload list for a script."""
+    if job_ids is None:
+        job_ids = [uuid4().hex for _ in args_list]
+    elif len(job_ids) != len(args_list):
+        raise ValueError("job_ids and args_list must have the same length")
+    pairs: list[Any] = []
+    for id_, args in zip(job_ids, args_list, strict=True):
+        payload = serialize_job(
+            function, tuple(args), {}, None, enqueue_time_ms, serializer=pool.job_serializer
+        )
+        pairs += (id_, payload)
+    return list(job_ids), pairs
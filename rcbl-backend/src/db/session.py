@@ -1,18 +1,95 @@
+import time
 from collections.abc import AsyncGenerator
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import text
+import asyncpg
+import structlog
+from sqlalchemy import Connection, event, func, make_url, select, true
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from sqlalchemy.pool import NullPool, Pool
 
 from src.config import settings
+from src.core.observability import db_read_sessions_total, request_phase_seconds
+
+logger = structlog.get_logger(__name__)
+
+
+class TenantConnection(asyncpg.Connection):
+    """asyncpg connection that sends a pending statement in the same query as BEGIN.
+
+    SQLAlchemy's asyncpg adapter sends BEGIN lazily, right before a
+    transaction's first statement, through asyncpg's simple-query protocol
+    (`execute` without arguments), which accepts several statements at once.
+    Appending the tenant's set_config there saves its round trip; the simple
+    protocol prepares nothing, so the per-tenant literal never reaches the
+    statement cache. The round trip that carries it is the tenant_setup phase
+    of request_phase_seconds.
+    """
+
+    _with_begin: str | None = None
+
+    def send_with_begin(self, statement: str | None) -> None:
+        self._with_begin = statement
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        if self._with_begin and not args and query.startswith("BEGIN"):
+            query, self._with_begin = f"{query} {self._with_begin}", None
+            start = time.perf_counter()
+            result = await super().execute(query, timeout=timeout)
+            request_phase_seconds.labels(phase="tenant_setup").observe(time.perf_counter() - start)
+            return result
+        return await super().execute(query, *args, timeout=timeout)
+
+
+def _engine_options(database_url: str, pool_mode: str) -> dict:
+    """Pool and driver options for create_async_engine.
+
+    Behind PgBouncer in transaction pooling mode, consecutive transactions of
+    one client connection can land on different server connections, so:
+
+    - PgBouncer does the pooling; an app-side pool would only pin its server
+      connections, and pre-ping would cost a round trip per checkout.
+    - Prepared statements may not outlive a transaction: both asyncpg caches
+      are off, and each statement gets a unique name so two clients sharing
+      a server connection never collide on asyncpg's `__asyncpg_stmt_N__`.
+
+    The RLS tenant context needs nothing extra: it is set with
+    set_config(..., is_local => true), which lasts exactly one transaction.
+    asyncpg connections are TenantConnections, so it can ride along with BEGIN.
+    """
+    is_asyncpg = make_url(database_url).get_driver_name() == "asyncpg"
+    if pool_mode == "pgbouncer":
+        options: dict = {"poolclass": NullPool}
+        if is_asyncpg:
+            options["connect_args"] = {
+                "connection_class": TenantConnection,
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+    if is_asyncpg:
+        # Room for every repository query (and the filter/option variants of
+        # the list queries) so none is re-prepared after LRU eviction.
+        options["connect_args"] = {
+            "connection_class": TenantConnection,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
 
 engine = create_async_engine(
     settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+    query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
     echo=settings.ENVIRONMENT == "development",
+    **_engine_options(settings.DATABASE_URL, settings.DB_POOL_MODE),
 )
 
 async_session_factory = async_sessionmaker(
@@ -22,6 +99,37 @@ async_session_factory = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only endpoints go through get_read_session. Without a replica it reads
+# from the primary — still in a READ ONLY transaction, so behaviour is the same
+# whether or not DATABASE_REPLICA_URL is set.
+replica_engine = (
+    create_async_engine(
+        settings.DATABASE_REPLICA_URL,
+        query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
+        echo=settings.ENVIRONMENT == "development",
+        **_engine_options(settings.DATABASE_REPLICA_URL, settings.DB_POOL_MODE),
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+primary_read_session_factory = async_sessionmaker(
+    engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+replica_session_factory = (
+    async_sessionmaker(
+        replica_engine.execution_options(postgresql_readonly=True),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+    if replica_engine is not None
+    else None
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -37,12 +145,109 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+async def get_read_session(*, use_replica: bool = True) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a read-only session, on the replica when configured and `use_replica`.
+
+    Nothing is committed: the transaction is rolled back when the session closes.
+    """
+    factory = primary_read_session_factory
+    if use_replica and replica_session_factory is not None:
+        factory = replica_session_factory
+    target = "replica" if factory is replica_session_factory else "primary"
+    db_read_sessions_total.labels(target=target).inc()
+    async with factory() as session:
+        yield session
+
+
+# ── Read-your-writes window ───────────────────────────────────────────────────
+#
+# Writers mark their company in Redis for REPLICA_READ_YOUR_WRITES_SECONDS —
+# get_tenant_db when a request opens a writable session, OCR jobs after each
+# commit — and get_tenant_read_db sends a marked company to the primary. A Redis
+# error on the read side counts as a recent write.
+
+
+def _last_write_key(company_id: UUID) -> str:
+    return f"db:last_write:{company_id}"
+
+
+async def mark_recent_write(redis, company_id: UUID) -> None:
+    if redis is None:
+        return
+    try:
+        await redis.set(
+            _last_write_key(company_id), "1", ex=settings.REPLICA_READ_YOUR_WRITES_SECONDS
+        )
+    except Exception as exc:
+        logger.warning("db.mark_recent_write_failed", error=str(exc))
+
+
+async def has_recent_write(redis, company_id: UUID) -> bool:
+    if redis is None:
+        return True
+    try:
+        return await redis.get(_last_write_key(company_id)) is not None
+    except Exception as exc:
+        logger.warning("db.recent_write_check_failed", error=str(exc))
+        return True
+
+
+# ── Tenant (RLS) context ──────────────────────────────────────────────────────
+
+TENANT_SETTING = "app.current_company_id"
+
+_TENANT_INFO_KEY = "tenant_company_id"
+# RLS policies only exist on PostgreSQL; other dialects (SQLite in tests) skip it.
+_TENANT_CONTEXT_DIALECTS = frozenset({"postgresql"})
+
+
+@event.listens_for(Pool, "checkin")
+def _drop_unsent_tenant_context(dbapi_connection, connection_record) -> None:
+    # A session that began a transaction but never ran a statement leaves its
+    # context pending; the next checkout may serve another company.
+    driver = getattr(dbapi_connection, "driver_connection", None)
+    if isinstance(driver, TenantConnection):
+        driver.send_with_begin(None)
+
+
+def _apply_tenant_context(connection: Connection, company_id: UUID) -> None:
+    if connection.dialect.name not in _TENANT_CONTEXT_DIALECTS:
+        return
+    driver = connection.connection.driver_connection
+    if isinstance(driver, TenantConnection) and not driver.is_in_transaction():
+        # BEGIN not sent yet: ride along with it (timed there). UUID() keeps the
+        # literal safe.
+        driver.send_with_begin(
+            f"SELECT set_config('{TENANT_SETTING}', '{UUID(str(company_id))}', true);"
+        )
+        return
+    # set_config(..., is_local => true) is SET LOCAL with a bind parameter: one
+    # statement text for every tenant, so it stays in the prepared-statement cache.
+    start = time.perf_counter()
+    connection.execute(select(func.set_config(TENANT_SETTING, str(company_id), true())))
+    request_phase_seconds.labels(phase="tenant_setup").observe(time.perf_counter() - start)
+
+
+@event.listens_for(Session, "after_begin")
+def _set_tenant_on_begin(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    company_id = session.info.get(_TENANT_INFO_KEY)
+    if company_id is not None:
+        _apply_tenant_context(connection, company_id)
+
+
 async def set_tenant_context(session: AsyncSession, company_id: UUID) -> None:
-    """Set PostgreSQL RLS context variable for the current transaction.
+    """Scope the session to a company for PostgreSQL RLS.
 
-    asyncpg does not support $1 placeholders in SET LOCAL statements — the value
-    must be a quoted string literal embedded directly in the SQL.
-    The company_id is a UUID so there is no injection risk.
+    Nothing is sent here: the context is set at the start of the session's
+    next transaction — on asyncpg in the same query as its BEGIN, otherwise as
+    its first statement — and again after every commit or rollback (it is
+    transaction-local). Only when a transaction is already open — e.g. the
+    principal lookup missed the cache and queried users — is it applied
+    immediately.
     """
-    safe_id = str(company_id).replace("'", "")  # strip any stray quotes (UUID is always safe)
-    await session.execute(text(f"SET LOCAL app.current_company_id = '{safe_id}'"))
+    session.info[_TENANT_INFO_KEY] = company_id
+    if session.in_transaction():
+        connection = await session.connection()
+        await connection.run_sync(_apply_tenant_context, company_id)
@@ -47,7 +47,10 @@ def _rate_limit_exceeded_handler_with_logging(request: Request, exc: RateLimitEx
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: configure tracing, create shared arq pool, ensure S3 bucket. Shutdown: cleanup."""
+    """Startup: configure tracing, create shared arq pool + S3 client, ensure S3 bucket.
+
+    Shutdown: cleanup.
+    """
     logger.info("app.starting", environment=settings.ENVIRONMENT)
 
     configure_tracing(app=app, engine=engine)
@@ -59,17 +62,27 @@ async def lifespan(app: FastAPI):
     app.state.arq_pool = await create_pool(RedisSettings.from_dsn(settings.REDIS_URL))
     logger.info("arq.pool_created")
 
+    from src.modules.auth import principal
+
+    principal.bind_redis(app.state.arq_pool)
+
+    # ── Shared S3 client (one connection pool for the lifetime of the process) ─
+    from src.clients import s3_client
+
+    await s3_client.start_client()
+
     if settings.ENVIRONMENT == "development":
         try:
-            from src.clients.s3_client import ensure_bucket_exists
-            await ensure_bucket_exists()
+            await s3_client.ensure_bucket_exists()
         except Exception as exc:
             logger.warning("startup.s3_bucket_check_failed", error=str(exc))
 
     logger.info("app.ready")
     yield
 
+    principal.bind_redis(None)
     await app.state.arq_pool.aclose()
+    await s3_client.close_client()
     await engine.dispose()
     logger.info("app.shutdown")
 
@@ -100,6 +113,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],  # batch list pagination cursor
     )
 
     # ── Request ID + structured log context ────────────────────────────────────
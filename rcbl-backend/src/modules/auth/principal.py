@@ -0,0 +1,157 @@
+"""Authenticated principal cache — who a valid access token belongs to.
+
+Most authenticated routes only need the caller's user id and company id, yet
+resolving them meant a `SELECT users` per request. `get` answers from two
+short-TTL tiers before falling back to the database:
+
+  1. In-process LRU (per API process, PRINCIPAL_CACHE_LOCAL_TTL_SECONDS)
+  2. Redis `cache:principal:{user_id}` (PRINCIPAL_CACHE_TTL_SECONDS), once
+     `bind_redis` has been called at startup
+
+Only active users are cached. Any flushed change to a User row (soft delete,
+company move, profile edit) drops the entry from the local tier and — after
+the transaction commits — from Redis. Bulk `update(User)` statements bypass
+the ORM events and must call `invalidate` themselves. Other processes' local
+tiers are only bounded by their TTL, which is why it is kept short.
+"""
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from src.config import settings
+from src.core.cache import TTLCache
+from src.core.observability import principal_cache_lookups_total
+from src.modules.auth.models import User
+
+logger = structlog.get_logger(__name__)
+
+_PENDING_INVALIDATIONS = "principal_cache.pending_invalidations"
+
+_local: TTLCache[uuid.UUID, "Principal"] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_LOCAL_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+)
+_redis = None
+_background_tasks: set[asyncio.Task] = set()
+
+# Prebuilt so a cache miss skips statement construction and cache-key generation.
+_ACTIVE_USER_STMT = select(User.id, User.company_id).where(
+    User.id == bindparam("user_id"),
+    User.deleted_at.is_(None),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated caller: enough to authorise and scope a request."""
+
+    id: uuid.UUID
+    company_id: uuid.UUID
+
+
+def bind_redis(redis) -> None:
+    """Enable the shared Redis tier (called from the app lifespan)."""
+    global _redis
+    _redis = redis
+
+
+def cache_key(user_id: uuid.UUID) -> str:
+    return f"cache:principal:{user_id}"
+
+
+async def get(db: AsyncSession, user_id: uuid.UUID) -> Principal | None:
+    """Principal of an active user, or None if the user is missing or soft-deleted."""
+    principal = _local.get(user_id)
+    if principal is not None:
+        principal_cache_lookups_total.labels(tier="local", result="hit").inc()
+        return principal
+    principal_cache_lookups_total.labels(tier="local", result="miss").inc()
+
+    if _redis is not None:
+        try:
+            raw = await _redis.get(cache_key(user_id))
+        except Exception as exc:
+            logger.warning("principal_cache.redis_get_failed", error=str(exc))
+            raw = None
+        if raw is not None:
+            principal_cache_lookups_total.labels(tier="redis", result="hit").inc()
+            data = json.loads(raw)
+            principal = Principal(id=user_id, company_id=uuid.UUID(data["company_id"]))
+            _local.set(user_id, principal)
+            return principal
+        principal_cache_lookups_total.labels(tier="redis", result="miss").inc()
+
+    row = (await db.execute(_ACTIVE_USER_STMT, {"user_id": user_id})).one_or_none()
+    if row is None:
+        return None
+    principal = Principal(id=row.id, company_id=row.company_id)
+    await put(principal)
+    return principal
+
+
+async def put(principal: Principal) -> None:
+    _local.set(principal.id, principal)
+    if _redis is None:
+        return
+    try:
+        await _redis.set(
+            cache_key(principal.id),
+            json.dumps({"company_id": str(principal.company_id)}),
+            ex=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("principal_cache.redis_set_failed", error=str(exc))
+
+
+async def invalidate(*user_ids: uuid.UUID) -> None:
+    """Drop users from both tiers."""
+    for user_id in user_ids:
+        _local.pop(user_id)
+    if _redis is None or not user_ids:
+        return
+    try:
+        await _redis.delete(*(cache_key(user_id) for user_id in user_ids))
+    except Exception as exc:
+        logger.warning("principal_cache.redis_delete_failed", error=str(exc))
+
+
+# ── ORM-driven invalidation ───────────────────────────────────────────────────
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    _local.pop(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if not user_ids:
+        return
+    # Drop again: a concurrent request may have re-cached the pre-commit row.
+    for user_id in user_ids:
+        _local.pop(user_id)
+    if _redis is None:
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(invalidate(*user_ids))
+    except RuntimeError:
+        return  # no running loop (sync tooling) — nothing shared to invalidate
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
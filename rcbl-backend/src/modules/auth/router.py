@@ -7,10 +7,11 @@ from fastapi import APIRouter, Cookie, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import settings
-from src.core.deps import get_current_user, get_db
+from src.core.deps import get_current_principal, get_current_user, get_db
 from src.core.rate_limit import limiter
 from src.modules.auth import service
 from src.modules.auth.models import User
+from src.modules.auth.principal import Principal
 from src.modules.auth.schemas import (
     CompanyResponse,
     LoginRequest,
@@ -81,7 +82,7 @@ async def refresh(
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(
     response: Response,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> None:
     """Clear auth cookies. In production, also blocklist the jti in Redis."""
     response.delete_cookie(_ACCESS_COOKIE)
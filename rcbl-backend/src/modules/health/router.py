@@ -34,6 +34,19 @@ async def readiness(db: AsyncSession = Depends(get_db)) -> JSONResponse:
         healthy = False
         logger.error("health.database_failed", error=str(exc))
 
+    # Read replica check (only when DATABASE_REPLICA_URL is set)
+    from src.db.session import replica_engine
+
+    if replica_engine is not None:
+        try:
+            async with replica_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            checks["database_replica"] = "ok"
+        except Exception as exc:
+            checks["database_replica"] = f"error: {exc}"
+            healthy = False
+            logger.error("health.database_replica_failed", error=str(exc))
+
     # Redis check
     try:
         from redis.asyncio import Redis
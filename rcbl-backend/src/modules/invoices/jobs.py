@@ -3,38 +3,90 @@
 Called by the arq worker (src/worker.py) when a new UploadItem is enqueued.
 
 Job flow:
-  1. Load UploadItem from DB
-  2. Mark status → "processing"
-  3. Download file bytes from S3
-  4. Call OCR client (OpenAI Vision with fallback)
-  5. Update item with OCR results and set status (ready | review_pending | failed)
-  6. Increment batch counters and finalise batch status when all items are done
+  1. Load the UploadItem from the DB. An item already "split" (a retry after
+     its split was committed) only re-submits its queued children.
+  2. Mark status → "processing".
+  3. Cache: look up the OCR result by file_hash (LRU → Redis → earlier item
+     of the same company); a hit skips steps 4-8.
+  4. Split: wait for provider capacity (ocr_rate_limit.wait_for_capacity),
+     so a job the limiter defers has done no work yet, then download the
+     file bytes from S3. A PDF holding several invoices
+     is split into one child item per invoice (splitting.py); the children
+     are submitted as their own process_ocr jobs and this item ends as
+     "split". Split parents never populate the cache, so a hit in step 3 is
+     never a multi-invoice PDF.
+  5. Text layer: read born-digital PDFs from their text layer (text_layer.py).
+  6. Preprocess: when that yields no complete result, render the first and
+     totals pages to compressed JPEGs (ocr_preprocess.py).
+  7. Provider: call the OCR client (OpenAI Vision), with a deadline
+     OCR_JOB_TIMEOUT_MARGIN_SECONDS before arq's job_timeout so the call is
+     never cancelled mid-flight. The text layer or provider result populates
+     the cache.
+  8. Retry: if the provider is rate limited or unavailable (retries
+     exhausted, circuit breaker open), the item goes back to "queued" and the
+     job is deferred (arq Retry) instead of degrading — up to
+     OCR_RATE_LIMIT_MAX_DEFERRALS times. Deferrals by the fleet's own limiter
+     are counted per item in Redis instead, up to
+     OCR_RATE_LIMIT_MAX_LIMITER_DEFERRALS, so they don't use up those tries.
+  9. Update the item with the OCR result and set its status (ready |
+     review_pending | failed).
+ 10. Increment the batch counters and finalise the batch status when all
+     items are done.
+
+Every item and batch state change is also published to the batch's progress
+channel (src/modules/invoices/progress.py) for the SSE endpoint.
+
+CPU-heavy steps run in the worker's process pool (src/core/executor.py); the
+event-loop stall observed while the job ran (src/core/loop_monitor.py) is
+logged with ocr.completed and exported as job_event_loop_blocked_seconds.
 """
 
+import time
 import uuid
 
 import structlog
+from arq import Retry
 
-from src.core.observability import ocr_jobs_total
+from src.clients.ocr_client import OCRProviderUnavailable
+from src.clients.ocr_rate_limit import OCRRateLimited
+from src.core import fair_queue, loop_monitor, queue
+from src.core.observability import job_event_loop_blocked_seconds, ocr_jobs_total
 
 logger = structlog.get_logger(__name__)
 
 
 async def process_ocr(ctx: dict, item_id: str, company_id: str) -> None:
     """
-    arq job entrypoint. ctx["db_session"] is injected by WorkerSettings.startup.
+    arq job entrypoint. ctx["redis"] is the worker's ArqRedis connection (used for the
+    OCR result cache and progress events; both are skipped when it is absent).
     Uses a plain (non-tenant-scoped) session since the worker runs outside a request.
     """
-    from src.clients import ocr_client, s3_client
+    from src.clients import ocr_client, ocr_rate_limit, s3_client
     from src.config import settings
-    from src.db.session import async_session_factory
-    from src.modules.invoices import repository
+    from src.db.session import async_session_factory, mark_recent_write
+    from src.modules.invoices import (
+        ocr_cache,
+        ocr_preprocess,
+        progress,
+        repository,
+        splitting,
+        text_layer,
+    )
     from src.modules.invoices.models import ItemStatus
 
     item_uuid = uuid.UUID(item_id)
-    uuid.UUID(company_id)
+    company_uuid = uuid.UUID(company_id)
+    redis = ctx.get("redis")
 
     item = None  # declared here so error handler can safely reference it
+    limiter_deferrals = 0
+    # arq cancels the job at job_timeout: the provider call must be over before then.
+    deadline = (
+        time.monotonic()
+        + settings.OCR_JOB_TIMEOUT_SECONDS
+        - settings.OCR_JOB_TIMEOUT_MARGIN_SECONDS
+    )
+    blocked_at_start = loop_monitor.blocked_seconds()
     async with async_session_factory() as db:
         try:
             # ── Step 1: Load item ──────────────────────────────────────────────
@@ -42,20 +94,90 @@ async def process_ocr(ctx: dict, item_id: str, company_id: str) -> None:
             if item is None:
                 logger.error("ocr.item_not_found", item_id=item_id)
                 return
+            if item.status == ItemStatus.split_parent.value:
+                # Retry after the split was committed: only the fan-out can be missing.
+                child_ids = await repository.list_child_item_ids(
+                    db, item_uuid, status=ItemStatus.queued
+                )
+                await _enqueue_children(redis, item_id, child_ids, company_id)
+                return
 
             logger.info("ocr.started", item_id=item_id, file_name=item.file_name)
 
             # ── Step 2: Mark processing ────────────────────────────────────────
             await repository.update_item_status(db, item_uuid, ItemStatus.processing)
             await db.commit()
+            await mark_recent_write(redis, company_uuid)
+            await progress.publish_item(
+                redis,
+                item.batch_id,
+                item_uuid,
+                file_name=item.file_name,
+                status=ItemStatus.processing.value,
+            )
+
+            # ── Step 3: OCR result cache ───────────────────────────────────────
+            result = None
+            if item.file_hash:
+                lookup_start = time.monotonic()
+                result = await ocr_cache.get(db, redis, item.file_hash, company_uuid)
+                if result is not None:
+                    result.processing_ms = int((time.monotonic() - lookup_start) * 1000)
+                    logger.info("ocr.cache_hit", item_id=item_id, file_hash=item.file_hash)
 
-            # ── Step 3: Download from S3 ───────────────────────────────────────
-            file_bytes = await s3_client.download_file(item.file_url)
+            if result is None:
+                # ── Step 4: Provider capacity, download from S3 + split ────────
+                limiter_deferrals = await _limiter_deferrals(redis, item_id)
+                if limiter_deferrals < settings.OCR_RATE_LIMIT_MAX_LIMITER_DEFERRALS:
+                    await ocr_rate_limit.wait_for_capacity()
+                file_bytes = await s3_client.download_file(item.file_url)
+                split = None
+                if redis is not None:
+                    split = await splitting.split_item(db, item, file_bytes)
+                if split is not None:
+                    child_ids, batch = split
+                    await db.commit()
+                    await mark_recent_write(redis, company_uuid)
+                    await progress.publish_item(
+                        redis,
+                        item.batch_id,
+                        item_uuid,
+                        file_name=item.file_name,
+                        status=ItemStatus.split_parent.value,
+                    )
+                    if batch is not None:
+                        await progress.publish_batch(redis, batch)
+                    await _enqueue_children(redis, item_id, child_ids, company_id)
+                    ocr_jobs_total.labels(status="split").inc()
+                    return
 
-            # ── Step 4: Run OCR ────────────────────────────────────────────────
-            result = await ocr_client.extract_invoice(file_bytes)
+                # ── Steps 5-7: Text layer, else preprocess + provider ──────────
+                result = await text_layer.extract_invoice(file_bytes)
+                if result is None:
+                    prepared = await ocr_preprocess.prepare_for_vision(file_bytes)
+                    sent_bytes = prepared.sent_bytes if prepared else len(file_bytes)
+                    logger.info(
+                        "ocr.payload_prepared",
+                        item_id=item_id,
+                        original_bytes=len(file_bytes),
+                        sent_bytes=sent_bytes,
+                        saved_bytes=len(file_bytes) - sent_bytes,
+                        pages=prepared.pages if prepared else None,
+                        page_count=prepared.page_count if prepared else None,
+                    )
+                    result = await ocr_client.extract_invoice(
+                        file_bytes,
+                        page_images=prepared.images if prepared else None,
+                        defer_when_unavailable=ctx.get("job_try", 1) - limiter_deferrals
+                        <= settings.OCR_RATE_LIMIT_MAX_DEFERRALS,
+                        deadline=deadline,
+                    )
+                else:
+                    logger.info("ocr.text_layer_hit", item_id=item_id)
+                if item.file_hash:
+                    await ocr_cache.put(redis, item.file_hash, company_uuid, result)
 
-            # ── Step 5: Determine status ───────────────────────────────────────
+            # ── Step 9: Determine status ───────────────────────────────────────
             if result.confidence >= settings.OCR_CONFIDENCE_THRESHOLD:
                 new_status = ItemStatus.ready
             else:
@@ -70,6 +192,8 @@ async def process_ocr(ctx: dict, item_id: str, company_id: str) -> None:
                 "vendor_name": result.vendor_name,
                 "raw_text": result.raw_text,
             }
+            if result.failure:
+                ocr_data["failure"] = result.failure
 
             await repository.update_item_ocr_result(
                 db,
@@ -80,10 +204,21 @@ async def process_ocr(ctx: dict, item_id: str, company_id: str) -> None:
                 status=new_status,
             )
             await db.commit()
+            await mark_recent_write(redis, company_uuid)
+            await progress.publish_item(
+                redis,
+                item.batch_id,
+                item_uuid,
+                file_name=item.file_name,
+                status=new_status.value,
+                confidence=result.confidence,
+            )
 
-            # ── Step 6: Update batch counters ──────────────────────────────────
-            await repository.increment_batch_counters(db, item.batch_id, success=True)
+            # ── Step 10: Update batch counters ─────────────────────────────────
+            batch = await repository.increment_batch_counters(db, item.batch_id, success=True)
             await db.commit()
+            if batch is not None:
+                await progress.publish_batch(redis, batch)
 
             ocr_jobs_total.labels(status="success").inc()
             logger.info(
@@ -92,20 +227,123 @@ async def process_ocr(ctx: dict, item_id: str, company_id: str) -> None:
                 status=new_status.value,
                 confidence=result.confidence,
                 processing_ms=result.processing_ms,
+                loop_blocked_ms=int((loop_monitor.blocked_seconds() - blocked_at_start) * 1000),
+            )
+
+        except (OCRRateLimited, OCRProviderUnavailable) as exc:
+            # ── Step 8: Retry later ────────────────────────────────────────────
+            # No provider capacity: requeue rather than store a placeholder result.
+            if (
+                exc.reason == "limiter"
+                and limiter_deferrals < settings.OCR_RATE_LIMIT_MAX_LIMITER_DEFERRALS
+            ):
+                await _record_limiter_deferral(redis, item_id, limiter_deferrals + 1)
+            await repository.update_item_status(db, item_uuid, ItemStatus.queued)
+            await db.commit()
+            await mark_recent_write(redis, company_uuid)
+            if item is not None:  # always loaded: only the provider call raises these
+                await progress.publish_item(
+                    redis,
+                    item.batch_id,
+                    item_uuid,
+                    file_name=item.file_name,
+                    status=ItemStatus.queued.value,
+                )
+            logger.info(
+                "ocr.deferred",
+                item_id=item_id,
+                job_try=ctx.get("job_try", 1),
+                retry_after=exc.retry_after,
+                reason=exc.reason,
             )
+            raise Retry(defer=exc.retry_after) from exc
+
+        except Retry:
+            raise
 
         except Exception as exc:
             logger.error("ocr.failed", item_id=item_id, error=str(exc), exc_info=True)
             try:
+                batch = None
                 async with async_session_factory() as err_db:
                     await repository.update_item_failed(err_db, item_uuid, error_message=str(exc))
                     if item is not None:
-                        await repository.increment_batch_counters(
+                        batch = await repository.increment_batch_counters(
                             err_db, item.batch_id, success=False
                         )
                     await err_db.commit()
+                await mark_recent_write(redis, company_uuid)
+                if item is not None and item.file_hash:
+                    # A result cached before the failure must not outlive the item.
+                    await ocr_cache.invalidate(redis, item.file_hash, company_uuid)
+                if item is not None:
+                    await progress.publish_item(
+                        redis,
+                        item.batch_id,
+                        item_uuid,
+                        file_name=item.file_name,
+                        status=ItemStatus.failed.value,
+                    )
+                if batch is not None:
+                    await progress.publish_batch(redis, batch)
             except Exception as inner_exc:
                 logger.error("ocr.error_handler_failed", error=str(inner_exc))
 
             ocr_jobs_total.labels(status="failed").inc()
             raise
+
+        finally:
+            job_event_loop_blocked_seconds.labels(job="process_ocr").observe(
+                loop_monitor.blocked_seconds() - blocked_at_start
+            )
+
+
+# Deferrals caused only by the fleet's own rate limiter, per item. Kept apart from
+# arq's job_try so that they don't use up the tries meant for provider outages.
+_LIMITER_DEFERRALS_KEY = "ocr:limiter_deferrals:{}"
+_LIMITER_DEFERRALS_TTL_SECONDS = 86_400
+
+
+async def _limiter_deferrals(redis, item_id: str) -> int:
+    if redis is None:
+        return 0
+    try:
+        return int(await redis.get(_LIMITER_DEFERRALS_KEY.format(item_id)) or 0)
+    except Exception as exc:
+        logger.warning("ocr.limiter_deferrals_unavailable", item_id=item_id, error=str(exc))
+        return 0
+
+
+async def _record_limiter_deferral(redis, item_id: str, count: int) -> None:
+    """Store the item's new limiter deferral count (one job per item runs at a time)."""
+    if redis is None:
+        return
+    try:
+        await redis.set(
+            _LIMITER_DEFERRALS_KEY.format(item_id), str(count), ex=_LIMITER_DEFERRALS_TTL_SECONDS
+        )
+    except Exception as exc:
+        logger.warning("ocr.limiter_deferrals_unavailable", item_id=item_id, error=str(exc))
+
+
+# Delay before retrying a split whose children could not be enqueued.
+_CHILD_ENQUEUE_RETRY_SECONDS = 5
+
+
+async def _enqueue_children(
+    redis, item_id: str, child_ids: list[uuid.UUID], company_id: str
+) -> None:
+    """Submit one process_ocr job per split child (bulk lane); on failure retry the parent job."""
+    try:
+        await fair_queue.submit(
+            redis,
+            company_id,
+            "process_ocr",
+            [(str(child_id), company_id) for child_id in child_ids],
+            priority=fair_queue.Priority.bulk,
+            job_ids=[queue.job_id("process_ocr", child_id) for child_id in child_ids],
+        )
+    except Exception as exc:
+        logger.warning("ocr.split_enqueue_failed", item_id=item_id, error=str(exc))
+        raise Retry(defer=_CHILD_ENQUEUE_RETRY_SECONDS) from exc
+    logger.info("ocr.split_enqueued", item_id=item_id, children=len(child_ids))
@@ -6,6 +6,7 @@ Mapped from Flyway migrations:
   V011__create_invoice_upload_items.sql
   V021__add_soft_deletes.sql       (deleted_at on invoices)
   V022__add_optimistic_locking.sql (version on invoices)
+  V110__add_upload_item_splitting.sql (parent_item_id, status 'split')
 """
 
 import uuid
@@ -106,6 +107,9 @@ class ItemStatus(StrEnum):
     accepted = "accepted"
     rejected = "rejected"
     failed = "failed"
+    # Multi-invoice PDF replaced by one child item per invoice (V110). Not
+    # named `split`: that would shadow str.split on this StrEnum.
+    split_parent = "split"
 
 
 # ── ORM Models ────────────────────────────────────────────────────────────────
@@ -173,11 +177,20 @@ class UploadItem(Base):
     file_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     file_size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False)
+    # FK → invoice_upload_items(id) CASCADE — set on items split out of a multi-invoice PDF
+    parent_item_id: Mapped[uuid.UUID | None] = mapped_column(
+        UuidType(),
+        ForeignKey("invoice_upload_items.id", ondelete="CASCADE"),
+        nullable=True,
+    )
     # DECIMAL(3,2) CHECK (0-1)
     ocr_confidence_score: Mapped[Decimal | None] = mapped_column(
         Numeric(3, 2), nullable=True
     )
-    ocr_extracted_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Carries the provider's full raw_text — deferred, load with undefer() where needed
+    ocr_extracted_data: Mapped[dict | None] = mapped_column(
+        JSON, nullable=True, deferred=True, deferred_raiseload=True
+    )
     ocr_processing_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     # FK → invoices(id) SET NULL — populated after acceptance
@@ -246,7 +259,10 @@ class Invoice(Base):
     # ── OCR fields ─────────────────────────────────────────────────────────────
     ocr_processed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     ocr_confidence_score: Mapped[Decimal | None] = mapped_column(Numeric(3, 2), nullable=True)
-    ocr_extracted_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Copy of the upload item's OCR JSON (incl. raw_text) — deferred like UploadItem's
+    ocr_extracted_data: Mapped[dict | None] = mapped_column(
+        JSON, nullable=True, deferred=True, deferred_raiseload=True
+    )
     # FK to invoice_upload_items — added by V012 migration
     upload_item_id: Mapped[uuid.UUID | None] = mapped_column(
         UuidType(), nullable=True
@@ -0,0 +1,145 @@
+"""Content-addressed OCR result cache keyed by company and the file's SHA-256.
+
+Byte-identical files always produce the same OCR input, so a result can be
+reused for any later upload of the same company with the same file_hash.
+Every tier is scoped to the company: another tenant's extracted data is never
+returned, and a hit never reveals that another tenant uploaded the same file.
+Lookups go through three tiers, cheapest first:
+
+  1. In-process LRU (per worker process)
+  2. Redis `cache:ocr:{company_id}:{file_hash}` with OCR_CACHE_TTL_SECONDS expiry
+  3. ocr_extracted_data of an earlier item of the same company with that hash
+
+Hits from a slower tier are written back to the faster ones. Every tier is
+best-effort: a Redis or DB error is logged and treated as a miss.
+
+When an item is rejected or fails, `invalidate` deletes the Redis entry (the
+DB tier already skips such items). LRU entries of other processes cannot be
+reached from there, so a local hit only counts while the Redis entry still
+exists — one EXISTS, without transferring the result.
+"""
+
+import dataclasses
+import json
+import uuid
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.clients.ocr_client import OCRResult
+from src.config import settings
+from src.core.cache import TTLCache
+from src.core.observability import ocr_cache_lookups_total
+from src.modules.invoices import repository
+
+logger = structlog.get_logger(__name__)
+
+_local: TTLCache[str, OCRResult] = TTLCache(
+    maxsize=settings.OCR_CACHE_LOCAL_MAX_ENTRIES,
+    ttl=settings.OCR_CACHE_TTL_SECONDS,
+)
+
+
+def cache_key(company_id: uuid.UUID, file_hash: str) -> str:
+    return f"cache:ocr:{company_id}:{file_hash}"
+
+
+def is_cacheable(result: OCRResult) -> bool:
+    """Placeholder results from a failed provider call carry no raw_text — never cache them."""
+    return result.raw_text is not None
+
+
+async def get(
+    db: AsyncSession,
+    redis,
+    file_hash: str,
+    company_id: uuid.UUID,
+) -> OCRResult | None:
+    """Return the company's cached OCR result for `file_hash`, or None on a miss in every tier."""
+    key = cache_key(company_id, file_hash)
+    result = _local.get(key)
+    if result is not None and redis is not None and not await _in_redis(redis, key):
+        _local.pop(key)  # invalidated, or expired from the shared tier
+        result = None
+    if result is not None:
+        ocr_cache_lookups_total.labels(tier="local", result="hit").inc()
+        return dataclasses.replace(result)
+    ocr_cache_lookups_total.labels(tier="local", result="miss").inc()
+
+    if redis is not None:
+        try:
+            raw = await redis.get(key)
+        except Exception as exc:
+            logger.warning("ocr_cache.redis_get_failed", error=str(exc))
+            raw = None
+        if raw is not None:
+            ocr_cache_lookups_total.labels(tier="redis", result="hit").inc()
+            result = OCRResult(**json.loads(raw))
+            _local.set(key, result)
+            return dataclasses.replace(result)
+        ocr_cache_lookups_total.labels(tier="redis", result="miss").inc()
+
+    try:
+        row = await repository.get_ocr_result_by_hash(db, company_id, file_hash)
+    except Exception as exc:
+        logger.warning("ocr_cache.db_lookup_failed", error=str(exc))
+        row = None
+    if row is None or row[0].get("raw_text") is None:
+        # No earlier item, or only a placeholder from a failed OCR run — never reuse those.
+        ocr_cache_lookups_total.labels(tier="db", result="miss").inc()
+        return None
+
+    ocr_cache_lookups_total.labels(tier="db", result="hit").inc()
+    ocr_data, confidence = row
+    amount = ocr_data.get("amount")
+    result = OCRResult(
+        invoice_number=ocr_data.get("invoice_number"),
+        amount=float(amount) if amount is not None else None,
+        currency=ocr_data.get("currency"),
+        invoice_date=ocr_data.get("invoice_date"),
+        due_date=ocr_data.get("due_date"),
+        vendor_name=ocr_data.get("vendor_name"),
+        raw_text=ocr_data.get("raw_text"),
+        confidence=float(confidence) if confidence is not None else 0.0,
+        processing_ms=0,
+    )
+    await put(redis, file_hash, company_id, result)
+    return dataclasses.replace(result)
+
+
+async def put(redis, file_hash: str, company_id: uuid.UUID, result: OCRResult) -> None:
+    """Store a provider result in the company's local and Redis tiers."""
+    if not is_cacheable(result):
+        return
+    key = cache_key(company_id, file_hash)
+    _local.set(key, dataclasses.replace(result))
+    if redis is None:
+        return
+    try:
+        await redis.set(
+            key,
+            json.dumps(dataclasses.asdict(result)),
+            ex=settings.OCR_CACHE_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("ocr_cache.redis_set_failed", error=str(exc))
+
+
+async def invalidate(redis, file_hash: str, company_id: uuid.UUID) -> None:
+    """Drop the company's cached result for `file_hash` after its item was rejected or failed."""
+    key = cache_key(company_id, file_hash)
+    _local.pop(key)
+    if redis is None:
+        return
+    try:
+        await redis.delete(key)
+    except Exception as exc:
+        logger.warning("ocr_cache.redis_delete_failed", error=str(exc))
+
+
+async def _in_redis(redis, key: str) -> bool:
+    try:
+        return bool(await redis.exists(key))
+    except Exception as exc:
+        logger.warning("ocr_cache.redis_exists_failed", error=str(exc))
+        return False
@@ -0,0 +1,166 @@
+"""Page rasterisation before vision OCR.
+
+Sending the raw upload means a 15-page PDF or a 20 MB 600-DPI TIFF is
+base64-encoded and uploaded whole, although the model only needs the page
+with the header fields and the page with the totals. `prepare_for_vision`
+turns the upload into at most OCR_RASTER_MAX_PAGES compressed JPEG pages:
+
+  page selection   the first page, plus the last page whose text mentions a
+                   total (text_layer.mentions_total) — or, for scans without
+                   a text layer, the last page
+  normalisation    PDFs are rendered at OCR_RASTER_DPI; images above that
+                   resolution are scaled down to it; every page is then
+                   bounded by OCR_RASTER_MAX_EDGE_PX
+  compression      grayscale JPEG at OCR_RASTER_JPEG_QUALITY
+
+Rendering runs in the worker's process pool (src/core/executor.py). The
+vision model takes JPEG and PNG uploads as they are, but not PDFs or TIFFs:
+those are always sent as their renderings, even when larger than the upload.
+A JPEG or PNG is sent as is when rasterising is off, fails, or would not make
+it smaller.
+"""
+
+import io
+from dataclasses import dataclass
+
+import structlog
+
+from src.clients.ocr_client import VISION_MEDIA_TYPES, media_type
+from src.config import settings
+from src.core import executor
+from src.core.observability import ocr_payload_bytes, ocr_payload_bytes_saved_total
+from src.modules.invoices.text_layer import PDF_MAGIC, mentions_total
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RasterOptions:
+    dpi: int
+    max_edge_px: int
+    jpeg_quality: int
+    grayscale: bool
+    max_pages: int
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedPages:
+    """JPEG renderings of the selected pages (0-based indexes into the upload)."""
+
+    images: list[bytes]
+    pages: list[int]
+    page_count: int
+    original_bytes: int
+
+    @property
+    def sent_bytes(self) -> int:
+        return sum(len(image) for image in self.images)
+
+
+def _options() -> RasterOptions:
+    return RasterOptions(
+        dpi=settings.OCR_RASTER_DPI,
+        max_edge_px=settings.OCR_RASTER_MAX_EDGE_PX,
+        jpeg_quality=settings.OCR_RASTER_JPEG_QUALITY,
+        grayscale=settings.OCR_RASTER_GRAYSCALE,
+        max_pages=settings.OCR_RASTER_MAX_PAGES,
+    )
+
+
+async def prepare_for_vision(file_bytes: bytes) -> PreparedPages | None:
+    """Compressed page images for the vision model, or None to send the upload as is."""
+    sendable = media_type(file_bytes) in VISION_MEDIA_TYPES
+    if sendable and not settings.OCR_RASTER_ENABLED:
+        return None
+    try:
+        prepared = await executor.run_in_process(rasterize, file_bytes, _options())
+    except Exception as exc:
+        logger.warning("ocr.rasterize_failed", error=str(exc))
+        prepared = None
+
+    ocr_payload_bytes.labels(stage="original").observe(len(file_bytes))
+    if (
+        prepared is None
+        or not prepared.images
+        or (sendable and prepared.sent_bytes >= len(file_bytes))
+    ):
+        ocr_payload_bytes.labels(stage="sent").observe(len(file_bytes))
+        return None
+    ocr_payload_bytes.labels(stage="sent").observe(prepared.sent_bytes)
+    ocr_payload_bytes_saved_total.inc(max(0, len(file_bytes) - prepared.sent_bytes))
+    return prepared
+
+
+# ── Rendering (runs in the process pool) ──────────────────────────────────────
+
+
+def rasterize(file_bytes: bytes, options: RasterOptions) -> PreparedPages:
+    """Render the relevant pages of a PDF or image upload to JPEG (blocking)."""
+    if file_bytes.startswith(PDF_MAGIC):
+        return _rasterize_pdf(file_bytes, options)
+    return _rasterize_image(file_bytes, options)
+
+
+def select_pages(page_texts: list[str], max_pages: int) -> list[int]:
+    """First page plus the totals page (last page mentioning a total, else the last page)."""
+    count = len(page_texts)
+    if count == 0:
+        return []
+    totals_page = next(
+        (index for index in range(count - 1, -1, -1) if mentions_total(page_texts[index])),
+        count - 1,
+    )
+    pages = [0] if totals_page == 0 or max_pages < 2 else [0, totals_page]
+    return pages[:max_pages]
+
+
+def _rasterize_pdf(file_bytes: bytes, options: RasterOptions) -> PreparedPages:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        texts = []
+        for index in range(len(pdf)):
+            textpage = pdf[index].get_textpage()
+            texts.append(textpage.get_text_range())
+            textpage.close()
+        pages = select_pages(texts, options.max_pages)
+        images = []
+        for index in pages:
+            bitmap = pdf[index].render(scale=options.dpi / 72, grayscale=options.grayscale)
+            images.append(_encode(bitmap.to_pil(), options))
+        return PreparedPages(images, pages, len(pdf), len(file_bytes))
+    finally:
+        pdf.close()
+
+
+def _rasterize_image(file_bytes: bytes, options: RasterOptions) -> PreparedPages:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(file_bytes)) as image:
+        frame_count = getattr(image, "n_frames", 1)
+        # No text to search in a scan: the totals are assumed on the last frame.
+        pages = select_pages([""] * frame_count, options.max_pages)
+        images = []
+        for index in pages:
+            image.seek(index)
+            frame = image.copy()
+            source_dpi = (image.info.get("dpi") or (0, 0))[0]
+            if source_dpi > options.dpi:
+                scale = options.dpi / source_dpi
+                frame = frame.resize(
+                    (max(1, round(frame.width * scale)), max(1, round(frame.height * scale))),
+                    Image.Resampling.LANCZOS,
+                )
+            images.append(_encode(frame, options))
+        return PreparedPages(images, pages, frame_count, len(file_bytes))
+
+
+def _encode(image, options: RasterOptions) -> bytes:
+    from PIL import Image
+
+    image = image.convert("L" if options.grayscale else "RGB")
+    image.thumbnail((options.max_edge_px, options.max_edge_px), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=options.jpeg_quality, optimize=True)
+    return out.getvalue()
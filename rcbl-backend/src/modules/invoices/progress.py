@@ -0,0 +1,195 @@
+"""Batch progress events over Redis pub/sub.
+
+The OCR worker publishes every item and batch state change to a per-batch
+channel; the SSE endpoint subscribes to it instead of polling the database.
+
+Channel `progress:batch:{batch_id}` carries JSON messages of the form
+`{"id": <seq>, "event": "item" | "batch", "data": {...}}`:
+
+  item  — {"item_id", "file_name", "status", "confidence"}
+  batch — {"batch_id", "status", "total_files", "processed_files",
+           "successful_files", "failed_files"}
+
+`id` is a per-batch sequence (`progress:batch:{batch_id}:seq`) used as the SSE
+event ID. The last PROGRESS_BACKLOG_MAX_EVENTS messages are also kept in
+`progress:batch:{batch_id}:log` so a client reconnecting with Last-Event-ID can
+be sent just the events it missed. Numbering, logging and publishing happen
+in one Lua script, so the log and the channel always agree on order.
+
+Publishing is best-effort: a Redis error is logged and never fails the job.
+"""
+
+import json
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+import structlog
+from sqlalchemy import Row
+
+from src.config import settings
+from src.modules.invoices.models import BatchStatus, UploadBatch
+
+logger = structlog.get_logger(__name__)
+
+TERMINAL_STATUSES = frozenset(
+    {BatchStatus.review_pending.value, BatchStatus.completed.value, BatchStatus.failed.value}
+)
+
+
+# KEYS: seq, log, channel — ARGV: event, data (JSON), backlog size, TTL seconds
+_PUBLISH_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+local entry = '{"id":' .. id .. ',"event":"' .. ARGV[1] .. '","data":' .. ARGV[2] .. '}'
+redis.call('RPUSH', KEYS[2], entry)
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[3]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('PUBLISH', KEYS[3], entry)
+return id
+"""
+
+
+def channel(batch_id: uuid.UUID | str) -> str:
+    return f"progress:batch:{batch_id}"
+
+
+def _seq_key(batch_id: uuid.UUID | str) -> str:
+    return f"progress:batch:{batch_id}:seq"
+
+
+def _log_key(batch_id: uuid.UUID | str) -> str:
+    return f"progress:batch:{batch_id}:log"
+
+
+# ── Payloads ──────────────────────────────────────────────────────────────────
+
+
+def item_payload(
+    item_id: uuid.UUID | str,
+    file_name: str,
+    status: str,
+    confidence: float | Decimal | None = None,
+) -> dict:
+    return {
+        "item_id": str(item_id),
+        "file_name": file_name,
+        "status": status,
+        "confidence": float(confidence) if confidence is not None else None,
+    }
+
+
+def batch_payload(batch: UploadBatch) -> dict:
+    return {
+        "batch_id": str(batch.id),
+        "status": batch.status,
+        "total_files": batch.total_files,
+        "processed_files": batch.processed_files,
+        "successful_files": batch.successful_files,
+        "failed_files": batch.failed_files,
+    }
+
+
+def snapshot_payload(batch: UploadBatch, items: list[Row]) -> dict:
+    """Full batch state sent once when a client connects (items from list_item_progress)."""
+    return {
+        **batch_payload(batch),
+        "items": [
+            item_payload(item.id, item.file_name, item.status, item.ocr_confidence_score)
+            for item in items
+        ],
+    }
+
+
+def is_finished(batch: dict) -> bool:
+    """True once every file is processed — no further events will follow."""
+    return batch["status"] in TERMINAL_STATUSES and batch["processed_files"] >= batch["total_files"]
+
+
+# ── Publish ───────────────────────────────────────────────────────────────────
+
+
+async def _publish(redis, batch_id: uuid.UUID | str, event: str, data: dict) -> None:
+    if redis is None:
+        return
+    try:
+        await redis.eval(
+            _PUBLISH_SCRIPT,
+            3,
+            _seq_key(batch_id),
+            _log_key(batch_id),
+            channel(batch_id),
+            event,
+            json.dumps(data),
+            settings.PROGRESS_BACKLOG_MAX_EVENTS,
+            settings.PROGRESS_BACKLOG_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("progress.publish_failed", batch_id=str(batch_id), error=str(exc))
+
+
+async def publish_item(
+    redis,
+    batch_id: uuid.UUID | str,
+    item_id: uuid.UUID | str,
+    *,
+    file_name: str,
+    status: str,
+    confidence: float | Decimal | None = None,
+) -> None:
+    await _publish(redis, batch_id, "item", item_payload(item_id, file_name, status, confidence))
+
+
+async def publish_batch(redis, batch: UploadBatch) -> None:
+    await _publish(redis, batch.id, "batch", batch_payload(batch))
+
+
+# ── Read / resume ─────────────────────────────────────────────────────────────
+
+
+async def current_seq(redis, batch_id: uuid.UUID | str) -> int:
+    """ID of the latest event published for the batch (0 before the first one)."""
+    return int(await redis.get(_seq_key(batch_id)) or 0)
+
+
+async def events_since(redis, batch_id: uuid.UUID | str, last_id: int) -> list[dict] | None:
+    """Events after `last_id` in publish order.
+
+    None when they can no longer be replayed — trimmed from the backlog, or the
+    sequence expired and restarted — and the client needs a fresh snapshot.
+    """
+    seq = await current_seq(redis, batch_id)
+    if last_id > seq:
+        return None
+    entries = [json.loads(raw) for raw in await redis.lrange(_log_key(batch_id), 0, -1)]
+    missed = [entry for entry in entries if entry["id"] > last_id]
+    if seq > last_id and (not missed or missed[0]["id"] != last_id + 1):
+        return None
+    return missed
+
+
+# ── Subscribe ─────────────────────────────────────────────────────────────────
+
+
+@asynccontextmanager
+async def subscribe(redis, batch_id: uuid.UUID | str) -> AsyncIterator:
+    """Subscribe to a batch channel; the PubSub connection is released on exit."""
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(channel(batch_id))
+    try:
+        yield pubsub
+    finally:
+        try:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+        except Exception as exc:
+            logger.warning("progress.unsubscribe_failed", batch_id=str(batch_id), error=str(exc))
+
+
+async def next_event(pubsub, timeout: float) -> dict | None:
+    """Wait up to `timeout` seconds for the next `{"id", "event", "data"}` message."""
+    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+    if message is None or message.get("type") != "message":
+        return None
+    return json.loads(message["data"])
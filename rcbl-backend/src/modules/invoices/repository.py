@@ -2,16 +2,23 @@
 
 All queries filter deleted_at IS NULL (soft deletes from V021).
 Optimistic locking version columns are checked in update statements.
+
+The per-item hot paths (get_batch_by_id, get_item_by_id,
+increment_batch_counters) execute prebuilt statements with named bind
+parameters instead of building a new statement per call: construction and
+SQLAlchemy's cache-key walk happen once per variant, and every call sends the
+same SQL text, so asyncpg reuses one prepared statement per connection.
 """
 
 import uuid
-from datetime import UTC, date, datetime
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
+from functools import cache
 
-from sqlalchemy import select, update
+from sqlalchemy import Row, Select, Update, and_, bindparam, case, insert, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
 from src.core.exceptions import ConflictError
 from src.modules.invoices.models import (
@@ -32,14 +39,16 @@ async def create_batch(
     created_by: uuid.UUID,
     upload_type: BatchUploadType,
     total_files: int,
+    batch_id: uuid.UUID | None = None,
 ) -> UploadBatch:
     batch = UploadBatch(
-        id=uuid.uuid4(),
+        id=batch_id or uuid.uuid4(),
         company_id=company_id,
         created_by=created_by,
         upload_type=upload_type.value,
         total_files=total_files,
         status=BatchStatus.uploading.value,
+        created_at=datetime.now(UTC),
     )
     db.add(batch)
     await db.flush()
@@ -52,13 +61,21 @@ async def get_batch_by_id(
     company_id: uuid.UUID | None = None,
     with_items: bool = False,
 ) -> UploadBatch | None:
-    stmt = select(UploadBatch).where(UploadBatch.id == batch_id)
-    if company_id is not None:
-        stmt = stmt.where(UploadBatch.company_id == company_id)
+    result = await db.execute(
+        _batch_by_id_stmt(company_id is not None, with_items),
+        {"batch_id": batch_id, "company_id": company_id},
+    )
+    return result.scalar_one_or_none()
+
+
+@cache
+def _batch_by_id_stmt(scoped: bool, with_items: bool) -> Select:
+    stmt = select(UploadBatch).where(UploadBatch.id == bindparam("batch_id"))
+    if scoped:
+        stmt = stmt.where(UploadBatch.company_id == bindparam("company_id"))
     if with_items:
         stmt = stmt.options(selectinload(UploadBatch.items))
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    return stmt
 
 
 async def list_batches(
@@ -66,14 +83,28 @@ async def list_batches(
     company_id: uuid.UUID,
     offset: int = 0,
     limit: int = 20,
+    after: tuple[datetime, uuid.UUID] | None = None,
 ) -> list[UploadBatch]:
-    result = await db.execute(
+    """Newest first. `after` is a keyset position (created_at, id) and replaces offset."""
+    stmt = (
         select(UploadBatch)
         .where(UploadBatch.company_id == company_id)
-        .order_by(UploadBatch.created_at.desc())
-        .offset(offset)
+        .order_by(UploadBatch.created_at.desc(), UploadBatch.id)
         .limit(limit)
     )
+    if after is not None:
+        created_at, batch_id = after
+        stmt = stmt.where(
+            # Redundant with the OR, but sargable: the index scan starts at the cursor.
+            UploadBatch.created_at <= created_at,
+            or_(
+                UploadBatch.created_at < created_at,
+                and_(UploadBatch.created_at == created_at, UploadBatch.id > batch_id),
+            ),
+        )
+    else:
+        stmt = stmt.offset(offset)
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
@@ -97,26 +128,46 @@ async def increment_batch_counters(
     *,
     success: bool,
 ) -> UploadBatch | None:
-    """Atomically increment processed_files and either successful or failed."""
-
-    batch = await get_batch_by_id(db, batch_id)
-    if batch is None:
-        return None
+    """Atomically increment processed_files and either successful or failed.
 
-    batch.processed_files += 1
-    if success:
-        batch.successful_files += 1
-    else:
-        batch.failed_files += 1
+    A single UPDATE … RETURNING: the increments are evaluated against the row's
+    current values under the row lock, so concurrent OCR jobs of one batch never
+    lose an update. The batch is finalised in the same statement once the last
+    file has been processed.
+    """
+    result = await db.execute(
+        _increment_batch_counters_stmt(),
+        {
+            "batch_id": batch_id,
+            "succeeded": 1 if success else 0,
+            "failed": 0 if success else 1,
+            "now": datetime.now(UTC),
+        },
+    )
+    return result.scalar_one_or_none()
 
-    # Auto-finalise when all files processed
-    if batch.processed_files >= batch.total_files:
-        batch.status = BatchStatus.review_pending.value
-        batch.completed_at = datetime.now(UTC)
 
-    db.add(batch)
-    await db.flush()
-    return batch
+@cache
+def _increment_batch_counters_stmt() -> Update:
+    processed = UploadBatch.processed_files + 1
+    is_last = processed >= UploadBatch.total_files
+    return (
+        update(UploadBatch)
+        .where(UploadBatch.id == bindparam("batch_id"))
+        .values(
+            processed_files=processed,
+            successful_files=UploadBatch.successful_files + bindparam("succeeded"),
+            failed_files=UploadBatch.failed_files + bindparam("failed"),
+            status=case(
+                (is_last, BatchStatus.review_pending.value), else_=UploadBatch.status
+            ),
+            completed_at=case(
+                (is_last, bindparam("now", type_=UploadBatch.completed_at.type)),
+                else_=UploadBatch.completed_at,
+            ),
+        )
+        .returning(UploadBatch)
+    )
 
 
 # ── UploadItem ────────────────────────────────────────────────────────────────
@@ -140,24 +191,194 @@ async def create_item(
         file_hash=file_hash,
         file_size_bytes=file_size_bytes,
         status=ItemStatus.queued.value,
+        created_at=datetime.now(UTC),
     )
     db.add(item)
     await db.flush()
     return item
 
 
+async def create_items(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+    files: list[dict],
+) -> list[uuid.UUID]:
+    """Insert many queued items with one multi-row INSERT.
+
+    Each entry in `files` carries file_name, file_url, file_hash and file_size_bytes,
+    and may set its own id and parent_item_id (split children).
+    Returns the new item IDs in the same order.
+
+    created_at steps by one microsecond per row, so listings ordered by
+    (created_at, id) return the items in the order of `files` (upload order).
+    """
+    if not files:
+        return []
+    created_at = datetime.now(UTC)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "batch_id": batch_id,
+            "company_id": company_id,
+            "status": ItemStatus.queued.value,
+            "created_at": created_at + timedelta(microseconds=position),
+            **f,
+        }
+        for position, f in enumerate(files)
+    ]
+    await db.execute(insert(UploadItem).values(rows))
+    return [row["id"] for row in rows]
+
+
 async def get_item_by_id(
     db: AsyncSession,
     item_id: uuid.UUID,
     company_id: uuid.UUID | None = None,
+    with_ocr_data: bool = False,
 ) -> UploadItem | None:
-    stmt = select(UploadItem).where(UploadItem.id == item_id)
-    if company_id is not None:
-        stmt = stmt.where(UploadItem.company_id == company_id)
-    result = await db.execute(stmt)
+    """Load an item; its deferred ocr_extracted_data only when `with_ocr_data` is set."""
+    result = await db.execute(
+        _item_by_id_stmt(company_id is not None, with_ocr_data),
+        {"item_id": item_id, "company_id": company_id},
+    )
     return result.scalar_one_or_none()
 
 
+@cache
+def _item_by_id_stmt(scoped: bool, with_ocr_data: bool) -> Select:
+    stmt = select(UploadItem).where(UploadItem.id == bindparam("item_id"))
+    if scoped:
+        stmt = stmt.where(UploadItem.company_id == bindparam("company_id"))
+    if with_ocr_data:
+        stmt = stmt.options(undefer(UploadItem.ocr_extracted_data))
+    return stmt
+
+
+# Columns of an item listing row — everything UploadItemResponse shows except the
+# ocr_extracted_data JSON (it carries raw_text), which is only read on request.
+_ITEM_LIST_COLUMNS = (
+    UploadItem.id,
+    UploadItem.batch_id,
+    UploadItem.file_name,
+    UploadItem.file_size_bytes,
+    UploadItem.file_hash,
+    UploadItem.status,
+    UploadItem.parent_item_id,
+    UploadItem.ocr_confidence_score,
+    UploadItem.ocr_processing_time_ms,
+    UploadItem.error_message,
+    UploadItem.invoice_id,
+    UploadItem.created_at,
+    UploadItem.processed_at,
+)
+
+
+async def list_item_progress(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+) -> list[Row]:
+    """(id, file_name, status, ocr_confidence_score) of every item, in upload order."""
+    result = await db.execute(
+        select(
+            UploadItem.id,
+            UploadItem.file_name,
+            UploadItem.status,
+            UploadItem.ocr_confidence_score,
+        )
+        .where(UploadItem.batch_id == batch_id, UploadItem.company_id == company_id)
+        .order_by(UploadItem.created_at, UploadItem.id)
+    )
+    return list(result.all())
+
+
+async def list_items(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+    limit: int = 50,
+    after: tuple[datetime, uuid.UUID] | None = None,
+    status: ItemStatus | None = None,
+    include_ocr_data: bool = False,
+) -> list[Row]:
+    """Items of a batch in upload order, starting after the keyset position `after`.
+
+    Returns plain rows rather than ORM objects; ocr_extracted_data is only
+    selected when `include_ocr_data` is set.
+    """
+    ocr_data = (UploadItem.ocr_extracted_data,) if include_ocr_data else ()
+    stmt = (
+        select(*_ITEM_LIST_COLUMNS, *ocr_data)
+        .where(UploadItem.batch_id == batch_id, UploadItem.company_id == company_id)
+        .order_by(UploadItem.created_at, UploadItem.id)
+        .limit(limit)
+    )
+    if status is not None:
+        stmt = stmt.where(UploadItem.status == status.value)
+    if after is not None:
+        created_at, item_id = after
+        stmt = stmt.where(
+            UploadItem.created_at >= created_at,  # sargable seek start, as in list_batches
+            or_(
+                UploadItem.created_at > created_at,
+                and_(UploadItem.created_at == created_at, UploadItem.id > item_id),
+            ),
+        )
+    result = await db.execute(stmt)
+    return list(result.all())
+
+
+async def find_items_by_hashes(
+    db: AsyncSession,
+    company_id: uuid.UUID,
+    file_hashes: set[str],
+) -> dict[str, Row]:
+    """Map each already-uploaded hash to the oldest live item (id, batch_id, status) with it.
+
+    Failed and rejected items are ignored so re-uploading them starts over.
+    Served by idx_invoice_upload_items_file_hash.
+    """
+    if not file_hashes:
+        return {}
+    result = await db.execute(
+        select(UploadItem.id, UploadItem.batch_id, UploadItem.status, UploadItem.file_hash)
+        .where(
+            UploadItem.company_id == company_id,
+            UploadItem.file_hash.in_(file_hashes),
+            UploadItem.status.not_in([ItemStatus.failed.value, ItemStatus.rejected.value]),
+        )
+        .order_by(UploadItem.created_at)
+    )
+    found: dict[str, Row] = {}
+    for row in result:
+        found.setdefault(row.file_hash, row)
+    return found
+
+
+async def get_ocr_result_by_hash(
+    db: AsyncSession,
+    company_id: uuid.UUID,
+    file_hash: str,
+) -> tuple[dict, Decimal | None] | None:
+    """Return (ocr_extracted_data, ocr_confidence_score) of the latest OCR'd item with this hash."""
+    result = await db.execute(
+        select(UploadItem.ocr_extracted_data, UploadItem.ocr_confidence_score)
+        .where(
+            UploadItem.company_id == company_id,
+            UploadItem.file_hash == file_hash,
+            UploadItem.ocr_extracted_data.is_not(None),
+            UploadItem.status.in_(
+                [ItemStatus.ready.value, ItemStatus.review_pending.value, ItemStatus.accepted.value]
+            ),
+        )
+        .order_by(UploadItem.processed_at.desc())
+        .limit(1)
+    )
+    row = result.first()
+    return (row.ocr_extracted_data, row.ocr_confidence_score) if row else None
+
+
 async def update_item_ocr_result(
     db: AsyncSession,
     item_id: uuid.UUID,
@@ -205,6 +426,45 @@ async def update_item_status(
     )
 
 
+async def mark_item_split(
+    db: AsyncSession,
+    item: UploadItem,
+    child_count: int,
+) -> UploadBatch | None:
+    """Replace a multi-invoice item by its `child_count` children in the batch totals.
+
+    The item moves to the terminal status 'split' without touching the processed
+    counters; total_files grows by child_count - 1 so the batch only completes
+    once every child has been processed.
+    """
+    now = datetime.now(UTC)
+    await db.execute(
+        update(UploadItem)
+        .where(UploadItem.id == item.id)
+        .values(status=ItemStatus.split_parent.value, processed_at=now)
+    )
+    result = await db.execute(
+        update(UploadBatch)
+        .where(UploadBatch.id == item.batch_id)
+        .values(total_files=UploadBatch.total_files + child_count - 1)
+        .returning(UploadBatch)
+    )
+    return result.scalar_one_or_none()
+
+
+async def list_child_item_ids(
+    db: AsyncSession,
+    parent_item_id: uuid.UUID,
+    status: ItemStatus | None = None,
+) -> list[uuid.UUID]:
+    """IDs of the items split out of `parent_item_id` (idx_invoice_upload_items_parent)."""
+    stmt = select(UploadItem.id).where(UploadItem.parent_item_id == parent_item_id)
+    if status is not None:
+        stmt = stmt.where(UploadItem.status == status.value)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def accept_item(
     db: AsyncSession,
     item: UploadItem,
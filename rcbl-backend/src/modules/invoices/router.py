@@ -1,7 +1,8 @@
 """Invoice upload + OCR router.
 
 All endpoints require JWT authentication. The DB session passed to service
-functions is tenant-scoped (RLS context variable set via get_tenant_db).
+functions is tenant-scoped (RLS context variable set via get_tenant_db, or
+get_tenant_read_db for read-only endpoints, which may be served by the replica).
 """
 
 import asyncio
@@ -10,14 +11,22 @@ import uuid
 from typing import Annotated
 
 import structlog
-from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Header, Query, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.deps import get_arq_pool, get_current_user, get_tenant_db
+from src.config import settings
+from src.core.deps import (
+    get_arq_pool,
+    get_current_principal,
+    get_redis,
+    get_tenant_db,
+    get_tenant_read_db,
+)
 from src.core.tenant import require_company_id
-from src.modules.auth.models import User
-from src.modules.invoices import service
+from src.modules.auth.principal import Principal
+from src.modules.invoices import progress, service
+from src.modules.invoices.models import ItemStatus
 from src.modules.invoices.schemas import (
     AcceptItemRequest,
     AcceptItemResponse,
@@ -25,6 +34,7 @@ from src.modules.invoices.schemas import (
     SingleUploadResponse,
     UploadBatchDetailResponse,
     UploadBatchResponse,
+    UploadItemPage,
     UploadItemResponse,
 )
 
@@ -44,7 +54,7 @@ router = APIRouter(prefix="/api/invoices", tags=["invoices"])
 )
 async def upload_single(
     file: Annotated[UploadFile, File(description="PDF or image file, max 20 MB")],
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_tenant_db),
     arq_pool=Depends(get_arq_pool),
 ) -> SingleUploadResponse:
@@ -61,7 +71,7 @@ async def upload_single(
 )
 async def upload_bulk(
     files: Annotated[list[UploadFile], File(description="Multiple PDF or image files, each max 20 MB")],
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_tenant_db),
     arq_pool=Depends(get_arq_pool),
 ) -> BulkUploadResponse:
@@ -79,29 +89,71 @@ async def upload_bulk(
     summary="List upload batches (paginated)",
 )
 async def list_batches(
-    offset: int = Query(0, ge=0),
+    response: Response,
+    offset: int = Query(0, ge=0, description="Deprecated — use cursor"),
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_tenant_db),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_tenant_read_db),
 ) -> list[UploadBatchResponse]:
+    """Newest first. The cursor for the next page is returned in the X-Next-Cursor header."""
     company_id = require_company_id()
-    batches = await service.list_batches(db, company_id, offset=offset, limit=limit)
+    batches, next_cursor = await service.list_batches(
+        db, company_id, offset=offset, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [UploadBatchResponse.model_validate(b) for b in batches]
 
 
 @router.get(
     "/upload/batches/{batch_id}",
     response_model=UploadBatchDetailResponse,
-    summary="Get batch detail with all items",
+    summary="Get batch detail with the first page of items",
 )
 async def get_batch(
     batch_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_tenant_db),
+    limit: int = Query(50, ge=1, le=200),
+    item_status: ItemStatus | None = Query(None, alias="status"),
+    include_ocr_data: bool = Query(False, description="Include each item's ocr_extracted_data"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_tenant_read_db),
 ) -> UploadBatchDetailResponse:
     company_id = require_company_id()
-    batch = await service.get_batch(db, batch_id, company_id, with_items=True)
-    return UploadBatchDetailResponse.model_validate(batch)
+    return await service.get_batch_detail(
+        db,
+        batch_id,
+        company_id,
+        limit=limit,
+        status=item_status,
+        include_ocr_data=include_ocr_data,
+    )
+
+
+@router.get(
+    "/upload/batches/{batch_id}/items",
+    response_model=UploadItemPage,
+    summary="List a batch's items (cursor-paginated)",
+)
+async def list_batch_items(
+    batch_id: uuid.UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    item_status: ItemStatus | None = Query(None, alias="status"),
+    include_ocr_data: bool = Query(False, description="Include each item's ocr_extracted_data"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_tenant_read_db),
+) -> UploadItemPage:
+    company_id = require_company_id()
+    return await service.list_items(
+        db,
+        batch_id,
+        company_id,
+        limit=limit,
+        cursor=cursor,
+        status=item_status,
+        include_ocr_data=include_ocr_data,
+    )
 
 
 # ── Items ──────────────────────────────────────────────────────────────────────
@@ -114,8 +166,8 @@ async def get_batch(
 )
 async def get_item(
     item_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_tenant_read_db),
 ) -> UploadItemResponse:
     company_id = require_company_id()
     item = await service.get_item(db, item_id, company_id)
@@ -131,7 +183,7 @@ async def get_item(
 async def accept_item(
     item_id: uuid.UUID,
     payload: AcceptItemRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_tenant_db),
 ) -> AcceptItemResponse:
     company_id = require_company_id()
@@ -145,11 +197,12 @@ async def accept_item(
 )
 async def reject_item(
     item_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_tenant_db),
+    redis=Depends(get_redis),
 ) -> UploadItemResponse:
     company_id = require_company_id()
-    return await service.reject_item(db, item_id, company_id)
+    return await service.reject_item(db, item_id, company_id, redis)
 
 
 # ── SSE Progress Stream ────────────────────────────────────────────────────────
@@ -162,60 +215,86 @@ async def reject_item(
 )
 async def batch_progress(
     batch_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_tenant_db),
+    last_event_id: Annotated[str | None, Header()] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    redis=Depends(get_redis),
 ) -> StreamingResponse:
     """
-    SSE endpoint that polls the batch until completed/failed.
-    Each event contains the current batch counters and any changed items.
-    Client connects once and receives updates as OCR jobs complete.
+    SSE endpoint pushing batch progress as OCR jobs complete.
+
+    Sends one `progress` snapshot (batch counters + all items), then only the
+    `item` / `batch` deltas the worker publishes to the batch's Redis channel,
+    and `done` once every file is processed. Every event carries the batch's
+    sequence number as its SSE id; a client reconnecting with Last-Event-ID is
+    replayed just the events it missed, or a fresh snapshot when the backlog no
+    longer reaches back that far.
+
+    The DB session is released right after the initial read; idle streams get
+    a keepalive comment every PROGRESS_HEARTBEAT_SECONDS.
     """
     company_id = require_company_id()
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
 
     async def event_generator():
         from src.modules.invoices import repository
-        from src.modules.invoices.models import BatchStatus
 
-        terminal_statuses = {BatchStatus.completed.value, BatchStatus.failed.value}
-        prev_processed = -1
+        # Subscribe before reading any state so no update falls in between.
+        async with progress.subscribe(redis, batch_id) as pubsub:
+            seq = await progress.current_seq(redis, batch_id)
+            replay = None
+            if resume_from is not None:
+                replay = await progress.events_since(redis, batch_id, resume_from)
 
-        for _ in range(300):  # poll up to ~5 minutes (300 x 1s)
-            batch = await repository.get_batch_by_id(
-                db, batch_id, company_id, with_items=True
-            )
+            batch = await repository.get_batch_by_id(db, batch_id, company_id)
             if batch is None:
                 yield _sse_event({"error": "batch not found"}, event="error")
                 return
 
-            if batch.processed_files != prev_processed:
-                prev_processed = batch.processed_files
-
-                payload = {
-                    "batch_id": str(batch_id),
-                    "status": batch.status,
-                    "total_files": batch.total_files,
-                    "processed_files": batch.processed_files,
-                    "successful_files": batch.successful_files,
-                    "failed_files": batch.failed_files,
-                    "items": [
-                        {
-                            "item_id": str(item.id),
-                            "file_name": item.file_name,
-                            "status": item.status,
-                            "confidence": float(item.ocr_confidence_score)
-                            if item.ocr_confidence_score is not None
-                            else None,
-                        }
-                        for item in (batch.items or [])
-                    ],
-                }
-                yield _sse_event(payload, event="progress")
-
-            if batch.status in terminal_statuses:
-                yield _sse_event({"status": batch.status}, event="done")
-                return
-
-            await asyncio.sleep(1)
+            if replay is not None and progress.is_finished(progress.batch_payload(batch)):
+                # Nothing more will be published — settle the client with the final state.
+                replay = None
+
+            snapshot = None
+            if replay is None:
+                items = await repository.list_item_progress(db, batch_id, company_id)
+                snapshot = progress.snapshot_payload(batch, items)
+            await db.close()  # return the connection to the pool for the rest of the stream
+
+            if snapshot is not None:
+                last_id = seq
+                yield _sse_event(snapshot, event="progress", event_id=seq)
+                if progress.is_finished(snapshot):
+                    yield _sse_event({"status": snapshot["status"]}, event="done")
+                    return
+            else:
+                last_id = resume_from
+                for entry in replay:
+                    last_id = entry["id"]
+                    yield _sse_event(entry["data"], event=entry["event"], event_id=last_id)
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.PROGRESS_STREAM_MAX_SECONDS
+            last_sent = loop.time()
+            while (remaining := deadline - loop.time()) > 0:
+                entry = await progress.next_event(
+                    pubsub, timeout=min(remaining, settings.PROGRESS_HEARTBEAT_SECONDS)
+                )
+                if entry is None:
+                    if loop.time() - last_sent >= settings.PROGRESS_HEARTBEAT_SECONDS:
+                        last_sent = loop.time()
+                        yield ": keepalive\n\n"
+                    continue
+                if entry["id"] <= last_id:
+                    continue  # already covered by the snapshot or the replay
+
+                name, data = entry["event"], entry["data"]
+                last_id = entry["id"]
+                last_sent = loop.time()
+                yield _sse_event(data, event=name, event_id=last_id)
+                if name == "batch" and progress.is_finished(data):
+                    yield _sse_event({"status": data["status"]}, event="done")
+                    return
 
         yield _sse_event({"reason": "timeout"}, event="timeout")
 
@@ -229,5 +308,6 @@ async def batch_progress(
     )
 
 
-def _sse_event(data: dict, event: str = "message") -> str:
-    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+def _sse_event(data: dict, event: str = "message", event_id: int | None = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
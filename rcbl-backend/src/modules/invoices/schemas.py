@@ -27,6 +27,7 @@ class OCRExtractedData(BaseModel):
     due_date: date | None = None
     vendor_name: str | None = None
     raw_text: str | None = None
+    failure: str | None = None  # unreadable | provider — set when OCR produced nothing
 
 
 # ── Request schemas ───────────────────────────────────────────────────────────
@@ -92,6 +93,7 @@ class UploadItemResponse(BaseModel):
     file_size_bytes: int | None = None
     file_hash: str | None = None
     status: ItemStatus
+    parent_item_id: uuid.UUID | None = None
     ocr_confidence_score: float | None = None
     ocr_extracted_data: OCRExtractedData | None = None
     ocr_processing_time_ms: int | None = None
@@ -101,6 +103,16 @@ class UploadItemResponse(BaseModel):
     processed_at: datetime | None = None
 
 
+class UploadItemPage(BaseModel):
+    """One keyset page of a batch's items. Pass next_cursor back as ?cursor= for the next page.
+
+    ocr_extracted_data is null unless include_ocr_data is set.
+    """
+
+    items: list[UploadItemResponse]
+    next_cursor: str | None = None
+
+
 class UploadBatchResponse(BaseModel):
     """Lightweight batch response without items (list endpoints)."""
 
@@ -118,13 +130,21 @@ class UploadBatchResponse(BaseModel):
 
 
 class UploadBatchDetailResponse(UploadBatchResponse):
-    """Full batch detail including all items."""
+    """Batch detail with the first page of its items.
+
+    Further pages come from GET /upload/batches/{id}/items?cursor=next_cursor with
+    the same status filter. ocr_extracted_data is null unless include_ocr_data is set.
+    """
 
     items: list[UploadItemResponse] = []
+    next_cursor: str | None = None
 
 
 class SingleUploadResponse(BaseModel):
-    """Immediate response after a single file upload."""
+    """Immediate response after a single file upload.
+
+    For a duplicate (status "duplicate") the IDs point at the existing item.
+    """
 
     batch_id: uuid.UUID
     item_id: uuid.UUID
@@ -133,17 +153,25 @@ class SingleUploadResponse(BaseModel):
 
 
 class BulkUploadItemSummary(BaseModel):
-    """Summary of a single file within a bulk upload response."""
+    """Summary of a single file within a bulk upload response.
 
-    item_id: uuid.UUID
+    Files rejected by validation or storage have no item_id, status "failed" and an error.
+    Duplicates (status "duplicate") are not stored again: item_id is the item they are
+    linked to — an earlier upload or an identical file in the same request — and
+    linked_status is that item's current status.
+    """
+
+    item_id: uuid.UUID | None = None
     file_name: str
     status: str
+    error: str | None = None
+    linked_status: ItemStatus | None = None
 
 
 class BulkUploadResponse(BaseModel):
-    """Immediate response after bulk upload."""
+    """Immediate response after bulk upload. batch_id is None when nothing new was queued."""
 
-    batch_id: uuid.UUID
+    batch_id: uuid.UUID | None
     total_files: int
     items: list[BulkUploadItemSummary]
     message: str
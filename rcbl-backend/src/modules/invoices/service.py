@@ -1,11 +1,14 @@
 """Business logic for invoice upload and OCR module.
 
 Flow:
-  1. Client uploads PDF(s) → service stores to S3, creates batch + items, enqueues OCR jobs
+  1. Client uploads PDF(s) → service stores to S3, creates batch + items, submits OCR jobs
+     to the company's fair queue (src/core/fair_queue.py)
   2. Worker processes OCR → updates items (ready | review_pending | failed) + batch counters
   3. Client reviews items → PATCH accept (creates Invoice) or reject
 """
 
+import asyncio
+import hashlib
 import uuid
 from datetime import date
 from decimal import Decimal
@@ -15,6 +18,8 @@ from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.clients import s3_client
+from src.config import settings
+from src.core import fair_queue, queue
 from src.core.exceptions import (
     DateValidationError,
     FileValidationError,
@@ -22,7 +27,8 @@ from src.core.exceptions import (
     InvalidItemStatusError,
     NotFoundError,
 )
-from src.modules.invoices import repository
+from src.core.pagination import decode_cursor, split_page
+from src.modules.invoices import ocr_cache, repository
 from src.modules.invoices.models import (
     BatchUploadType,
     InvoiceSource,
@@ -37,6 +43,9 @@ from src.modules.invoices.schemas import (
     BulkUploadItemSummary,
     BulkUploadResponse,
     SingleUploadResponse,
+    UploadBatchDetailResponse,
+    UploadBatchResponse,
+    UploadItemPage,
     UploadItemResponse,
 )
 
@@ -44,6 +53,7 @@ logger = structlog.get_logger(__name__)
 
 _ALLOWED_CONTENT_TYPES = {"application/pdf", "image/jpeg", "image/png", "image/tiff"}
 _MAX_FILE_SIZE_BYTES = 20 * 1024 * 1024  # 20 MB
+_READ_CHUNK_BYTES = 1024 * 1024  # 1 MB — hashing/validation read size
 
 
 async def upload_single(
@@ -53,13 +63,32 @@ async def upload_single(
     file: UploadFile,
     arq_pool,
 ) -> SingleUploadResponse:
-    """Upload a single PDF, create batch + item, enqueue OCR job."""
-    file_bytes = await _read_and_validate_file(file)
+    """
+    Upload a single PDF, create batch + item, enqueue OCR job.
+
+    If the company already has a live item with the same content hash, nothing is
+    stored or queued and the existing item is returned with status "duplicate".
+    """
+    file_hash, file_size = await _scan_and_validate_file(file)
+
+    existing = await repository.find_items_by_hashes(db, company_id, {file_hash})
+    if file_hash in existing:
+        duplicate = existing[file_hash]
+        logger.info(
+            "invoice.upload_duplicate",
+            item_id=str(duplicate.id),
+            file_name=file.filename,
+        )
+        return SingleUploadResponse(
+            batch_id=duplicate.batch_id,
+            item_id=duplicate.id,
+            status="duplicate",
+            message="An identical file was already uploaded. Linked to the existing item.",
+        )
 
-    # Store in S3
+    # Stream to S3 straight from the spooled upload
     key = f"invoices/{company_id}/{uuid.uuid4()}/{file.filename}"
-    await s3_client.upload_file(file_bytes, key, content_type=file.content_type or "application/pdf")
-    file_hash = s3_client.compute_sha256(file_bytes)
+    await s3_client.upload_stream(file, key, content_type=file.content_type or "application/pdf")
 
     batch = await repository.create_batch(
         db,
@@ -76,10 +105,17 @@ async def upload_single(
         file_name=file.filename or "unnamed.pdf",
         file_url=key,
         file_hash=file_hash,
-        file_size_bytes=len(file_bytes),
+        file_size_bytes=file_size,
     )
 
-    await arq_pool.enqueue_job("process_ocr", str(item.id), str(company_id))
+    await fair_queue.submit(
+        arq_pool,
+        str(company_id),
+        "process_ocr",
+        [(str(item.id), str(company_id))],
+        priority=fair_queue.Priority.interactive,
+        job_ids=[queue.job_id("process_ocr", item.id)],
+    )
 
     logger.info(
         "invoice.upload_single",
@@ -98,49 +134,152 @@ async def upload_bulk(
     files: list[UploadFile],
     arq_pool,
 ) -> BulkUploadResponse:
-    """Upload multiple PDFs, create one batch with N items, enqueue N OCR jobs."""
+    """
+    Upload multiple PDFs, create one batch with N items, enqueue N OCR jobs.
+
+    Files are validated locally first; invalid ones are reported per file instead of
+    failing the request. Duplicates — of an earlier upload of this company or of another
+    file in the same request — are linked instead of stored and OCR'd again. The rest
+    stream to S3 in parallel (bounded by BULK_UPLOAD_CONCURRENCY), then all items are
+    inserted with one multi-row INSERT and all OCR jobs are submitted to the company's
+    bulk fair-queue lane with one Redis call, under job IDs derived from the item IDs.
+    """
     if not files:
         raise FileValidationError("At least one file is required")
 
+    summaries: list[BulkUploadItemSummary] = [
+        BulkUploadItemSummary(file_name=file.filename or "unnamed.pdf", status="queued")
+        for file in files
+    ]
+
+    # ── Validate + hash locally (no network) ──────────────────────────────────
+    scanned: dict[int, tuple[str, int]] = {}
+    for index, file in enumerate(files):
+        try:
+            scanned[index] = await _scan_and_validate_file(file)
+        except FileValidationError as exc:
+            _mark_failed(summaries[index], exc.detail)
+
+    if not scanned:
+        raise FileValidationError(
+            "; ".join(s.error for s in summaries if s.error) or "No valid files uploaded"
+        )
+
+    # ── Dedup: earlier uploads (one indexed lookup), then within this request ──
+    existing = await repository.find_items_by_hashes(
+        db, company_id, {file_hash for file_hash, _ in scanned.values()}
+    )
+    first_index_by_hash: dict[str, int] = {}
+    duplicate_of: dict[int, int] = {}  # request-local duplicate index → original index
+    for index, (file_hash, _) in list(scanned.items()):
+        if file_hash in existing:
+            del scanned[index]
+            _mark_duplicate(summaries[index], existing[file_hash].id, existing[file_hash].status)
+        elif file_hash in first_index_by_hash:
+            del scanned[index]
+            duplicate_of[index] = first_index_by_hash[file_hash]
+        else:
+            first_index_by_hash[file_hash] = index
+
+    # ── Parallel S3 uploads ───────────────────────────────────────────────────
+    batch_id = uuid.uuid4()
+    keys = {
+        index: f"invoices/{company_id}/{batch_id}/{uuid.uuid4()}/{files[index].filename}"
+        for index in scanned
+    }
+    semaphore = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+
+    async def _store(index: int) -> None:
+        file = files[index]
+        async with semaphore:
+            try:
+                await s3_client.upload_stream(
+                    file, keys[index], content_type=file.content_type or "application/pdf"
+                )
+            except Exception as exc:
+                logger.warning(
+                    "invoice.upload_bulk_store_failed", file_name=file.filename, error=str(exc)
+                )
+                del scanned[index]
+                _mark_failed(summaries[index], "File could not be stored")
+
+    await asyncio.gather(*(_store(index) for index in list(scanned)))
+
+    for index, original in duplicate_of.items():
+        if original in scanned:
+            _mark_duplicate(summaries[index], None, ItemStatus.queued.value)
+        else:
+            _mark_failed(summaries[index], "File could not be stored")
+
+    duplicates = sum(1 for s in summaries if s.status == "duplicate")
+    if not scanned:
+        if duplicates:
+            return BulkUploadResponse(
+                batch_id=None,
+                total_files=0,
+                items=summaries,
+                message="All files were already uploaded. Nothing new was queued.",
+            )
+        raise FileValidationError("None of the uploaded files could be stored")
+
+    # ── One batch, one multi-row INSERT, one fair-queue submission ────────────
+    stored = sorted(scanned)
     batch = await repository.create_batch(
         db,
         company_id=company_id,
         created_by=user_id,
         upload_type=BatchUploadType.bulk,
-        total_files=len(files),
+        total_files=len(stored),
+        batch_id=batch_id,
+    )
+    item_ids = await repository.create_items(
+        db,
+        batch_id=batch.id,
+        company_id=company_id,
+        files=[
+            {
+                "file_name": summaries[index].file_name,
+                "file_url": keys[index],
+                "file_hash": scanned[index][0],
+                "file_size_bytes": scanned[index][1],
+            }
+            for index in stored
+        ],
+    )
+    for index, item_id in zip(stored, item_ids, strict=True):
+        summaries[index].item_id = item_id
+    for index, original in duplicate_of.items():
+        if original in scanned:
+            summaries[index].item_id = summaries[original].item_id
+
+    await fair_queue.submit(
+        arq_pool,
+        str(company_id),
+        "process_ocr",
+        [(str(item_id), str(company_id)) for item_id in item_ids],
+        priority=fair_queue.Priority.bulk,
+        job_ids=[queue.job_id("process_ocr", item_id) for item_id in item_ids],
     )
 
-    items_summary: list[BulkUploadItemSummary] = []
-    for file in files:
-        file_bytes = await _read_and_validate_file(file)
-        key = f"invoices/{company_id}/{batch.id}/{uuid.uuid4()}/{file.filename}"
-        await s3_client.upload_file(
-            file_bytes, key, content_type=file.content_type or "application/pdf"
-        )
-        file_hash = s3_client.compute_sha256(file_bytes)
-
-        item = await repository.create_item(
-            db,
-            batch_id=batch.id,
-            company_id=company_id,
-            file_name=file.filename or "unnamed.pdf",
-            file_url=key,
-            file_hash=file_hash,
-            file_size_bytes=len(file_bytes),
-        )
-
-        await arq_pool.enqueue_job("process_ocr", str(item.id), str(company_id))
-        items_summary.append(
-            BulkUploadItemSummary(item_id=item.id, file_name=file.filename or "unnamed.pdf", status="queued")
-        )
-
-    logger.info("invoice.upload_bulk", batch_id=str(batch.id), total=len(files))
+    failed = len(files) - len(stored) - duplicates
+    logger.info(
+        "invoice.upload_bulk",
+        batch_id=str(batch.id),
+        total=len(stored),
+        duplicates=duplicates,
+        failed=failed,
+    )
 
+    message = f"{len(stored)} files uploaded. OCR processing has been queued."
+    if duplicates:
+        message += f" {duplicates} duplicates were linked to existing items."
+    if failed:
+        message += f" {failed} files were rejected."
     return BulkUploadResponse(
         batch_id=batch.id,
-        total_files=len(files),
-        items=items_summary,
-        message=f"{len(files)} files uploaded. OCR processing has been queued.",
+        total_files=len(stored),
+        items=summaries,
+        message=message,
     )
 
 
@@ -161,8 +300,78 @@ async def list_batches(
     company_id: uuid.UUID,
     offset: int = 0,
     limit: int = 20,
-) -> list[UploadBatch]:
-    return await repository.list_batches(db, company_id, offset=offset, limit=limit)
+    cursor: str | None = None,
+) -> tuple[list[UploadBatch], str | None]:
+    """One page of batches, newest first, plus the cursor for the next page.
+
+    A cursor (keyset on created_at, id) takes precedence over offset.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    batches = await repository.list_batches(
+        db, company_id, offset=offset, limit=limit + 1, after=after
+    )
+    return split_page(batches, limit)
+
+
+async def list_items(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+    limit: int = 50,
+    cursor: str | None = None,
+    status: ItemStatus | None = None,
+    include_ocr_data: bool = False,
+) -> UploadItemPage:
+    """One page of a batch's items in upload order, plus the cursor for the next page."""
+    items, next_cursor = await _item_page(
+        db, batch_id, company_id, limit, cursor, status, include_ocr_data
+    )
+    if not items and not await repository.get_batch_by_id(db, batch_id, company_id):
+        raise NotFoundError("UploadBatch", str(batch_id))
+    return UploadItemPage(items=items, next_cursor=next_cursor)
+
+
+async def get_batch_detail(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+    limit: int = 50,
+    status: ItemStatus | None = None,
+    include_ocr_data: bool = False,
+) -> UploadBatchDetailResponse:
+    """Batch counters plus the first page of items; continue via list_items(cursor=...)."""
+    batch = await get_batch(db, batch_id, company_id)
+    items, next_cursor = await _item_page(
+        db, batch_id, company_id, limit, None, status, include_ocr_data
+    )
+    return UploadBatchDetailResponse(
+        **UploadBatchResponse.model_validate(batch).model_dump(),
+        items=items,
+        next_cursor=next_cursor,
+    )
+
+
+async def _item_page(
+    db: AsyncSession,
+    batch_id: uuid.UUID,
+    company_id: uuid.UUID,
+    limit: int,
+    cursor: str | None,
+    status: ItemStatus | None,
+    include_ocr_data: bool,
+) -> tuple[list[UploadItemResponse], str | None]:
+    after = decode_cursor(cursor) if cursor else None
+    rows = await repository.list_items(
+        db,
+        batch_id,
+        company_id,
+        limit=limit + 1,
+        after=after,
+        status=status,
+        include_ocr_data=include_ocr_data,
+    )
+    page, next_cursor = split_page(rows, limit)
+    return [UploadItemResponse.model_validate(row) for row in page], next_cursor
 
 
 async def get_item(
@@ -170,7 +379,7 @@ async def get_item(
     item_id: uuid.UUID,
     company_id: uuid.UUID,
 ) -> UploadItem:
-    item = await repository.get_item_by_id(db, item_id, company_id)
+    item = await repository.get_item_by_id(db, item_id, company_id, with_ocr_data=True)
     if not item:
         raise NotFoundError("UploadItem", str(item_id))
     return item
@@ -258,7 +467,9 @@ async def reject_item(
     db: AsyncSession,
     item_id: uuid.UUID,
     company_id: uuid.UUID,
+    redis=None,
 ) -> UploadItemResponse:
+    """Reject an item; its OCR result is dropped from the cache so a re-upload starts over."""
     item = await get_item(db, item_id, company_id)
 
     if item.status not in (
@@ -276,6 +487,8 @@ async def reject_item(
         )
 
     await repository.update_item_status(db, item.id, ItemStatus.rejected)
+    if item.file_hash:
+        await ocr_cache.invalidate(redis, item.file_hash, company_id)
 
     item.status = ItemStatus.rejected.value
     return UploadItemResponse.model_validate(item)
@@ -284,22 +497,54 @@ async def reject_item(
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 
-async def _read_and_validate_file(file: UploadFile) -> bytes:
+def _mark_failed(summary: BulkUploadItemSummary, error: str) -> None:
+    summary.status = ItemStatus.failed.value
+    summary.error = error
+
+
+def _mark_duplicate(
+    summary: BulkUploadItemSummary, item_id: uuid.UUID | None, linked_status: str
+) -> None:
+    summary.status = "duplicate"
+    summary.item_id = item_id
+    summary.linked_status = ItemStatus(linked_status)
+
+
+async def _scan_and_validate_file(file: UploadFile) -> tuple[str, int]:
+    """
+    Validate type and size while hashing the spooled upload chunk by chunk.
+
+    Nothing larger than one chunk is held in memory, and oversized files are rejected
+    before anything is sent to S3. Returns (sha256_hex, size_bytes) and rewinds the
+    file so it can be streamed to S3 afterwards.
+    """
     content_type = file.content_type or ""
     if content_type and content_type not in _ALLOWED_CONTENT_TYPES:
         raise FileValidationError(
             f"Unsupported file type '{content_type}'. Allowed: PDF, JPEG, PNG, TIFF"
         )
 
-    file_bytes = await file.read()
-    if len(file_bytes) > _MAX_FILE_SIZE_BYTES:
+    # Starlette records the spooled size up front — reject obvious oversize files early
+    if file.size is not None and file.size > _MAX_FILE_SIZE_BYTES:
         raise FileValidationError(
-            f"File '{file.filename}' exceeds 20 MB limit ({len(file_bytes)} bytes)"
+            f"File '{file.filename}' exceeds 20 MB limit ({file.size} bytes)"
         )
-    if len(file_bytes) == 0:
+
+    hasher = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(_READ_CHUNK_BYTES):
+        size += len(chunk)
+        if size > _MAX_FILE_SIZE_BYTES:
+            raise FileValidationError(
+                f"File '{file.filename}' exceeds 20 MB limit (more than {size} bytes)"
+            )
+        hasher.update(chunk)
+
+    if size == 0:
         raise FileValidationError(f"File '{file.filename}' is empty")
 
-    return file_bytes
+    await file.seek(0)
+    return hasher.hexdigest(), size
 
 
 def _parse_date(value) -> date | None:
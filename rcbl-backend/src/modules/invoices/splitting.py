@@ -0,0 +1,177 @@
+"""Multi-invoice PDF splitting.
+
+Customers often export a whole month of invoices as one PDF. Extracting a
+single invoice from it is slow (one vision call over many pages) and mostly
+wrong, so before OCR `split_item` looks for invoice boundaries in the text
+layer and fans the document out into one child UploadItem per invoice:
+
+  boundaries   a page starts a new invoice when it carries an invoice number
+               different from the current invoice's, or a "Page 1 of N" marker;
+               pages without either continue the current invoice
+  children     one PDF per page range, stored next to the upload and inserted
+               as queued items of the same batch with parent_item_id set
+  batch        the parent moves to status "split" and total_files grows by
+               children - 1, so the batch completes once every child is done
+
+Child IDs are derived from the parent ID and page range (uuid5), so a job
+retried after a partial split writes the same objects and rows. Scans without
+a text layer, single-invoice documents and PDFs over OCR_SPLIT_MAX_PAGES are
+processed whole. Detection and page extraction run in the worker's process
+pool.
+"""
+
+import asyncio
+import io
+import re
+import uuid
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.clients import s3_client
+from src.config import settings
+from src.core import executor
+from src.core.observability import ocr_split_children_total, ocr_split_total
+from src.modules.invoices import repository
+from src.modules.invoices.models import UploadBatch, UploadItem
+from src.modules.invoices.text_layer import PDF_MAGIC, find_invoice_number
+
+logger = structlog.get_logger(__name__)
+
+_PAGE_ONE = re.compile(r"\b(?:page|seite|p\.)\s*1\s*(?:of|/|von|sur)\s*\d+\b", re.IGNORECASE)
+
+# Fewer non-whitespace characters per page than this means a scan with no text layer.
+_MIN_PAGE_TEXT_CHARS = 20
+
+# VARCHAR(500) file_name, leaving room for the " (pages 123-456).pdf" suffix.
+_MAX_STEM_CHARS = 450
+
+
+@dataclass(frozen=True, slots=True)
+class SplitPlan:
+    """Invoice page ranges ([start, end), 0-based) and one PDF per range."""
+
+    outcome: str
+    page_count: int
+    segments: list[tuple[int, int]]
+    documents: list[bytes]
+
+
+async def split_item(
+    db: AsyncSession,
+    item: UploadItem,
+    file_bytes: bytes,
+) -> tuple[list[uuid.UUID], UploadBatch | None] | None:
+    """
+    Split a multi-invoice PDF into child items (not committed).
+
+    Returns the child item IDs and the updated batch, or None when the upload
+    is processed as a single invoice.
+    """
+    if (
+        not settings.OCR_SPLIT_ENABLED
+        or item.parent_item_id is not None
+        or not file_bytes.startswith(PDF_MAGIC)
+    ):
+        return None
+    try:
+        plan = await executor.run_in_process(plan_split, file_bytes, settings.OCR_SPLIT_MAX_PAGES)
+    except Exception as exc:
+        logger.info("ocr.split_unreadable", item_id=str(item.id), error=str(exc))
+        ocr_split_total.labels(outcome="error").inc()
+        return None
+    ocr_split_total.labels(outcome=plan.outcome).inc()
+    if len(plan.documents) < 2:
+        return None
+
+    stem = PurePosixPath(item.file_name).stem[:_MAX_STEM_CHARS]
+    files = []
+    uploads: list[tuple[bytes, str]] = []
+    for (start, end), document in zip(plan.segments, plan.documents, strict=True):
+        child_id = uuid.uuid5(item.id, f"pages:{start}-{end}")
+        pages = f"page {start + 1}" if end - start == 1 else f"pages {start + 1}-{end}"
+        file_name = f"{stem} ({pages}).pdf"
+        file_url = f"invoices/{item.company_id}/{child_id}/{file_name}"
+        files.append(
+            {
+                "id": child_id,
+                "parent_item_id": item.id,
+                "file_name": file_name,
+                "file_url": file_url,
+                "file_hash": s3_client.compute_sha256(document),
+                "file_size_bytes": len(document),
+            }
+        )
+        uploads.append((document, file_url))
+    await asyncio.gather(*(s3_client.upload_file(document, key) for document, key in uploads))
+
+    child_ids = await repository.create_items(db, item.batch_id, item.company_id, files)
+    batch = await repository.mark_item_split(db, item, len(child_ids))
+    ocr_split_children_total.inc(len(child_ids))
+    logger.info(
+        "ocr.split",
+        item_id=str(item.id),
+        page_count=plan.page_count,
+        invoices=len(child_ids),
+        segments=plan.segments,
+    )
+    return child_ids, batch
+
+
+# ── Boundary detection (runs in the process pool) ─────────────────────────────
+
+
+def plan_split(file_bytes: bytes, max_pages: int) -> SplitPlan:
+    """Detect invoice boundaries and cut one PDF per invoice (blocking)."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(file_bytes))
+    page_count = len(reader.pages)
+    if page_count < 2:
+        return SplitPlan("single", page_count, [], [])
+    if page_count > max_pages:
+        return SplitPlan("too_long", page_count, [], [])
+
+    texts = [page.extract_text() or "" for page in reader.pages]
+    if all(len("".join(text.split())) < _MIN_PAGE_TEXT_CHARS for text in texts):
+        return SplitPlan("no_text", page_count, [], [])
+    segments = find_invoice_boundaries(texts)
+    if len(segments) < 2:
+        return SplitPlan("single", page_count, segments, [])
+    return SplitPlan(
+        "split",
+        page_count,
+        segments,
+        [_write_pages(reader, start, end) for start, end in segments],
+    )
+
+
+def find_invoice_boundaries(page_texts: list[str]) -> list[tuple[int, int]]:
+    """Page ranges [start, end) of the invoices in a document, in page order."""
+    if not page_texts:
+        return []
+    starts = [0]
+    current = find_invoice_number(page_texts[0])
+    for index in range(1, len(page_texts)):
+        text = page_texts[index]
+        number = find_invoice_number(text)
+        if _PAGE_ONE.search(text) or (number and current and number != current):
+            starts.append(index)
+            current = number
+        else:
+            current = current or number
+    ends = [*starts[1:], len(page_texts)]
+    return list(zip(starts, ends, strict=True))
+
+
+def _write_pages(reader, start: int, end: int) -> bytes:
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for index in range(start, end):
+        writer.add_page(reader.pages[index])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
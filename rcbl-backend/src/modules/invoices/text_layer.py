@@ -0,0 +1,343 @@
+"""Local text-layer fast path for born-digital PDFs.
+
+Most uploads are PDFs exported from an invoicing system, so the fields the
+vision model would read off the rendered page are already in the file as
+text. `extract_invoice` pulls the text layer of the first pages with pypdf
+and runs a deterministic, label-driven extractor over it:
+
+  invoice_number   "Invoice No: INV-2024-001", "Rechnung Nr. 4711", ...
+  amount           the labelled total: "Amount due", "Grand total", ... before
+                   a bare "Total"; only money (a currency or two decimals) in
+                   US (1,234.56) and European (1.234,56) number formats
+  invoice_date     labelled issue date, else the first date in the document
+  due_date         labelled due date ("Due date", "Due: ..."), else
+                   invoice_date + "Net 30" style terms
+  currency         ISO code or symbol next to the total, else in the text
+
+A result is only returned when every field needed to accept the item as an
+invoice (invoice_number, amount, invoice_date, due_date) was found, passes
+sanity checks and scores at least OCR_TEXT_LAYER_MIN_CONFIDENCE; otherwise
+the caller escalates to the vision model, as it does for totals whose labels
+disagree and for due dates computed from payment terms. Scans and images (no
+text layer) escalate immediately. Reading the text layer runs in the worker's
+process pool; the field extractor is a few regex passes and runs on the event
+loop.
+"""
+
+import io
+import json
+import re
+import time
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+import structlog
+
+from src.clients.ocr_client import OCRResult
+from src.config import settings
+from src.core import executor
+from src.core.observability import ocr_text_layer_seconds, ocr_text_layer_total
+
+logger = structlog.get_logger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+
+# Fewer non-whitespace characters than this means a scan with no real text layer.
+_MIN_TEXT_CHARS = 40
+
+
+async def extract_invoice(file_bytes: bytes) -> OCRResult | None:
+    """Fields from the PDF text layer, or None when the vision model is needed."""
+    if not settings.OCR_TEXT_LAYER_ENABLED or not file_bytes.startswith(PDF_MAGIC):
+        return None
+    start = time.monotonic()
+    try:
+        text = await executor.run_in_process(
+            extract_text, file_bytes, settings.OCR_TEXT_LAYER_MAX_PAGES
+        )
+    except Exception as exc:
+        logger.info("ocr.text_layer_unreadable", error=str(exc))
+        ocr_text_layer_total.labels(outcome="error").inc()
+        return None
+
+    if len("".join(text.split())) < _MIN_TEXT_CHARS:
+        ocr_text_layer_total.labels(outcome="no_text").inc()
+        return None
+
+    fields = parse_invoice_fields(text)
+    elapsed = time.monotonic() - start
+    ocr_text_layer_seconds.observe(elapsed)
+    if fields is None or fields["confidence"] < settings.OCR_TEXT_LAYER_MIN_CONFIDENCE:
+        ocr_text_layer_total.labels(outcome="incomplete").inc()
+        logger.info(
+            "ocr.text_layer_escalated",
+            confidence=fields["confidence"] if fields else None,
+        )
+        return None
+
+    ocr_text_layer_total.labels(outcome="accepted").inc()
+    return OCRResult(
+        invoice_number=fields["invoice_number"],
+        amount=float(fields["amount"]),
+        currency=fields["currency"],
+        invoice_date=fields["invoice_date"],
+        due_date=fields["due_date"],
+        vendor_name=None,
+        raw_text=json.dumps({**fields, "source": "text_layer"}),
+        confidence=fields["confidence"],
+        processing_ms=int(elapsed * 1000),
+    )
+
+
+def extract_text(file_bytes: bytes, max_pages: int) -> str:
+    """Concatenated text layer of the first `max_pages` pages (blocking)."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(file_bytes))
+    return "\n".join(page.extract_text() or "" for page in reader.pages[:max_pages])
+
+
+# ── Deterministic field extraction ────────────────────────────────────────────
+
+_INVOICE_NUMBER = re.compile(
+    r"\b(?:invoice|rechnung|facture|factura)"
+    r"(?:[ \t]*(?:no\.?|number|num\.?|nr\.?|nummer|n[°o]\.?|#)[ \t]*[:#]?\s*"  # labelled
+    r"|[ \t]*[:#]\s*|[ \t]+)"
+    r"([A-Z0-9][A-Z0-9\-/.]*\d[A-Z0-9\-/]*)",
+    re.IGNORECASE,
+)
+# "Invoice 2024-06-01", "Rechnung 01.06.2024": a date, not an invoice number.
+_DATE_SHAPED = re.compile(r"\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}")
+
+# A money amount; never the leading part of a longer number or of a date.
+_NUMBER = r"(\d{1,3}(?:[,.' ]\d{3})*(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?)(?!\d|[-/.,]\d)"
+_CURRENCY_TOKEN = r"(EUR|USD|GBP|CHF|SEK|NOK|DKK|PLN|CZK|CAD|AUD|€|\$|£)?"
+# Labels naming the payable amount; a bare "Total" may also be a subtotal or a weight.
+_PAYABLE_LABELS = (
+    r"amount\s+due|balance\s+due|total\s+due|grand\s+total|total\s+amount|"
+    r"amount\s+payable|gesamtbetrag|rechnungsbetrag|montant\s+total"
+)
+_PAYABLE_LABEL = re.compile(_PAYABLE_LABELS, re.IGNORECASE)
+# most specific first — "Total" alone also matches the line after "Subtotal"
+_TOTAL_LABELS = rf"{_PAYABLE_LABELS}|(?<!sub)(?<!sub\s)(?<!sub-)total"
+_TOTAL = re.compile(
+    rf"\b({_TOTAL_LABELS})\b[^\n\d€$£]{{0,30}}?{_CURRENCY_TOKEN}\s*{_NUMBER}\s*{_CURRENCY_TOKEN}",
+    re.IGNORECASE,
+)
+# Without a currency next to it, a number is only read as money with two decimals.
+_CENTS = re.compile(r"[.,]\d{2}$")
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("jan", "january", "januar", "janvier"),
+            ("feb", "february", "februar", "février"),
+            ("mar", "march", "märz", "mars"),
+            ("apr", "april", "avril"),
+            ("may", "mai"),
+            ("jun", "june", "juni", "juin"),
+            ("jul", "july", "juli", "juillet"),
+            ("aug", "august", "août"),
+            ("sep", "sept", "september", "septembre"),
+            ("oct", "october", "oktober", "octobre"),
+            ("nov", "november", "novembre"),
+            ("dec", "december", "dezember", "décembre"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+_MONTH_NAME = r"([A-Za-zäéû]{3,9})\.?"
+_DATE = re.compile(
+    r"\b(?:"
+    r"(\d{4})-(\d{1,2})-(\d{1,2})"  # 2024-06-01
+    r"|(\d{1,2})[./](\d{1,2})[./](\d{4})"  # 01.06.2024, 01/06/2024
+    rf"|(\d{{1,2}})\.?\s+{_MONTH_NAME}\s+(\d{{4}})"  # 1 June 2024
+    rf"|{_MONTH_NAME}\s+(\d{{1,2}}),?\s+(\d{{4}})"  # June 1, 2024
+    r")\b"
+)
+_INVOICE_DATE_LABEL = re.compile(
+    r"\b(?:invoice\s+date|date\s+of\s+issue|issue\s+date|issued(?:\s+on)?|"
+    r"rechnungsdatum|date\s+de\s+facturation|date)\b",
+    re.IGNORECASE,
+)
+_DUE_DATE_LABEL = re.compile(
+    r"\b(?:due\s+date|payment\s+due|due\s+by|due\s+on|pay\s+by|payable\s+by|"
+    r"fällig(?:keitsdatum|\s+am)?|zahlbar\s+bis|échéance)\b"
+    # A bare "Due" only when a date follows it directly ("Amount due" is a total).
+    rf"|\bdue(?=[ \t]*:?[ \t]*{_DATE.pattern})",
+    re.IGNORECASE,
+)
+_PAYMENT_TERMS = re.compile(
+    r"\b(?:net|within|innerhalb\s+von|zahlbar\s+in)\s*(\d{1,3})(?![\d.,]\d)\s*(?:days|tage[n]?|jours)?\b",
+    re.IGNORECASE,
+)
+_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP"}
+_ISO_CURRENCY = re.compile(r"\b(EUR|USD|GBP|CHF|SEK|NOK|DKK|PLN|CZK|CAD|AUD)\b")
+
+# Labelled dates must appear within this many characters after their label.
+_LABEL_WINDOW = 40
+
+# Confidence lost per field that was inferred rather than labelled. A due date
+# computed from payment terms may miss the actual agreement ("14 days after
+# delivery"), so it costs enough to fall below OCR_TEXT_LAYER_MIN_CONFIDENCE.
+_INFERRED_PENALTY = 0.05
+_DERIVED_DUE_DATE_PENALTY = 0.15
+
+
+def mentions_total(text: str) -> bool:
+    """Whether `text` carries a labelled invoice total (used to find the totals page)."""
+    return _TOTAL.search(text) is not None
+
+
+def parse_invoice_fields(text: str) -> dict | None:
+    """
+    Extract invoice fields from document text.
+
+    Returns the fields plus a `confidence`, or None when a required field is
+    missing or the values fail sanity checks.
+    """
+    invoice_number = find_invoice_number(text)
+    total = _find_total(text)
+    invoice_date, invoice_date_labelled = _find_invoice_date(text)
+    due_date, due_date_labelled = _find_due_date(text, invoice_date)
+    if not invoice_number or total is None or invoice_date is None or due_date is None:
+        return None
+    amount, currency = total
+    if amount <= 0 or due_date < invoice_date:
+        return None
+    if currency is None:
+        currency = _find_currency(text)
+
+    confidence = 0.95
+    for inferred in (not invoice_date_labelled, currency is None):
+        if inferred:
+            confidence -= _INFERRED_PENALTY
+    if not due_date_labelled:
+        confidence -= _DERIVED_DUE_DATE_PENALTY
+    return {
+        "invoice_number": invoice_number,
+        "amount": str(amount),
+        "currency": currency,
+        "invoice_date": invoice_date.isoformat(),
+        "due_date": due_date.isoformat(),
+        "confidence": round(confidence, 2),
+    }
+
+
+def find_invoice_number(text: str) -> str | None:
+    for match in _INVOICE_NUMBER.finditer(text):
+        number = match.group(1).rstrip(".-/")
+        if not _DATE_SHAPED.fullmatch(number):
+            return number
+    return None
+
+
+def _find_total(text: str) -> tuple[Decimal, str | None] | None:
+    """The payable total and its currency, or None when missing or ambiguous.
+
+    Amounts under a payable label outrank those under a bare "Total"; when the
+    amounts of the winning rank disagree, the vision model has to decide.
+    """
+    ranked: tuple[dict[Decimal, str | None], dict[Decimal, str | None]] = ({}, {})
+    for match in _TOTAL.finditer(text):
+        label, before, raw, after = match.groups()
+        token = before or after
+        amount = parse_amount(raw)
+        if amount is None or (token is None and not _CENTS.search(raw)):
+            continue
+        amounts = ranked[0 if _PAYABLE_LABEL.fullmatch(label) else 1]
+        if amounts.get(amount) is None:
+            amounts[amount] = _SYMBOLS.get(token, token) if token else None
+    amounts = ranked[0] or ranked[1]
+    if len(amounts) != 1:
+        return None
+    return next(iter(amounts.items()))
+
+
+def parse_amount(raw: str) -> Decimal | None:
+    """Parse "1,234.56", "1.234,56", "1 234,56" or "1234" into a Decimal."""
+    value = raw.replace(" ", "").replace("'", "")
+    last_dot, last_comma = value.rfind("."), value.rfind(",")
+    decimal_sep = "." if last_dot > last_comma else ","
+    head, sep, tail = value.rpartition(decimal_sep)
+    if sep and len(tail) in (1, 2):
+        value = head.replace(".", "").replace(",", "") + "." + tail
+    else:
+        value = value.replace(".", "").replace(",", "")
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def _dates(text: str) -> list[tuple[int, date]]:
+    found = []
+    for match in _DATE.finditer(text):
+        parsed = _to_date(match.groups())
+        if parsed is not None:
+            found.append((match.start(), parsed))
+    return found
+
+
+def _to_date(groups: tuple) -> date | None:
+    iso_y, iso_m, iso_d, num_d, num_m, num_y, name_d, name_m, name_y, us_m, us_d, us_y = groups
+    try:
+        if iso_y:
+            return date(int(iso_y), int(iso_m), int(iso_d))
+        if num_y:
+            day, month = int(num_d), int(num_m)
+            if month > 12 >= day:  # 06/30/2024 — only US order is valid
+                day, month = month, day
+            return date(int(num_y), month, day)
+        if name_y:
+            return date(int(name_y), _MONTHS[name_m.lower()], int(name_d))
+        if us_y:
+            return date(int(us_y), _MONTHS[us_m.lower()], int(us_d))
+    except (KeyError, ValueError):
+        return None
+    return None
+
+
+def _labelled_date(text: str, label: re.Pattern, dates: list[tuple[int, date]]) -> date | None:
+    for match in label.finditer(text):
+        for position, value in dates:
+            if match.end() <= position <= match.end() + _LABEL_WINDOW:
+                return value
+    return None
+
+
+def _find_invoice_date(text: str) -> tuple[date | None, bool]:
+    dates = _dates(text)
+    due_positions = {
+        position
+        for match in _DUE_DATE_LABEL.finditer(text)
+        for position, _ in dates
+        if match.end() <= position <= match.end() + _LABEL_WINDOW
+    }
+    undue = [(position, value) for position, value in dates if position not in due_positions]
+    labelled = _labelled_date(text, _INVOICE_DATE_LABEL, undue)
+    if labelled is not None:
+        return labelled, True
+    return (undue[0][1], False) if undue else (None, False)
+
+
+def _find_due_date(text: str, invoice_date: date | None) -> tuple[date | None, bool]:
+    labelled = _labelled_date(text, _DUE_DATE_LABEL, _dates(text))
+    if labelled is not None:
+        return labelled, True
+    terms = _PAYMENT_TERMS.search(text)
+    if terms and invoice_date is not None:
+        return invoice_date + timedelta(days=int(terms.group(1))), False
+    return None, False
+
+
+def _find_currency(text: str) -> str | None:
+    match = _ISO_CURRENCY.search(text)
+    if match:
+        return match.group(1)
+    for symbol, code in _SYMBOLS.items():
+        if symbol in text:
+            return code
+    return None
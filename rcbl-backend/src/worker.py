@@ -4,28 +4,83 @@ Run with: uv run arq src.worker.WorkerSettings
 
 Only the process_ocr job is registered for the MVP invoice upload module.
 Add future jobs by importing and appending to the `functions` list.
+
+OCR jobs reach arq's queue through the per-company fair queue
+(src/core/fair_queue.py): after every job a dispatch round tops the queue up
+again, and a cron job does the same every FAIR_QUEUE_DISPATCH_INTERVAL_SECONDS
+in case no submission or job end triggered one.
+
+Process-wide clients (OCR provider HTTP pool, S3 client) are opened once in
+`startup` and shared by every job this worker runs. The OCR rate limiter is bound
+to the worker's Redis connection there too, so every worker process paces its
+provider calls against the same buckets, the process pool for CPU-bound
+pipeline steps (src/core/executor.py) is started, and the event-loop lag
+monitor (src/core/loop_monitor.py) begins sampling.
 """
 
+from arq import cron
 from arq.connections import RedisSettings
 
+from src.clients import ocr_client, ocr_rate_limit, s3_client
 from src.config import settings
+from src.core import executor, fair_queue, loop_monitor
 from src.modules.invoices.jobs import process_ocr
 
 
+async def startup(ctx: dict) -> None:
+    """Open long-lived clients shared by all jobs in this worker process."""
+    await ocr_client.start_http_client()
+    await s3_client.start_client()
+    ocr_rate_limit.bind_redis(ctx["redis"])
+    executor.start_process_pool(settings.WORKER_PROCESS_POOL_SIZE)
+    loop_monitor.start(settings.WORKER_LOOP_MONITOR_INTERVAL_SECONDS)
+
+
+async def shutdown(ctx: dict) -> None:
+    """Close long-lived clients opened in startup."""
+    await loop_monitor.stop()
+    ocr_rate_limit.bind_redis(None)
+    await ocr_client.close_http_client()
+    await s3_client.close_client()
+    executor.shutdown_process_pool()
+
+
+async def after_job_end(ctx: dict) -> None:
+    """Refill arq's queue from the fair queue now that a job slot is free."""
+    await fair_queue.dispatch_safely(ctx["redis"])
+
+
 class WorkerSettings:
     """arq WorkerSettings — read by the arq CLI."""
 
     functions = [process_ocr]
 
+    cron_jobs = [
+        cron(
+            fair_queue.dispatch_job,
+            second=set(range(0, 60, settings.FAIR_QUEUE_DISPATCH_INTERVAL_SECONDS)),
+            run_at_startup=True,
+            unique=True,
+        )
+    ]
+
     redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
 
-    # Retry settings
-    max_tries = 3
-    job_timeout = 120  # seconds — OCR calls can be slow
+    # Concurrency — provider calls are additionally paced by ocr_rate_limit
+    max_jobs = settings.OCR_WORKER_MAX_JOBS
+
+    # Retry settings — rate-limited OCR jobs are deferred with arq Retry; the
+    # final try degrades instead of deferring again. Limiter deferrals have a
+    # budget of their own (counted per item, see jobs.py).
+    max_tries = (
+        settings.OCR_RATE_LIMIT_MAX_DEFERRALS + settings.OCR_RATE_LIMIT_MAX_LIMITER_DEFERRALS + 1
+    )
+    job_timeout = settings.OCR_JOB_TIMEOUT_SECONDS
 
     # Worker health
     health_check_interval = 30
     health_check_key = "rcbl:worker:health"
 
-    on_startup = None
-    on_shutdown = None
+    on_startup = startup
+    on_shutdown = shutdown
+    after_job_end = after_job_end
@@ -4,6 +4,10 @@ Uses httpx.AsyncClient with ASGITransport to test routes without a live server.
 Auth module tests use a real SQLite in-memory DB via aiosqlite (no Postgres needed).
 """
 
+import asyncio
+import math
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -61,18 +65,242 @@ async def db_session():
         yield session
 
 
+def make_mock_arq_pool(redis: "FakeRedis | None" = None) -> MagicMock:
+    """MagicMock shaped like ArqRedis: AsyncMock enqueue_job, a recording pipeline, and
+    eval served by `redis` (a fresh FakeRedis by default) for the fair-queue scripts."""
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[])
+    pipeline.__aenter__ = AsyncMock(return_value=pipeline)
+    pipeline.__aexit__ = AsyncMock(return_value=None)
+
+    pool = MagicMock()
+    pool.enqueue_job = AsyncMock()
+    pool.pipeline = MagicMock(return_value=pipeline)
+    pool.default_queue_name = "arq:queue"
+    pool.expires_extra_ms = 86_400_000
+    pool.job_serializer = None
+    pool.eval = AsyncMock(side_effect=(redis or FakeRedis()).eval)
+    return pool
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """Build a minimal PDF with one Helvetica text page per entry of `pages`."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    kids = []
+    for lines in pages:
+        text_ops = " ".join(
+            f"({line.replace('(', '[').replace(')', ']')}) Tj 0 -14 Td" for line in lines
+        )
+        content = f"BT /F1 11 Tf 72 760 Td {text_ops} ET".encode("latin-1")
+        page_number, content_number = len(objects) + 1, len(objects) + 2
+        kids.append(b"%d 0 R" % page_number)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (len(pages) * 2 + 3, content_number)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(pages))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+class FakePubSub:
+    """Just enough of redis.asyncio.client.PubSub for the progress stream."""
+
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for name in channels:
+            self.channels.add(name)
+            self._redis.subscribers[name].add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for name in channels or tuple(self.channels):
+            self.channels.discard(name)
+            self._redis.subscribers[name].discard(self)
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0):
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class FakeRedis:
+    """In-process stand-in for the shared Redis connection: pub/sub, strings, lists, zsets, scripts."""
+
+    def __init__(self) -> None:
+        self.subscribers: defaultdict[str, set[FakePubSub]] = defaultdict(set)
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}  # PX set by the scripts, in ms
+        self.lists: defaultdict[str, list[str]] = defaultdict(list)
+        self.hashes: dict[str, tuple[float, int]] = {}
+        self.zsets: defaultdict[str, dict[str, float]] = defaultdict(dict)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def publish(self, channel: str, message: str) -> int:
+        subscribers = self.subscribers[channel]
+        for pubsub in subscribers:
+            pubsub._messages.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.values[key] = value
+        return True
+
+    async def exists(self, *keys: str) -> int:
+        return sum(key in self.values for key in keys)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        items = self.lists[key]
+        return items[start : None if end == -1 else end + 1]
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        """Python ports of the app's Lua scripts, dispatched on the script text."""
+        from src.clients import ocr_rate_limit
+        from src.core import fair_queue
+
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == fair_queue._SUBMIT_SCRIPT:
+            return self._fair_queue_submit(*keys, *args)
+        if script == fair_queue._DISPATCH_SCRIPT:
+            return self._fair_queue_dispatch(*keys, *args)
+        if script == ocr_rate_limit._ACQUIRE_SCRIPT:
+            return self._rate_limit_acquire(*keys, *args)
+        if script == ocr_rate_limit._PAUSE_SCRIPT:
+            (pause_key,), (until_ms, _now) = keys, args
+            if int(until_ms) > int(self.values.get(pause_key, 0)):
+                self.values[pause_key] = str(until_ms)
+            return 0
+        return await self._progress_publish(*keys, *args)
+
+    async def _progress_publish(self, seq_key, log_key, channel, event, data, maxlen, _ttl):
+        event_id = int(self.values.get(seq_key, 0)) + 1
+        self.values[seq_key] = str(event_id)
+        entry = f'{{"id":{event_id},"event":"{event}","data":{data}}}'
+        self.lists[log_key] = (self.lists[log_key] + [entry])[-int(maxlen) :]
+        await self.publish(channel, entry)
+        return event_id
+
+    def _fair_queue_submit(self, ring, queue, other, tenant, now, prefix, result_prefix, *pairs):
+        idle = not self.zsets[queue] and not self.zsets[other]
+        added = 0
+        for index, (job_id, payload) in enumerate(zip(pairs[0::2], pairs[1::2], strict=True)):
+            if prefix + job_id in self.values or result_prefix + job_id in self.values:
+                continue
+            self.values[prefix + job_id] = payload
+            self.zsets[queue][job_id] = float(int(now) + index)
+            added += 1
+        if idle and added:
+            self.lists[ring].append(tenant)
+        return added
+
+    def _fair_queue_dispatch(self, ring, arq_queue, now, ready, prefix, job_prefix, ttl, *weights):
+        budget = int(ready) - len(self.zsets[arq_queue])
+        dispatched, depths, missing = [], [], []
+        while budget > 0 and self.lists[ring]:
+            tenant = self.lists[ring].pop(0)
+            remaining = 0
+            for priority, weight in zip(weights[0::2], weights[1::2], strict=True):
+                queue = self.zsets[f"{prefix}{tenant}:{priority}"]
+                for job_id, score in sorted(queue.items(), key=lambda e: (e[1], e[0]))[
+                    : min(int(weight), budget)
+                ]:
+                    del queue[job_id]
+                    budget -= 1
+                    if job_prefix + job_id not in self.values:
+                        missing.append(job_id)
+                        continue
+                    self.ttls[job_prefix + job_id] = int(ttl)
+                    self.zsets[arq_queue][job_id] = float(now)
+                    dispatched += [tenant, priority, str(score)]
+                remaining += len(queue)
+                depths += [tenant, priority, len(queue)]
+            if remaining:
+                self.lists[ring].append(tenant)
+        return [dispatched, depths, missing]
+
+    def _rate_limit_acquire(self, rpm_key, tpm_key, pause_key, now, rpm, tpm, cost, take):
+        paused_until = int(self.values.get(pause_key, 0))
+        if paused_until > now:
+            return paused_until - now
+
+        def refill(key, capacity):
+            level, ts = self.hashes.get(key, (capacity, now))
+            return min(capacity, level + max(0, now - ts) * capacity / 60000)
+
+        cost = min(cost, tpm)
+        requests, tokens = refill(rpm_key, rpm), refill(tpm_key, tpm)
+        wait = 0.0
+        if requests < 1:
+            wait = max(wait, (1 - requests) * 60000 / rpm)
+        if tokens < cost:
+            wait = max(wait, (cost - tokens) * 60000 / tpm)
+        if wait == 0 and int(take):
+            requests, tokens = requests - 1, tokens - cost
+        self.hashes[rpm_key] = (requests, now)
+        self.hashes[tpm_key] = (tokens, now)
+        return math.ceil(wait)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    """The Redis connection injected into routes by the `client` fixture."""
+    return FakeRedis()
+
+
+@pytest.fixture
+def mock_arq_pool(fake_redis: FakeRedis) -> MagicMock:
+    """The arq pool injected into routes by the `client` fixture (shares `fake_redis`)."""
+    return make_mock_arq_pool(fake_redis)
+
+
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession):
+async def client(db_session: AsyncSession, mock_arq_pool: MagicMock, fake_redis: FakeRedis):
     """
     httpx AsyncClient wired to the FastAPI app.
     Overrides:
-      - get_db / get_tenant_db → SQLite in-memory session
-      - get_arq_pool → MagicMock with AsyncMock enqueue_job (no Redis needed)
+      - get_db / get_tenant_db / get_tenant_read_db → SQLite in-memory session
+      - get_session_factory → a sessionmaker handing out that same session
+      - get_arq_pool → mock_arq_pool (no Redis needed)
+      - get_redis → fake_redis (in-process pub/sub)
     """
-    from src.core.deps import get_arq_pool, get_db, get_tenant_db
-
-    mock_arq_pool = MagicMock()
-    mock_arq_pool.enqueue_job = AsyncMock()
+    from src.core.deps import (
+        get_arq_pool,
+        get_db,
+        get_redis,
+        get_session_factory,
+        get_tenant_db,
+        get_tenant_read_db,
+    )
 
     async def override_get_db():
         yield db_session
@@ -80,12 +308,19 @@ async def client(db_session: AsyncSession):
     async def override_get_tenant_db():
         yield db_session
 
+    @asynccontextmanager
+    async def shared_session():
+        yield db_session
+
     def override_get_arq_pool():
         return mock_arq_pool
 
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[get_tenant_db] = override_get_tenant_db
+    app.dependency_overrides[get_tenant_read_db] = override_get_tenant_db
+    app.dependency_overrides[get_session_factory] = lambda: shared_session
     app.dependency_overrides[get_arq_pool] = override_get_arq_pool
+    app.dependency_overrides[get_redis] = lambda: fake_redis
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
@@ -4,6 +4,10 @@ Tests use in-memory SQLite (no Postgres, no Redis needed).
 These tests verify routes, schemas, and service logic end-to-end.
 """
 
+import asyncio
+import uuid
+from datetime import UTC, datetime
+
 import pytest
 from httpx import AsyncClient
 
@@ -178,3 +182,98 @@ async def test_me_with_expired_token(client: AsyncClient) -> None:
 async def test_logout(client: AsyncClient, auth_headers: dict) -> None:
     response = await client.post("/api/auth/logout", headers=auth_headers)
     assert response.status_code == 204
+
+
+# ── Principal Cache Tests ─────────────────────────────────────────────────────────
+
+
+def _count_user_selects():
+    """Record SELECTs against users issued on the test engine."""
+    from sqlalchemy import event
+
+    from tests.conftest import _test_engine
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(_test_engine.sync_engine, "before_cursor_execute", _record)
+    def stop() -> None:
+        event.remove(_test_engine.sync_engine, "before_cursor_execute", _record)
+
+    return statements, stop
+
+
+@pytest.mark.asyncio
+async def test_authenticated_requests_reuse_cached_principal(
+    client: AsyncClient, auth_headers: dict
+) -> None:
+    statements, stop = _count_user_selects()
+    try:
+        for _ in range(3):
+            response = await client.get("/api/invoices/upload/batches", headers=auth_headers)
+            assert response.status_code == 200
+    finally:
+        stop()
+
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_soft_deleted_user_is_evicted_from_principal_cache(
+    client: AsyncClient, auth_headers: dict, db_session
+) -> None:
+    from src.core.security import decode_token
+    from src.modules.auth.models import User
+
+    response = await client.get("/api/invoices/upload/batches", headers=auth_headers)
+    assert response.status_code == 200
+
+    user_id = decode_token(auth_headers["Authorization"].removeprefix("Bearer "))["sub"]
+    user = await db_session.get(User, uuid.UUID(user_id))
+    user.deleted_at = datetime.now(UTC)
+    await db_session.commit()
+
+    response = await client.get("/api/invoices/upload/batches", headers=auth_headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_redis_tier(db_session, fake_redis) -> None:
+    """A miss in the local tier is served from Redis; committed changes delete the Redis entry."""
+    from src.modules.auth import principal as principal_cache
+    from src.modules.auth.models import Company, User
+
+    unique = uuid.uuid4().hex[:8]
+    company = Company(
+        id=uuid.uuid4(), name="Cache Co", slug=f"cache-{unique}", email=f"co-{unique}@cache.test"
+    )
+    user = User(
+        id=uuid.uuid4(),
+        company_id=company.id,
+        email=f"user-{unique}@cache.test",
+        password_hash="x",
+        name="Cache User",
+    )
+    db_session.add_all([company, user])
+    await db_session.commit()
+
+    principal_cache.bind_redis(fake_redis)
+    try:
+        principal = await principal_cache.get(db_session, user.id)
+        assert principal == principal_cache.Principal(id=user.id, company_id=company.id)
+        assert principal_cache.cache_key(user.id) in fake_redis.values
+
+        principal_cache._local.pop(user.id)
+        with_redis_only = await principal_cache.get(None, user.id)  # no DB needed
+        assert with_redis_only == principal
+
+        user.name = "Renamed"
+        await db_session.commit()
+        await asyncio.sleep(0)  # let the post-commit invalidation task run
+        assert principal_cache.cache_key(user.id) not in fake_redis.values
+        assert principal_cache._local.get(user.id) is None
+    finally:
+        principal_cache.bind_redis(None)
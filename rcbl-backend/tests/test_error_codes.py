@@ -138,7 +138,7 @@ async def test_invalid_item_status_error_structure(
     from src.modules.invoices.models import UploadItem, ItemStatus
 
     # Create an item
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -0,0 +1,60 @@
+"""Tests for the worker's CPU offload (executor) and event-loop lag monitor."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.clients.ocr_client import encode_request
+from src.config import settings
+from src.core import executor, loop_monitor
+
+
+def _thread_id() -> int:
+    return threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_run_inline() -> None:
+    assert await executor.run_cpu_bound(_thread_id, payload_bytes=10) == threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_leave_the_event_loop_thread() -> None:
+    thread_id = await executor.run_cpu_bound(
+        _thread_id, payload_bytes=settings.WORKER_OFFLOAD_MIN_BYTES
+    )
+
+    assert thread_id != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_encodes_provider_requests() -> None:
+    document = b"%PDF-1.4 " + bytes(range(256)) * 4096  # 1 MiB
+    executor.start_process_pool(1)
+    try:
+        body = await executor.run_cpu_bound(
+            encode_request, [document], "application/pdf", payload_bytes=len(document)
+        )
+    finally:
+        executor.shutdown_process_pool()
+
+    assert body == encode_request([document], "application/pdf")
+    assert json.loads(body)["messages"][1]["content"][0]["image_url"]["detail"] == "high"
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_measures_blocking() -> None:
+    loop_monitor.start(0.01)
+    try:
+        await asyncio.sleep(0.02)
+        before = loop_monitor.blocked_seconds()
+        time.sleep(0.1)  # a synchronous step stalling the loop
+        await asyncio.sleep(0.03)
+        blocked = loop_monitor.blocked_seconds() - before
+    finally:
+        await loop_monitor.stop()
+
+    assert 0.07 <= blocked < 0.5
@@ -0,0 +1,198 @@
+"""Unit tests for per-tenant fair queueing (src/core/fair_queue.py).
+
+The Lua scripts run against the Python ports in tests.conftest.FakeRedis.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from arq.constants import job_key_prefix
+from arq.jobs import deserialize_job
+from prometheus_client import REGISTRY
+
+from src.config import settings
+from src.core import fair_queue
+from src.core.fair_queue import Priority
+from tests.conftest import FakeRedis, make_mock_arq_pool
+
+ARQ_QUEUE = "arq:queue"
+
+
+@pytest.fixture
+def pool(fake_redis: FakeRedis, monkeypatch):
+    monkeypatch.setattr(settings, "FAIR_QUEUE_INTERACTIVE_WEIGHT", 4)
+    monkeypatch.setattr(settings, "FAIR_QUEUE_BULK_WEIGHT", 1)
+    return make_mock_arq_pool(fake_redis)
+
+
+def _dispatched_order(fake_redis: FakeRedis, job_tenants: dict[str, str]) -> list[str]:
+    return [job_tenants[job_id] for job_id in fake_redis.zsets[ARQ_QUEUE]]
+
+
+@pytest.mark.asyncio
+async def test_submit_stores_arq_payloads_and_dispatches(pool, fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 2)
+
+    job_ids = await fair_queue.submit(
+        pool,
+        "co-1",
+        "process_ocr",
+        [("i1", "co-1"), ("i2", "co-1"), ("i3", "co-1")],
+        priority=Priority.bulk,
+    )
+
+    assert len(job_ids) == 3
+    job = deserialize_job(fake_redis.values[job_key_prefix + job_ids[0]])
+    assert (job.function, job.args) == ("process_ocr", ("i1", "co-1"))
+    # Only the ready target reaches arq; the rest waits in the company's sub-queue.
+    assert list(fake_redis.zsets[ARQ_QUEUE]) == job_ids[:2]
+    assert list(fake_redis.zsets[fair_queue.tenant_key("co-1", Priority.bulk)]) == job_ids[2:]
+    assert fake_redis.lists[fair_queue.RING_KEY] == ["co-1"]
+
+    # A slot frees up (arq finished a job): the next round moves the last one.
+    del fake_redis.zsets[ARQ_QUEUE][job_ids[0]]
+    assert await fair_queue.dispatch(pool) == 1
+    assert fake_redis.lists[fair_queue.RING_KEY] == []
+    assert await fair_queue.submit(pool, "co-1", "process_ocr", [], priority=Priority.bulk) == []
+
+
+@pytest.mark.asyncio
+async def test_payload_expiry_starts_at_dispatch(pool, fake_redis, monkeypatch) -> None:
+    """A job waiting behind a busy company keeps its payload until arq gets it."""
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 0)
+    job_ids = await fair_queue.submit(
+        pool, "co-1", "process_ocr", [("i1", "co-1"), ("i2", "co-1")], priority=Priority.bulk
+    )
+    assert fake_redis.ttls == {}  # no expiry while waiting in the sub-queue
+
+    # i2's payload was lost (e.g. written with an expiry by an older release).
+    del fake_redis.values[job_key_prefix + job_ids[1]]
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 2)
+
+    assert await fair_queue.dispatch(pool) == 1
+    assert list(fake_redis.zsets[ARQ_QUEUE]) == job_ids[:1]
+    assert fake_redis.ttls == {job_key_prefix + job_ids[0]: pool.expires_extra_ms}
+    assert fake_redis.lists[fair_queue.RING_KEY] == []
+
+
+@pytest.mark.asyncio
+async def test_single_uploads_do_not_wait_behind_another_tenants_backlog(
+    pool, fake_redis, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 0)  # hold everything back
+    tenants: dict[str, str] = {}
+    bulk = await fair_queue.submit(
+        pool, "big", "process_ocr", [(f"b{n}", "big") for n in range(50)], priority=Priority.bulk
+    )
+    tenants.update(dict.fromkeys(bulk, "big"))
+    small = await fair_queue.submit(
+        pool, "small", "process_ocr", [("s1", "small")], priority=Priority.interactive
+    )
+    tenants.update(dict.fromkeys(small, "small:interactive"))
+    own_bulk = await fair_queue.submit(
+        pool, "small", "process_ocr", [("s2", "small")], priority=Priority.bulk
+    )
+    tenants.update(dict.fromkeys(own_bulk, "small:bulk"))
+    assert fake_redis.zsets[ARQ_QUEUE] == {}
+
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 5)
+    assert await fair_queue.dispatch(pool) == 5
+
+    # One turn each: big's bulk weight, then small's interactive before its bulk job.
+    assert _dispatched_order(fake_redis, tenants) == [
+        "big",
+        "small:interactive",
+        "small:bulk",
+        "big",
+        "big",
+    ]
+    assert fake_redis.lists[fair_queue.RING_KEY] == ["big"]
+
+
+@pytest.mark.asyncio
+async def test_interactive_weight_per_turn(pool, fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 0)
+    tenants: dict[str, str] = {}
+    for tenant in ("a", "b"):
+        ids = await fair_queue.submit(
+            pool,
+            tenant,
+            "process_ocr",
+            [(f"{tenant}{n}", tenant) for n in range(6)],
+            priority=Priority.interactive,
+        )
+        tenants.update(dict.fromkeys(ids, tenant))
+
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 10)
+    await fair_queue.dispatch(pool)
+
+    assert _dispatched_order(fake_redis, tenants) == ["a"] * 4 + ["b"] * 4 + ["a"] * 2
+
+
+@pytest.mark.asyncio
+async def test_dispatch_exports_tenant_depth_and_wait(pool, fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 1)
+    wait_count = (
+        REGISTRY.get_sample_value(
+            "fair_queue_wait_seconds_count", {"tenant": "metrics-co", "priority": "bulk"}
+        )
+        or 0
+    )
+
+    await fair_queue.submit(
+        pool, "metrics-co", "process_ocr", [("m1",), ("m2",), ("m3",)], priority=Priority.bulk
+    )
+
+    labels = {"tenant": "metrics-co", "priority": "bulk"}
+    assert REGISTRY.get_sample_value("fair_queue_depth", labels) == 2
+    assert REGISTRY.get_sample_value("fair_queue_wait_seconds_count", labels) == wait_count + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_round_keeps_submitted_jobs(fake_redis) -> None:
+    """Submission succeeds when only the dispatch round fails; the jobs stay queued."""
+    pool = make_mock_arq_pool(fake_redis)
+
+    async def eval_(script, *args):
+        if script == fair_queue._DISPATCH_SCRIPT:
+            raise ConnectionError("redis down")
+        return await fake_redis.eval(script, *args)
+
+    pool.eval = AsyncMock(side_effect=eval_)
+    job_ids = await fair_queue.submit(
+        pool, "co-9", "process_ocr", [("i1", "co-9")], priority=Priority.interactive
+    )
+
+    assert list(fake_redis.zsets[fair_queue.tenant_key("co-9", Priority.interactive)]) == job_ids
+    assert fake_redis.lists[fair_queue.RING_KEY] == ["co-9"]
+    with pytest.raises(ConnectionError):
+        await fair_queue.dispatch(pool)
+
+
+@pytest.mark.asyncio
+async def test_resubmitting_derived_job_ids_is_idempotent(pool, fake_redis, monkeypatch) -> None:
+    """A retried upload submits nothing for jobs still waiting, queued or finished."""
+    from arq.constants import result_key_prefix
+
+    from src.core.queue import job_id
+
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 1)
+    args = [("i1", "co-1"), ("i2", "co-1"), ("i3", "co-1")]
+    derived = [job_id("process_ocr", item) for item, _ in args]
+
+    await fair_queue.submit(
+        pool, "co-1", "process_ocr", args, priority=Priority.bulk, job_ids=derived
+    )
+    # i1 was dispatched and has finished; i2 and i3 are still in the sub-queue.
+    del fake_redis.zsets[ARQ_QUEUE][derived[0]]
+    del fake_redis.values[job_key_prefix + derived[0]]
+    fake_redis.values[result_key_prefix + derived[0]] = b"result"
+    monkeypatch.setattr(settings, "FAIR_QUEUE_READY_JOBS", 0)
+
+    await fair_queue.submit(
+        pool, "co-1", "process_ocr", args, priority=Priority.bulk, job_ids=derived
+    )
+
+    assert list(fake_redis.zsets[fair_queue.tenant_key("co-1", Priority.bulk)]) == derived[1:]
+    assert fake_redis.zsets[ARQ_QUEUE] == {}
+    assert fake_redis.lists[fair_queue.RING_KEY] == ["co-1"]
@@ -3,6 +3,8 @@
 S3 is mocked via patch; arq pool is mocked via dependency override in conftest.
 """
 
+import asyncio
+import hashlib
 import io
 import uuid
 from decimal import Decimal
@@ -13,12 +15,19 @@ from httpx import AsyncClient
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
+from src.modules.invoices import ocr_cache
 from src.modules.invoices.models import ItemStatus, UploadBatch, UploadItem
 
 SMALL_PDF = b"%PDF-1.4 test content"
 LARGE_FILE = b"x" * (21 * 1024 * 1024)  # 21 MB - exceeds limit
 
 
+def _pdf(n: int) -> bytes:
+    """Distinct PDF bodies — identical bytes are deduplicated at upload time."""
+    return SMALL_PDF + f" {n}".encode()
+
+
 # ── Auth Required Tests ─────────────────────────────────────────────────────────
 
 
@@ -69,7 +78,7 @@ async def test_reject_item_requires_auth(client: AsyncClient) -> None:
 
 @pytest.mark.asyncio
 async def test_upload_single_success(client: AsyncClient, auth_headers: dict) -> None:
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -86,7 +95,7 @@ async def test_upload_single_success(client: AsyncClient, auth_headers: dict) ->
 @pytest.mark.asyncio
 async def test_upload_single_pdf(client: AsyncClient, auth_headers: dict) -> None:
     """Test PDF upload works."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -98,7 +107,7 @@ async def test_upload_single_pdf(client: AsyncClient, auth_headers: dict) -> Non
 @pytest.mark.asyncio
 async def test_upload_single_jpeg(client: AsyncClient, auth_headers: dict) -> None:
     """Test JPEG upload works."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -110,7 +119,7 @@ async def test_upload_single_jpeg(client: AsyncClient, auth_headers: dict) -> No
 @pytest.mark.asyncio
 async def test_upload_single_png(client: AsyncClient, auth_headers: dict) -> None:
     """Test PNG upload works."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -122,7 +131,7 @@ async def test_upload_single_png(client: AsyncClient, auth_headers: dict) -> Non
 @pytest.mark.asyncio
 async def test_upload_single_tiff(client: AsyncClient, auth_headers: dict) -> None:
     """Test TIFF upload works."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -158,6 +167,48 @@ async def test_upload_file_too_large(client: AsyncClient, auth_headers: dict) ->
     assert "exceeds" in data["detail"].lower()
 
 
+@pytest.mark.asyncio
+async def test_upload_single_records_streamed_hash_and_size(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    """Hash and size are computed from the streamed chunks and the file is rewound for S3."""
+    streamed: list[bytes] = []
+
+    async def fake_upload_stream(stream, key, content_type="application/pdf") -> int:
+        streamed.append(await stream.read())
+        return len(streamed[-1])
+
+    with patch("src.modules.invoices.service.s3_client.upload_stream", fake_upload_stream):
+        response = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+    assert response.status_code == 202
+    assert streamed == [SMALL_PDF]
+
+    result = await db_session.execute(
+        select(UploadItem).where(UploadItem.id == uuid.UUID(response.json()["item_id"]))
+    )
+    item = result.scalar_one()
+    assert item.file_hash == hashlib.sha256(SMALL_PDF).hexdigest()
+    assert item.file_size_bytes == len(SMALL_PDF)
+
+
+@pytest.mark.asyncio
+async def test_upload_file_too_large_never_reaches_s3(client: AsyncClient, auth_headers: dict) -> None:
+    """Oversized files are rejected during the local scan, before any S3 call."""
+    mock_upload = AsyncMock()
+    with patch("src.modules.invoices.service.s3_client.upload_stream", mock_upload):
+        response = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("large.pdf", io.BytesIO(LARGE_FILE), "application/pdf")},
+        )
+    assert response.status_code == 422
+    mock_upload.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_upload_unsupported_content_type(client: AsyncClient, auth_headers: dict) -> None:
     """Unsupported content type should return FILE_VALIDATION_ERROR."""
@@ -177,13 +228,13 @@ async def test_upload_unsupported_content_type(client: AsyncClient, auth_headers
 
 @pytest.mark.asyncio
 async def test_upload_bulk_success(client: AsyncClient, auth_headers: dict) -> None:
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload/bulk",
             headers=auth_headers,
             files=[
-                ("files", ("inv1.pdf", io.BytesIO(SMALL_PDF), "application/pdf")),
-                ("files", ("inv2.pdf", io.BytesIO(SMALL_PDF), "application/pdf")),
+                ("files", ("inv1.pdf", io.BytesIO(_pdf(1)), "application/pdf")),
+                ("files", ("inv2.pdf", io.BytesIO(_pdf(2)), "application/pdf")),
             ],
         )
 
@@ -198,12 +249,12 @@ async def test_upload_bulk_success(client: AsyncClient, auth_headers: dict) -> N
 @pytest.mark.asyncio
 async def test_upload_bulk_multiple_files(client: AsyncClient, auth_headers: dict) -> None:
     """Test bulk upload with 5 files."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         response = await client.post(
             "/api/invoices/upload/bulk",
             headers=auth_headers,
             files=[
-                ("files", (f"inv{i}.pdf", io.BytesIO(SMALL_PDF), "application/pdf"))
+                ("files", (f"inv{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf"))
                 for i in range(5)
             ],
         )
@@ -214,6 +265,222 @@ async def test_upload_bulk_multiple_files(client: AsyncClient, auth_headers: dic
     assert len(data["items"]) == 5
 
 
+@pytest.mark.asyncio
+async def test_upload_bulk_reports_invalid_files_per_item(
+    client: AsyncClient, auth_headers: dict
+) -> None:
+    """An invalid file is reported in its summary instead of failing the whole request."""
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        response = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", ("inv1.pdf", io.BytesIO(SMALL_PDF), "application/pdf")),
+                ("files", ("notes.txt", io.BytesIO(b"text"), "text/plain")),
+                ("files", ("empty.pdf", io.BytesIO(b""), "application/pdf")),
+            ],
+        )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["total_files"] == 1
+    statuses = [(item["file_name"], item["status"]) for item in data["items"]]
+    assert statuses == [("inv1.pdf", "queued"), ("notes.txt", "failed"), ("empty.pdf", "failed")]
+    assert data["items"][0]["item_id"] is not None
+    assert data["items"][1]["item_id"] is None
+    assert "unsupported" in data["items"][1]["error"].lower()
+
+
+@pytest.mark.asyncio
+async def test_upload_bulk_all_invalid_returns_validation_error(
+    client: AsyncClient, auth_headers: dict
+) -> None:
+    response = await client.post(
+        "/api/invoices/upload/bulk",
+        headers=auth_headers,
+        files=[("files", ("empty.pdf", io.BytesIO(b""), "application/pdf"))],
+    )
+    assert response.status_code == 422
+    assert response.json()["error"] == "FILE_VALIDATION_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_upload_bulk_uploads_concurrently_within_limit(
+    client: AsyncClient, auth_headers: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """S3 uploads overlap, but never exceed BULK_UPLOAD_CONCURRENCY at once."""
+    from src.modules.invoices import service
+
+    monkeypatch.setattr(service.settings, "BULK_UPLOAD_CONCURRENCY", 3)
+    in_flight = 0
+    peak = 0
+
+    async def slow_upload(stream, key, content_type="application/pdf") -> int:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return 0
+
+    with patch("src.modules.invoices.service.s3_client.upload_stream", slow_upload):
+        response = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", (f"inv{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf"))
+                for i in range(8)
+            ],
+        )
+
+    assert response.status_code == 202
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_upload_bulk_store_failure_is_reported(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    """A file whose S3 upload fails is reported and left out of the batch."""
+
+    async def flaky_upload(stream, key, content_type="application/pdf") -> int:
+        if "inv1.pdf" in key:
+            raise OSError("connection reset")
+        return 0
+
+    with patch("src.modules.invoices.service.s3_client.upload_stream", flaky_upload):
+        response = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", ("inv0.pdf", io.BytesIO(_pdf(0)), "application/pdf")),
+                ("files", ("inv1.pdf", io.BytesIO(_pdf(1)), "application/pdf")),
+            ],
+        )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["total_files"] == 1
+    assert [item["status"] for item in data["items"]] == ["queued", "failed"]
+
+    batch = await db_session.get(UploadBatch, uuid.UUID(data["batch_id"]))
+    assert batch.total_files == 1
+
+
+# ── Upload Dedup Tests ──────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_upload_single_duplicate_links_existing_item(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    """Re-uploading identical bytes returns the existing item without storing or queueing."""
+    mock_upload = AsyncMock()
+    with patch("src.modules.invoices.service.s3_client.upload_stream", mock_upload):
+        first = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+        second = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("copy.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+
+    assert second.status_code == 202
+    assert second.json()["status"] == "duplicate"
+    assert second.json()["item_id"] == first.json()["item_id"]
+    assert second.json()["batch_id"] == first.json()["batch_id"]
+    mock_upload.assert_awaited_once()
+    # One OCR job, for the first upload, under an ID derived from the item ID
+    assert list(fake_redis.zsets["arq:queue"]) == [f"process_ocr:{first.json()['item_id']}"]
+
+
+@pytest.mark.asyncio
+async def test_upload_after_rejection_is_not_deduplicated(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    """A rejected item does not block uploading the same file again."""
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        first = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+        item = await db_session.get(UploadItem, uuid.UUID(first.json()["item_id"]))
+        item.status = ItemStatus.rejected
+        await db_session.commit()
+
+        second = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+
+    assert second.json()["status"] == "queued"
+    assert second.json()["item_id"] != first.json()["item_id"]
+
+
+@pytest.mark.asyncio
+async def test_upload_bulk_links_duplicates_within_and_across_requests(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    mock_upload = AsyncMock()
+    with patch("src.modules.invoices.service.s3_client.upload_stream", mock_upload):
+        earlier = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("old.pdf", io.BytesIO(_pdf(0)), "application/pdf")},
+        )
+        response = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", ("a.pdf", io.BytesIO(_pdf(1)), "application/pdf")),
+                ("files", ("a-copy.pdf", io.BytesIO(_pdf(1)), "application/pdf")),
+                ("files", ("old-again.pdf", io.BytesIO(_pdf(0)), "application/pdf")),
+            ],
+        )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["total_files"] == 1
+    new, copy, old_again = data["items"]
+    assert new["status"] == "queued"
+    assert copy == {**copy, "status": "duplicate", "item_id": new["item_id"], "linked_status": "queued"}
+    assert old_again["status"] == "duplicate"
+    assert old_again["item_id"] == earlier.json()["item_id"]
+    assert mock_upload.await_count == 2  # old.pdf + a.pdf only
+
+    # old.pdf, plus one OCR job for the bulk request
+    assert len(fake_redis.zsets["arq:queue"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_upload_bulk_all_duplicates_queues_nothing(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+        )
+        response = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[("files", ("invoice.pdf", io.BytesIO(SMALL_PDF), "application/pdf"))],
+        )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["batch_id"] is None
+    assert data["total_files"] == 0
+    assert data["items"][0]["status"] == "duplicate"
+    assert len(fake_redis.zsets["arq:queue"]) == 1  # only the earlier single upload
+
+
 # ── List Batches Tests ──────────────────────────────────────────────────────────
 
 
@@ -228,17 +495,17 @@ async def test_list_batches_empty(client: AsyncClient, auth_headers: dict) -> No
 @pytest.mark.asyncio
 async def test_list_batches_with_data(client: AsyncClient, auth_headers: dict) -> None:
     """List batches should return created batches."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         # Create two batches
         await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
-            files={"file": ("invoice1.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+            files={"file": ("invoice1.pdf", io.BytesIO(_pdf(1)), "application/pdf")},
         )
         await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
-            files={"file": ("invoice2.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+            files={"file": ("invoice2.pdf", io.BytesIO(_pdf(2)), "application/pdf")},
         )
 
     response = await client.get("/api/invoices/upload/batches", headers=auth_headers)
@@ -250,13 +517,13 @@ async def test_list_batches_with_data(client: AsyncClient, auth_headers: dict) -
 @pytest.mark.asyncio
 async def test_list_batches_pagination(client: AsyncClient, auth_headers: dict) -> None:
     """Test pagination parameters work."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         # Create 5 batches
         for i in range(5):
             await client.post(
                 "/api/invoices/upload",
                 headers=auth_headers,
-                files={"file": (f"invoice{i}.pdf", io.BytesIO(SMALL_PDF), "application/pdf")},
+                files={"file": (f"invoice{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf")},
             )
 
     # Get first 2
@@ -278,6 +545,87 @@ async def test_list_batches_pagination(client: AsyncClient, auth_headers: dict)
     assert len(batches) == 1
 
 
+@pytest.mark.asyncio
+async def test_list_batches_cursor_pagination(client: AsyncClient, auth_headers: dict) -> None:
+    """Following X-Next-Cursor visits every batch once, newest first."""
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        for i in range(5):
+            await client.post(
+                "/api/invoices/upload",
+                headers=auth_headers,
+                files={"file": (f"invoice{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf")},
+            )
+
+    # A browser dashboard on another origin must be allowed to read the header.
+    headers = {**auth_headers, "Origin": settings.ALLOWED_ORIGINS[0]}
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/invoices/upload/batches", params=params, headers=headers)
+        assert response.status_code == 200
+        assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+        seen.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len({b["id"] for b in seen}) == 5
+    created = [b["created_at"] for b in seen]
+    assert created == sorted(created, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_list_batches_rejects_malformed_cursor(client: AsyncClient, auth_headers: dict) -> None:
+    response = await client.get(
+        "/api/invoices/upload/batches?cursor=not-a-cursor", headers=auth_headers
+    )
+    assert response.status_code == 422
+    assert response.json()["error"] == "INVALID_CURSOR"
+
+
+@pytest.mark.asyncio
+async def test_list_batch_items_cursor_pagination(client: AsyncClient, auth_headers: dict) -> None:
+    """Items of one bulk upload page exactly once, in upload order."""
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        upload = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", (f"invoice{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf"))
+                for i in range(5)
+            ],
+        )
+    batch_id = upload.json()["batch_id"]
+
+    seen, names, cursor = [], [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(
+            f"/api/invoices/upload/batches/{batch_id}/items", params=params, headers=auth_headers
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        names.extend(item["file_name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [item["item_id"] for item in upload.json()["items"]]
+    assert names == [f"invoice{i}.pdf" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_list_batch_items_unknown_batch(client: AsyncClient, auth_headers: dict) -> None:
+    response = await client.get(
+        f"/api/invoices/upload/batches/{uuid.uuid4()}/items", headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
 # ── Get Batch Tests ──────────────────────────────────────────────────────────────
 
 
@@ -293,7 +641,7 @@ async def test_get_batch_not_found(client: AsyncClient, auth_headers: dict) -> N
 @pytest.mark.asyncio
 async def test_get_batch_success(client: AsyncClient, auth_headers: dict) -> None:
     """Get batch detail with items."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -309,6 +657,78 @@ async def test_get_batch_success(client: AsyncClient, auth_headers: dict) -> Non
     assert len(data["items"]) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_batch_returns_first_item_page_without_ocr_data(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        upload = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", (f"invoice{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf"))
+                for i in range(3)
+            ],
+        )
+    batch_id = upload.json()["batch_id"]
+    items = (
+        await db_session.execute(
+            select(UploadItem).where(UploadItem.batch_id == uuid.UUID(batch_id))
+        )
+    ).scalars().all()
+    for item in items:
+        item.ocr_extracted_data = {"invoice_number": "INV-1", "raw_text": "x" * 1000}
+    await db_session.commit()
+
+    response = await client.get(
+        f"/api/invoices/upload/batches/{batch_id}?limit=2", headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_files"] == 3
+    assert len(data["items"]) == 2
+    assert all(item["ocr_extracted_data"] is None for item in data["items"])
+    assert data["next_cursor"]
+
+    rest = await client.get(
+        f"/api/invoices/upload/batches/{batch_id}/items",
+        params={"cursor": data["next_cursor"], "include_ocr_data": "true"},
+        headers=auth_headers,
+    )
+    assert rest.status_code == 200
+    [last] = rest.json()["items"]
+    assert last["ocr_extracted_data"]["invoice_number"] == "INV-1"
+    assert rest.json()["next_cursor"] is None
+    assert {i["id"] for i in data["items"]} | {last["id"]} == {str(i.id) for i in items}
+
+
+@pytest.mark.asyncio
+async def test_get_batch_filters_items_by_status(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        upload = await client.post(
+            "/api/invoices/upload/bulk",
+            headers=auth_headers,
+            files=[
+                ("files", (f"invoice{i}.pdf", io.BytesIO(_pdf(i)), "application/pdf"))
+                for i in range(3)
+            ],
+        )
+    review_id = upload.json()["items"][1]["item_id"]
+    item = await db_session.get(UploadItem, uuid.UUID(review_id))
+    item.status = ItemStatus.review_pending.value
+    await db_session.commit()
+
+    response = await client.get(
+        f"/api/invoices/upload/batches/{upload.json()['batch_id']}?status=review_pending",
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert [i["id"] for i in response.json()["items"]] == [review_id]
+
+
 # ── Get Item Tests ───────────────────────────────────────────────────────────────
 
 
@@ -324,7 +744,7 @@ async def test_get_item_not_found(client: AsyncClient, auth_headers: dict) -> No
 @pytest.mark.asyncio
 async def test_get_item_success(client: AsyncClient, auth_headers: dict) -> None:
     """Get item detail with OCR data."""
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -340,6 +760,39 @@ async def test_get_item_success(client: AsyncClient, auth_headers: dict) -> None
     assert data["file_name"] == "invoice.pdf"
 
 
+@pytest.mark.asyncio
+async def test_item_ocr_data_is_deferred_unless_requested(db_session: AsyncSession) -> None:
+    """Status-only reads never fetch the OCR JSON; touching it by accident raises."""
+    from sqlalchemy import inspect
+    from sqlalchemy.exc import InvalidRequestError
+
+    from src.modules.invoices import repository
+
+    item_id, company_id = uuid.uuid4(), uuid.uuid4()
+    db_session.add(
+        UploadItem(
+            id=item_id,
+            batch_id=uuid.uuid4(),
+            company_id=company_id,
+            file_name="a.pdf",
+            file_url="invoices/a.pdf",
+            status=ItemStatus.ready.value,
+            ocr_extracted_data={"raw_text": "x" * 10_000},
+        )
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+
+    item = await repository.get_item_by_id(db_session, item_id, company_id)
+    assert "ocr_extracted_data" in inspect(item).unloaded
+    with pytest.raises(InvalidRequestError):
+        _ = item.ocr_extracted_data
+    db_session.expunge_all()
+
+    item = await repository.get_item_by_id(db_session, item_id, company_id, with_ocr_data=True)
+    assert len(item.ocr_extracted_data["raw_text"]) == 10_000
+
+
 # ── Accept Item Tests ────────────────────────────────────────────────────────────
 
 
@@ -380,7 +833,7 @@ async def test_accept_item_invalid_status(
 ) -> None:
     """Accepting an item with wrong status should return INVALID_ITEM_STATUS."""
     # Create an item
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -416,7 +869,7 @@ async def test_accept_item_success_with_ocr_data(
 ) -> None:
     """Accept item with OCR data should create invoice."""
     # Create an item
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -487,11 +940,11 @@ async def test_reject_item_not_found(client: AsyncClient, auth_headers: dict) ->
 
 @pytest.mark.asyncio
 async def test_reject_item_success(
-    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession, fake_redis
 ) -> None:
     """Reject item should set status to rejected."""
     # Create an item
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -507,6 +960,9 @@ async def test_reject_item_success(
     item.status = ItemStatus.ready
     await db_session.commit()
 
+    cached = ocr_cache.cache_key(item.company_id, item.file_hash)
+    fake_redis.values[cached] = "{}"  # the item's OCR result, cached by the worker
+
     response = await client.patch(
         f"/api/invoices/upload/items/{item_id}/reject",
         headers=auth_headers,
@@ -514,6 +970,7 @@ async def test_reject_item_success(
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "rejected"
+    assert cached not in fake_redis.values  # a re-upload is OCR'd again
 
 
 @pytest.mark.asyncio
@@ -522,7 +979,7 @@ async def test_reject_item_invalid_status(
 ) -> None:
     """Rejecting an already accepted item should return INVALID_ITEM_STATUS."""
     # Create an item
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -545,3 +1002,178 @@ async def test_reject_item_invalid_status(
     assert response.status_code == 422
     data = response.json()
     assert data["error"] == "INVALID_ITEM_STATUS"
+
+
+# ── Progress Stream Tests ────────────────────────────────────────────────────────
+
+
+def _sse_events(body: str, with_ids: bool = False) -> list[tuple]:
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if not lines:
+            continue
+        event = (lines["event"], json.loads(lines["data"]))
+        events.append((lines.get("id"), *event) if with_ids else event)
+    return events
+
+
+async def _upload_one(client: AsyncClient, auth_headers: dict) -> tuple[str, str]:
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        upload = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(_pdf(uuid.uuid4().int)), "application/pdf")},
+        )
+    return upload.json()["batch_id"], upload.json()["item_id"]
+
+
+async def _open_stream(client: AsyncClient, auth_headers: dict, fake_redis, batch_id, headers=None):
+    """Start a progress request in the background and wait until it is subscribed."""
+    from src.modules.invoices import progress
+
+    channel = progress.channel(batch_id)
+    subscribed = len(fake_redis.subscribers[channel])
+    stream = asyncio.create_task(
+        client.get(
+            f"/api/invoices/upload/batches/{batch_id}/progress",
+            headers={**auth_headers, **(headers or {})},
+        )
+    )
+    while len(fake_redis.subscribers[channel]) == subscribed:
+        await asyncio.sleep(0.01)
+    return stream
+
+
+def _finished_batch(batch_id: str):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(
+        id=batch_id,
+        status="review_pending",
+        total_files=1,
+        processed_files=1,
+        successful_files=1,
+        failed_files=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_progress_streams_published_deltas(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    """After the snapshot the stream only relays worker events, and ends once the batch is done."""
+    from src.modules.invoices import progress
+
+    batch_id, item_id = await _upload_one(client, auth_headers)
+    stream = await _open_stream(client, auth_headers, fake_redis, batch_id)
+    await progress.publish_item(
+        fake_redis, batch_id, item_id, file_name="invoice.pdf", status="ready", confidence=0.97
+    )
+    await progress.publish_batch(fake_redis, _finished_batch(batch_id))
+    response = await asyncio.wait_for(stream, timeout=5)
+
+    assert response.status_code == 200
+    events = _sse_events(response.text, with_ids=True)
+    assert [(event_id, name) for event_id, name, _ in events] == [
+        ("0", "progress"),
+        ("1", "item"),
+        ("2", "batch"),
+        (None, "done"),
+    ]
+    snapshot = events[0][2]
+    assert snapshot["processed_files"] == 0
+    assert [i["item_id"] for i in snapshot["items"]] == [item_id]
+    assert events[1][2] == {
+        "item_id": item_id,
+        "file_name": "invoice.pdf",
+        "status": "ready",
+        "confidence": 0.97,
+    }
+    assert "items" not in events[2][2]
+    assert not fake_redis.subscribers[progress.channel(batch_id)]  # unsubscribed on close
+
+
+@pytest.mark.asyncio
+async def test_batch_progress_resume_replays_only_missed_events(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    """A reconnect with Last-Event-ID gets the events after that ID — no snapshot."""
+    from src.modules.invoices import progress
+
+    batch_id, item_id = await _upload_one(client, auth_headers)
+    for status_ in ("processing", "ready"):
+        await progress.publish_item(
+            fake_redis, batch_id, item_id, file_name="invoice.pdf", status=status_
+        )
+
+    resumed = await _open_stream(
+        client, auth_headers, fake_redis, batch_id, headers={"Last-Event-ID": "1"}
+    )
+    await progress.publish_batch(fake_redis, _finished_batch(batch_id))
+    response = await asyncio.wait_for(resumed, timeout=5)
+
+    events = _sse_events(response.text, with_ids=True)
+    assert [(event_id, name) for event_id, name, _ in events] == [
+        ("2", "item"),
+        ("3", "batch"),
+        (None, "done"),
+    ]
+    assert events[0][2]["status"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_batch_progress_resume_past_backlog_sends_snapshot(
+    client: AsyncClient, auth_headers: dict, fake_redis
+) -> None:
+    """When the missed events were trimmed from the backlog the client gets a fresh snapshot."""
+    from src.config import settings
+    from src.modules.invoices import progress
+
+    batch_id, item_id = await _upload_one(client, auth_headers)
+    with patch.object(settings, "PROGRESS_BACKLOG_MAX_EVENTS", 2):
+        for _ in range(5):
+            await progress.publish_item(
+                fake_redis, batch_id, item_id, file_name="invoice.pdf", status="processing"
+            )
+
+    resumed = await _open_stream(
+        client, auth_headers, fake_redis, batch_id, headers={"Last-Event-ID": "1"}
+    )
+    await progress.publish_batch(fake_redis, _finished_batch(batch_id))
+    response = await asyncio.wait_for(resumed, timeout=5)
+
+    events = _sse_events(response.text, with_ids=True)
+    assert [(event_id, name) for event_id, name, _ in events] == [
+        ("5", "progress"),
+        ("6", "batch"),
+        (None, "done"),
+    ]
+    assert [i["item_id"] for i in events[0][2]["items"]] == [item_id]
+
+
+@pytest.mark.asyncio
+async def test_batch_progress_for_finished_batch_ends_after_snapshot(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
+        upload = await client.post(
+            "/api/invoices/upload",
+            headers=auth_headers,
+            files={"file": ("invoice.pdf", io.BytesIO(_pdf(1)), "application/pdf")},
+        )
+    batch_id = uuid.UUID(upload.json()["batch_id"])
+    batch = await db_session.get(UploadBatch, batch_id)
+    batch.processed_files = batch.successful_files = 1
+    batch.status = "review_pending"
+    await db_session.commit()
+
+    response = await client.get(
+        f"/api/invoices/upload/batches/{batch_id}/progress", headers=auth_headers
+    )
+
+    events = _sse_events(response.text)
+    assert [name for name, _ in events] == ["progress", "done"]
+    assert events[1][1] == {"status": "review_pending"}
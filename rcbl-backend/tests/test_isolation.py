@@ -9,11 +9,15 @@ import uuid
 from unittest.mock import AsyncMock, patch
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.modules.invoices.models import ItemStatus, UploadItem
+from src.db import session as db_session_module
+from src.db.session import set_tenant_context
+from src.modules.invoices.models import ItemStatus, UploadBatch, UploadItem
+from tests.conftest import _test_engine
 
 SMALL_PDF = b"%PDF-1.4 test content"
 
@@ -43,7 +47,7 @@ async def _create_other_user(client: AsyncClient) -> dict[str, str]:
 async def test_cannot_access_other_company_batch(client: AsyncClient, auth_headers: dict) -> None:
     """User cannot view batches from another company."""
     # Create a batch as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -67,7 +71,7 @@ async def test_cannot_access_other_company_batch(client: AsyncClient, auth_heade
 async def test_cannot_list_other_company_batches(client: AsyncClient, auth_headers: dict) -> None:
     """User's batch list should not include other companies' batches."""
     # Create a batch as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -89,7 +93,7 @@ async def test_cannot_list_other_company_batches(client: AsyncClient, auth_heade
 async def test_cannot_access_other_company_item(client: AsyncClient, auth_headers: dict) -> None:
     """User cannot view items from another company."""
     # Create an item as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -116,7 +120,7 @@ async def test_cannot_access_other_company_item(client: AsyncClient, auth_header
 async def test_cannot_accept_other_company_item(client: AsyncClient, auth_headers: dict) -> None:
     """User cannot accept items from another company."""
     # Create an item as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -148,7 +152,7 @@ async def test_cannot_accept_other_company_item(client: AsyncClient, auth_header
 async def test_cannot_reject_other_company_item(client: AsyncClient, auth_headers: dict) -> None:
     """User cannot reject items from another company."""
     # Create an item as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -175,7 +179,7 @@ async def test_cannot_reject_other_company_item(client: AsyncClient, auth_header
 async def test_cannot_access_other_company_progress(client: AsyncClient, auth_headers: dict) -> None:
     """User cannot access SSE progress stream for another company's batch."""
     # Create a batch as the main user
-    with patch("src.modules.invoices.service.s3_client.upload_file", new_callable=AsyncMock):
+    with patch("src.modules.invoices.service.s3_client.upload_stream", new_callable=AsyncMock):
         upload_response = await client.post(
             "/api/invoices/upload",
             headers=auth_headers,
@@ -195,3 +199,71 @@ async def test_cannot_access_other_company_progress(client: AsyncClient, auth_he
     assert response.status_code == 200
     content = response.text
     assert "error" in content or "not found" in content.lower()
+
+
+# ── RLS Context ───────────────────────────────────────────────────────────────────
+
+
+@pytest_asyncio.fixture
+async def sqlite_set_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Let the tenant context run on SQLite, with set_config as a no-op function."""
+    async with _test_engine.connect() as conn:
+        await conn.run_sync(
+            lambda c: c.connection.dbapi_connection.create_function(
+                "set_config", 3, lambda name, value, is_local: value
+            )
+        )
+    monkeypatch.setattr(
+        db_session_module, "_TENANT_CONTEXT_DIALECTS", frozenset({"postgresql", "sqlite"})
+    )
+
+
+@pytest.mark.asyncio
+async def test_tenant_context_rides_with_first_statement_of_each_transaction(
+    db_session: AsyncSession, sqlite_set_config: None
+) -> None:
+    """set_tenant_context sends nothing itself; set_config leads every transaction."""
+    statements: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    company_id = uuid.uuid4()
+    event.listen(_test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await set_tenant_context(db_session, company_id)
+        assert statements == []
+
+        await db_session.execute(select(UploadBatch.id))
+        await db_session.commit()
+        await db_session.execute(select(UploadBatch.id))
+    finally:
+        event.remove(_test_engine.sync_engine, "before_cursor_execute", record)
+        await db_session.rollback()
+
+    set_config = [i for i, (sql, _) in enumerate(statements) if "set_config" in sql]
+    assert set_config == [0, 2]
+    assert str(company_id) in statements[0][1]
+    assert "upload_batches" in statements[1][0]
+
+
+@pytest.mark.asyncio
+async def test_tenant_context_applied_at_once_inside_open_transaction(
+    db_session: AsyncSession, sqlite_set_config: None
+) -> None:
+    """A transaction already begun (principal cache miss) gets the context immediately."""
+    await db_session.execute(select(UploadBatch.id))
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(_test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await set_tenant_context(db_session, uuid.uuid4())
+    finally:
+        event.remove(_test_engine.sync_engine, "before_cursor_execute", record)
+        await db_session.rollback()
+
+    assert len(statements) == 1
+    assert "set_config" in statements[0]
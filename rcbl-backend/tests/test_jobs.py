@@ -49,6 +49,7 @@ async def test_ocr_job_handles_exception_gracefully() -> None:
     mock_item.id = uuid.uuid4()
     mock_item.file_name = "test.pdf"
     mock_item.file_url = "invoices/test.pdf"
+    mock_item.file_hash = None
     mock_item.batch_id = uuid.uuid4()
     
     mock_repo = MagicMock()
@@ -83,3 +84,473 @@ async def test_ocr_job_handles_exception_gracefully() -> None:
         
         # Verify error handling was called
         mock_repo.update_item_failed.assert_called_once()
+
+
+# ── OCR Result Cache ────────────────────────────────────────────────────────────
+
+
+def _ocr_job_patches(mock_item, mock_db, extract_invoice, download_file):
+    mock_session_cm = AsyncMock()
+    mock_session_cm.__aenter__ = AsyncMock(return_value=mock_db)
+    mock_session_cm.__aexit__ = AsyncMock(return_value=None)
+    return (
+        patch("src.modules.invoices.repository.get_item_by_id", AsyncMock(return_value=mock_item)),
+        patch("src.modules.invoices.repository.update_item_status", AsyncMock()),
+        patch("src.modules.invoices.repository.update_item_ocr_result", AsyncMock()),
+        patch("src.modules.invoices.repository.increment_batch_counters", AsyncMock()),
+        patch("src.modules.invoices.repository.get_ocr_result_by_hash", AsyncMock(return_value=None)),
+        patch("src.clients.ocr_client.extract_invoice", extract_invoice),
+        patch("src.clients.s3_client.download_file", download_file),
+        patch("src.db.session.async_session_factory", MagicMock(return_value=mock_session_cm)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_ocr_job_reuses_cached_result_for_identical_file() -> None:
+    """A second job for a byte-identical file skips S3 and the OCR provider."""
+    from contextlib import ExitStack
+
+    from src.clients.ocr_client import OCRResult
+    from src.modules.invoices import ocr_cache
+    from src.modules.invoices.jobs import process_ocr
+
+    ocr_cache._local.clear()
+    file_hash = uuid.uuid4().hex
+    extract_invoice = AsyncMock(
+        return_value=OCRResult(
+            invoice_number="INV-7",
+            amount=99.5,
+            currency="EUR",
+            invoice_date="2024-06-01",
+            due_date="2024-06-30",
+            vendor_name="Acme",
+            raw_text="{}",
+            confidence=0.97,
+            processing_ms=1800,
+        )
+    )
+    download_file = AsyncMock(return_value=b"%PDF-1.4")
+    company_id = str(uuid.uuid4())
+
+    for _ in range(2):
+        mock_item = MagicMock(file_hash=file_hash, file_url="k.pdf", batch_id=uuid.uuid4())
+        with ExitStack() as stack:
+            for p in _ocr_job_patches(mock_item, AsyncMock(), extract_invoice, download_file):
+                stack.enter_context(p)
+            await process_ocr({}, str(uuid.uuid4()), company_id)
+
+    extract_invoice.assert_awaited_once()
+    download_file.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ocr_job_does_not_cache_provider_failures() -> None:
+    """Placeholder results (provider failed, no raw_text) must not be served to later jobs."""
+    from contextlib import ExitStack
+
+    from src.clients.ocr_client import OCRResult
+    from src.modules.invoices import ocr_cache
+    from src.modules.invoices.jobs import process_ocr
+
+    ocr_cache._local.clear()
+    file_hash = uuid.uuid4().hex
+    placeholder = OCRResult(None, None, None, None, None, None, None, 0.0, 5)
+    extract_invoice = AsyncMock(return_value=placeholder)
+    download_file = AsyncMock(return_value=b"%PDF-1.4")
+
+    for _ in range(2):
+        mock_item = MagicMock(file_hash=file_hash, file_url="k.pdf", batch_id=uuid.uuid4())
+        with ExitStack() as stack:
+            for p in _ocr_job_patches(mock_item, AsyncMock(), extract_invoice, download_file):
+                stack.enter_context(p)
+            await process_ocr({}, str(uuid.uuid4()), str(uuid.uuid4()))
+
+    assert extract_invoice.await_count == 2
+
+
+# ── Progress Events ─────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_ocr_job_publishes_item_and_batch_progress(fake_redis) -> None:
+    """process_ocr pushes every state change to the batch's progress channel."""
+    import json
+    from contextlib import ExitStack
+    from types import SimpleNamespace
+
+    from src.clients.ocr_client import OCRResult
+    from src.modules.invoices import progress
+    from src.modules.invoices.jobs import process_ocr
+
+    batch_id, item_id = uuid.uuid4(), uuid.uuid4()
+    mock_item = MagicMock(file_hash=None, file_name="a.pdf", file_url="a.pdf", batch_id=batch_id)
+    batch = SimpleNamespace(
+        id=batch_id,
+        status="review_pending",
+        total_files=1,
+        processed_files=1,
+        successful_files=1,
+        failed_files=0,
+    )
+    extract_invoice = AsyncMock(
+        return_value=OCRResult("INV-1", 10.0, "USD", None, None, "Acme", "{}", 0.99, 5)
+    )
+
+    pubsub = fake_redis.pubsub()
+    await pubsub.subscribe(progress.channel(batch_id))
+    patches = _ocr_job_patches(
+        mock_item, AsyncMock(), extract_invoice, AsyncMock(return_value=b"%PDF-1.4")
+    )
+    with ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(
+            patch(
+                "src.modules.invoices.repository.increment_batch_counters",
+                AsyncMock(return_value=batch),
+            )
+        )
+        await process_ocr({"redis": fake_redis}, str(item_id), str(uuid.uuid4()))
+
+    messages = []
+    while (message := await pubsub.get_message(timeout=0.01)) is not None:
+        messages.append(json.loads(message["data"]))
+    assert [(m["id"], m["event"], m["data"]["status"]) for m in messages] == [
+        (1, "item", "processing"),
+        (2, "item", "ready"),
+        (3, "batch", "review_pending"),
+    ]
+    assert messages[1]["data"]["confidence"] == 0.99
+
+
+# ── Batch counters under concurrency ────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ocr_completions_never_lose_batch_increments(tmp_path) -> None:
+    """Hundreds of process_ocr jobs finishing at once must all land in the batch counters.
+
+    Uses a file-backed SQLite DB so every job gets its own connection and transaction,
+    like concurrent workers against Postgres.
+    """
+    import asyncio
+    from contextlib import ExitStack
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from src.clients.ocr_client import OCRResult
+    from src.db.session import Base
+    from src.modules.invoices.jobs import process_ocr
+    from src.modules.invoices.models import BatchStatus, ItemStatus, UploadBatch, UploadItem
+
+    total, failing = 300, 40
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"timeout": 60},
+        pool_size=20,
+        max_overflow=0,
+        pool_timeout=60,
+    )
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    company_id, batch_id = uuid.uuid4(), uuid.uuid4()
+    item_ids = [uuid.uuid4() for _ in range(total)]
+    async with session_factory() as db:
+        db.add(
+            UploadBatch(
+                id=batch_id,
+                company_id=company_id,
+                upload_type="bulk",
+                total_files=total,
+                status=BatchStatus.processing.value,
+            )
+        )
+        db.add_all(
+            UploadItem(
+                id=item_id,
+                batch_id=batch_id,
+                company_id=company_id,
+                file_name=f"{i}.pdf",
+                file_url=f"invoices/{i}.pdf",
+                status=ItemStatus.queued.value,
+            )
+            for i, item_id in enumerate(item_ids)
+        )
+        await db.commit()
+
+    failing_keys = {f"invoices/{i}.pdf" for i in range(failing)}
+
+    async def download_file(key: str) -> bytes:
+        await asyncio.sleep(0)
+        if key in failing_keys:
+            raise RuntimeError("S3 error")
+        return b"%PDF-1.4"
+
+    result = OCRResult("INV-1", 10.0, "USD", None, None, "Acme", "{}", 0.99, 5)
+
+    with ExitStack() as stack:
+        stack.enter_context(patch("src.db.session.async_session_factory", session_factory))
+        stack.enter_context(patch("src.clients.s3_client.download_file", download_file))
+        stack.enter_context(
+            patch("src.clients.ocr_client.extract_invoice", AsyncMock(return_value=result))
+        )
+        outcomes = await asyncio.gather(
+            *(process_ocr({}, str(item_id), str(company_id)) for item_id in item_ids),
+            return_exceptions=True,
+        )
+
+    assert sum(isinstance(o, RuntimeError) for o in outcomes) == failing
+    async with session_factory() as db:
+        batch = await db.get(UploadBatch, batch_id)
+    await engine.dispose()
+
+    assert batch.processed_files == total
+    assert batch.successful_files == total - failing
+    assert batch.failed_files == failing
+    assert batch.status == BatchStatus.review_pending.value
+    assert batch.completed_at is not None
+
+
+# ── Provider rate limiting and outages ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("unavailable", ["rate_limited", "provider_down"])
+async def test_rate_limited_ocr_job_is_requeued_and_deferred(fake_redis, unavailable) -> None:
+    """No provider capacity: the item goes back to queued and arq retries the job later."""
+    from contextlib import ExitStack
+
+    from arq import Retry
+
+    from src.clients.ocr_client import OCRProviderUnavailable
+    from src.clients.ocr_rate_limit import OCRRateLimited
+    from src.modules.invoices.jobs import process_ocr
+    from src.modules.invoices.models import ItemStatus
+
+    mock_item = MagicMock(
+        file_hash=None, file_name="a.pdf", file_url="a.pdf", batch_id=uuid.uuid4()
+    )
+    error = (
+        OCRRateLimited(12.5)
+        if unavailable == "rate_limited"
+        else OCRProviderUnavailable(12.5, "circuit_open")
+    )
+    extract_invoice = AsyncMock(side_effect=error)
+    update_item_status = AsyncMock()
+    increment_batch_counters = AsyncMock()
+    update_item_failed = AsyncMock()
+
+    patches = _ocr_job_patches(
+        mock_item, AsyncMock(), extract_invoice, AsyncMock(return_value=b"%PDF-1.4")
+    )
+    with ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(
+            patch("src.modules.invoices.repository.update_item_status", update_item_status)
+        )
+        stack.enter_context(
+            patch(
+                "src.modules.invoices.repository.increment_batch_counters",
+                increment_batch_counters,
+            )
+        )
+        stack.enter_context(
+            patch("src.modules.invoices.repository.update_item_failed", update_item_failed)
+        )
+        with pytest.raises(Retry) as retry:
+            await process_ocr(
+                {"redis": fake_redis, "job_try": 1}, str(uuid.uuid4()), str(uuid.uuid4())
+            )
+
+    assert retry.value.defer_score == 12_500
+    assert update_item_status.await_args_list[-1].args[2] == ItemStatus.queued
+    assert extract_invoice.await_args.kwargs["defer_when_unavailable"] is True
+    increment_batch_counters.assert_not_awaited()
+    update_item_failed.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_limiter_deferral_does_no_work_and_keeps_provider_tries(fake_redis) -> None:
+    """The limiter defers before the download, and that deferral is not a provider try."""
+    from contextlib import ExitStack
+
+    from arq import Retry
+
+    from src.clients.ocr_client import OCRResult
+    from src.clients.ocr_rate_limit import OCRRateLimited
+    from src.config import settings
+    from src.modules.invoices.jobs import process_ocr
+
+    mock_item = MagicMock(
+        file_hash=None, file_name="a.pdf", file_url="a.pdf", batch_id=uuid.uuid4()
+    )
+    extract_invoice = AsyncMock(
+        return_value=OCRResult(None, None, None, None, None, None, None, 0.0, 5)
+    )
+    download_file = AsyncMock(return_value=b"%PDF-1.4")
+    wait_for_capacity = AsyncMock(side_effect=[OCRRateLimited(7.0), None])
+    item_id, company_id = str(uuid.uuid4()), str(uuid.uuid4())
+    # The second run would be the degrading last try if the deferral had counted.
+    job_try = settings.OCR_RATE_LIMIT_MAX_DEFERRALS
+
+    with ExitStack() as stack:
+        for p in _ocr_job_patches(mock_item, AsyncMock(), extract_invoice, download_file):
+            stack.enter_context(p)
+        stack.enter_context(
+            patch("src.clients.ocr_rate_limit.wait_for_capacity", wait_for_capacity)
+        )
+        with pytest.raises(Retry):
+            await process_ocr({"redis": fake_redis, "job_try": job_try}, item_id, company_id)
+        download_file.assert_not_awaited()
+
+        await process_ocr({"redis": fake_redis, "job_try": job_try + 1}, item_id, company_id)
+
+    assert extract_invoice.await_args.kwargs["defer_when_unavailable"] is True
+
+
+@pytest.mark.asyncio
+async def test_last_try_degrades_instead_of_deferring() -> None:
+    import time
+    from contextlib import ExitStack
+
+    from src.clients.ocr_client import OCRResult
+    from src.config import settings
+    from src.modules.invoices.jobs import process_ocr
+
+    mock_item = MagicMock(file_hash=None, file_url="a.pdf", batch_id=uuid.uuid4())
+    extract_invoice = AsyncMock(
+        return_value=OCRResult(None, None, None, None, None, None, None, 0.0, 5)
+    )
+    patches = _ocr_job_patches(
+        mock_item, AsyncMock(), extract_invoice, AsyncMock(return_value=b"%PDF-1.4")
+    )
+    with ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        await process_ocr(
+            {"job_try": settings.OCR_RATE_LIMIT_MAX_DEFERRALS + 1},
+            str(uuid.uuid4()),
+            str(uuid.uuid4()),
+        )
+
+    assert extract_invoice.await_args.kwargs["defer_when_unavailable"] is False
+    assert extract_invoice.await_args.kwargs["deadline"] <= (
+        time.monotonic()
+        + settings.OCR_JOB_TIMEOUT_SECONDS
+        - settings.OCR_JOB_TIMEOUT_MARGIN_SECONDS
+    )
+
+
+@pytest.mark.asyncio
+async def test_text_layer_hit_skips_the_vision_model() -> None:
+    from contextlib import ExitStack
+
+    from src.clients.ocr_client import OCRResult
+    from src.modules.invoices.jobs import process_ocr
+
+    mock_item = MagicMock(file_hash=None, file_url="a.pdf", batch_id=uuid.uuid4())
+    text_result = OCRResult("INV-1", 10.0, "EUR", "2024-06-01", "2024-06-30", None, "{}", 0.95, 3)
+    extract_invoice = AsyncMock()
+    patches = _ocr_job_patches(
+        mock_item, AsyncMock(), extract_invoice, AsyncMock(return_value=b"%PDF-1.4")
+    )
+    with ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(
+            patch(
+                "src.modules.invoices.text_layer.extract_invoice",
+                AsyncMock(return_value=text_result),
+            )
+        )
+        await process_ocr({}, str(uuid.uuid4()), str(uuid.uuid4()))
+
+    extract_invoice.assert_not_awaited()
+
+
+# ── Multi-invoice splitting ─────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_split_pdf_fans_out_child_jobs_instead_of_ocr(fake_redis) -> None:
+    """A multi-invoice PDF ends as "split" and each child gets its own process_ocr job."""
+    from contextlib import ExitStack
+
+    from src.modules.invoices.jobs import process_ocr
+
+    mock_item = MagicMock(
+        file_hash=None, file_name="m.pdf", file_url="m.pdf", batch_id=uuid.uuid4()
+    )
+    child_ids = [uuid.uuid4(), uuid.uuid4()]
+    company_id = str(uuid.uuid4())
+    extract_invoice = AsyncMock()
+    submit = AsyncMock()
+    increment_batch_counters = AsyncMock()
+
+    patches = _ocr_job_patches(
+        mock_item, AsyncMock(), extract_invoice, AsyncMock(return_value=b"%PDF-1.4")
+    )
+    with ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(
+            patch(
+                "src.modules.invoices.splitting.split_item",
+                AsyncMock(return_value=(child_ids, None)),
+            )
+        )
+        stack.enter_context(patch("src.core.fair_queue.submit", submit))
+        stack.enter_context(
+            patch(
+                "src.modules.invoices.repository.increment_batch_counters",
+                increment_batch_counters,
+            )
+        )
+        await process_ocr({"redis": fake_redis}, str(uuid.uuid4()), company_id)
+
+    extract_invoice.assert_not_awaited()
+    increment_batch_counters.assert_not_awaited()
+    assert submit.await_args.args[1:] == (
+        company_id,
+        "process_ocr",
+        [(str(child_id), company_id) for child_id in child_ids],
+    )
+    assert submit.await_args.kwargs["priority"] == "bulk"
+
+
+@pytest.mark.asyncio
+async def test_retried_split_reenqueues_queued_children(fake_redis) -> None:
+    """A split committed before its enqueue failed is finished on retry without re-splitting."""
+    from arq import Retry
+
+    from src.modules.invoices.jobs import process_ocr
+    from src.modules.invoices.models import ItemStatus
+
+    mock_item = MagicMock(status=ItemStatus.split_parent.value, batch_id=uuid.uuid4())
+    child_id = uuid.uuid4()
+    company_id = str(uuid.uuid4())
+    submit = AsyncMock(side_effect=[ConnectionError("redis down"), ["job"]])
+    session_cm = AsyncMock()
+    session_cm.__aenter__ = AsyncMock(return_value=AsyncMock())
+    session_cm.__aexit__ = AsyncMock(return_value=None)
+    update_item_failed = AsyncMock()
+
+    with (
+        patch("src.modules.invoices.repository.get_item_by_id", AsyncMock(return_value=mock_item)),
+        patch(
+            "src.modules.invoices.repository.list_child_item_ids",
+            AsyncMock(return_value=[child_id]),
+        ),
+        patch("src.modules.invoices.repository.update_item_failed", update_item_failed),
+        patch("src.core.fair_queue.submit", submit),
+        patch("src.db.session.async_session_factory", MagicMock(return_value=session_cm)),
+    ):
+        with pytest.raises(Retry):
+            await process_ocr({"redis": fake_redis}, str(uuid.uuid4()), company_id)
+        await process_ocr({"redis": fake_redis}, str(uuid.uuid4()), company_id)
+
+    update_item_failed.assert_not_awaited()
+    assert submit.await_args.args[3] == [(str(child_id), company_id)]
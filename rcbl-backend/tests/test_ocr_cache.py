@@ -0,0 +1,185 @@
+"""Tests for the content-addressed OCR result cache and its LRU tier."""
+
+import json
+import uuid
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.clients.ocr_client import OCRResult
+from src.core.cache import TTLCache
+from src.modules.invoices import ocr_cache
+
+
+def _result(**overrides) -> OCRResult:
+    fields = {
+        "invoice_number": "INV-1",
+        "amount": 10.0,
+        "currency": "EUR",
+        "invoice_date": "2024-06-01",
+        "due_date": "2024-06-30",
+        "vendor_name": "Acme",
+        "raw_text": "{}",
+        "confidence": 0.9,
+        "processing_ms": 1200,
+    }
+    return OCRResult(**{**fields, **overrides})
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.gets = 0
+
+    async def get(self, key: str):
+        self.gets += 1
+        return self.store.get(key)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    async def delete(self, key: str) -> int:
+        return int(self.store.pop(key, None) is not None)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.store[key] = value
+        self.ttls[key] = ex
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_tier():
+    ocr_cache._local.clear()
+    yield
+    ocr_cache._local.clear()
+
+
+# ── TTLCache ────────────────────────────────────────────────────────────────────
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    with patch("src.core.cache.time.monotonic", return_value=0):
+        cache.set("a", 1)
+    with patch("src.core.cache.time.monotonic", return_value=61):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+# ── OCR cache tiers ─────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_put_then_get_hits_local_tier() -> None:
+    redis = _FakeRedis()
+    company_id = uuid.uuid4()
+    await ocr_cache.put(redis, "h1", company_id, _result())
+
+    with patch("src.modules.invoices.repository.get_ocr_result_by_hash") as db_lookup:
+        result = await ocr_cache.get(AsyncMock(), redis, "h1", company_id)
+
+    assert result is not None
+    assert result.invoice_number == "INV-1"
+    key = ocr_cache.cache_key(company_id, "h1")
+    assert redis.ttls[key] == ocr_cache.settings.OCR_CACHE_TTL_SECONDS
+    db_lookup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_populates_local_tier() -> None:
+    redis = _FakeRedis()
+    company_id = uuid.uuid4()
+    redis.store[ocr_cache.cache_key(company_id, "h2")] = json.dumps(
+        _result(invoice_number="INV-2").__dict__
+    )
+
+    first = await ocr_cache.get(AsyncMock(), redis, "h2", company_id)
+    second = await ocr_cache.get(AsyncMock(), redis, "h2", company_id)
+
+    assert first.invoice_number == second.invoice_number == "INV-2"
+    assert redis.gets == 1  # the second lookup only checked that the entry still exists
+
+
+@pytest.mark.asyncio
+async def test_invalidated_result_is_not_served_by_any_process() -> None:
+    """A rejected item's result is gone from Redis, and other processes' LRU entries follow."""
+    redis = _FakeRedis()
+    company_id = uuid.uuid4()
+    await ocr_cache.put(redis, "h7", company_id, _result())
+    key = ocr_cache.cache_key(company_id, "h7")
+    other_process_entry = ocr_cache._local.get(key)
+
+    await ocr_cache.invalidate(redis, "h7", company_id)
+    assert key not in redis.store
+    assert ocr_cache._local.get(key) is None
+
+    ocr_cache._local.set(key, other_process_entry)  # as still held by another worker
+    with patch(
+        "src.modules.invoices.repository.get_ocr_result_by_hash", AsyncMock(return_value=None)
+    ):
+        assert await ocr_cache.get(AsyncMock(), redis, "h7", company_id) is None
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_earlier_item_with_same_hash() -> None:
+    redis = _FakeRedis()
+    company_id = uuid.uuid4()
+    stored = {"invoice_number": "INV-3", "amount": "42.00", "currency": "USD", "raw_text": "{}"}
+    with patch(
+        "src.modules.invoices.repository.get_ocr_result_by_hash",
+        AsyncMock(return_value=(stored, Decimal("0.91"))),
+    ):
+        result = await ocr_cache.get(AsyncMock(), redis, "h3", company_id)
+
+    assert result.amount == 42.0
+    assert result.confidence == pytest.approx(0.91)
+    assert ocr_cache.cache_key(company_id, "h3") in redis.store  # written back to Redis
+
+
+@pytest.mark.asyncio
+async def test_results_are_not_shared_across_companies() -> None:
+    """Another tenant's upload of the same file is a miss in every tier, not a hit."""
+    redis = _FakeRedis()
+    tenant_a, tenant_b = uuid.uuid4(), uuid.uuid4()
+    await ocr_cache.put(redis, "h6", tenant_a, _result())
+    db_lookup = AsyncMock(return_value=None)
+
+    with patch("src.modules.invoices.repository.get_ocr_result_by_hash", db_lookup):
+        assert await ocr_cache.get(AsyncMock(), redis, "h6", tenant_b) is None
+
+    db_lookup.assert_awaited_once()
+    assert db_lookup.await_args.args[1:] == (tenant_b, "h6")
+    assert await ocr_cache.get(AsyncMock(), redis, "h6", tenant_a) is not None
+
+
+@pytest.mark.asyncio
+async def test_earlier_failed_placeholder_is_not_reused() -> None:
+    stored = {"invoice_number": None, "raw_text": None, "failure": "provider"}
+    with patch(
+        "src.modules.invoices.repository.get_ocr_result_by_hash",
+        AsyncMock(return_value=(stored, Decimal("0"))),
+    ):
+        assert await ocr_cache.get(AsyncMock(), None, "h5", uuid.uuid4()) is None
+
+
+@pytest.mark.asyncio
+async def test_miss_everywhere_returns_none_and_survives_redis_errors() -> None:
+    redis = AsyncMock()
+    redis.get.side_effect = ConnectionError("redis down")
+    with patch(
+        "src.modules.invoices.repository.get_ocr_result_by_hash", AsyncMock(return_value=None)
+    ):
+        assert await ocr_cache.get(AsyncMock(), redis, "h4", uuid.uuid4()) is None
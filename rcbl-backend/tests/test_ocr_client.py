@@ -0,0 +1,350 @@
+"""Unit tests for the OCR client.
+
+Provider calls go through httpx.MockTransport — no network or API key needed.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from src.clients import ocr_client, ocr_rate_limit
+from src.config import settings
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpen
+
+SCAN = b"\xff\xd8\xff\xe0 scanned invoice"  # a JPEG upload: sent to the model as is
+
+
+def _completion(content: dict) -> dict:
+    return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+
+@pytest.fixture
+async def mock_provider(monkeypatch: pytest.MonkeyPatch):
+    """Install a shared client backed by MockTransport; yields the list of seen requests."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(
+            200,
+            json=_completion({"invoice_number": "INV-9", "amount": 12.5, "confidence": 0.93}),
+        )
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        headers={"Authorization": "Bearer test"},
+    )
+    monkeypatch.setattr(ocr_client, "_http_client", client)
+    yield seen
+    await client.aclose()
+
+
+# ── Shared HTTP client ──────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_start_and_close_http_client_are_idempotent(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ocr_client, "_http_client", None)
+
+    await ocr_client.start_http_client()
+    client = ocr_client._http_client
+    await ocr_client.start_http_client()
+    assert ocr_client._http_client is client
+
+    await ocr_client.close_http_client()
+    await ocr_client.close_http_client()
+    assert ocr_client._http_client is None
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_extract_reuses_the_shared_client(mock_provider: list[httpx.Request]) -> None:
+    client = ocr_client._http_client
+
+    first = await ocr_client.extract_invoice(SCAN + b" one")
+    second = await ocr_client.extract_invoice(SCAN + b" two")
+
+    assert ocr_client._http_client is client
+    assert len(mock_provider) == 2
+    assert all(r.headers["Authorization"] == "Bearer test" for r in mock_provider)
+    assert first.invoice_number == second.invoice_number == "INV-9"
+    assert first.amount == 12.5
+
+
+@pytest.mark.asyncio
+async def test_connection_trace_flags_new_connections() -> None:
+    trace = ocr_client._ConnectionTrace()
+    await trace("http2.send_request_headers.started", {})
+    assert trace.new_connection is False
+
+    trace = ocr_client._ConnectionTrace()
+    await trace("connection.connect_tcp.started", {})
+    await trace("connection.start_tls.complete", {})
+    await trace("http2.send_request_headers.started", {})
+    assert trace.new_connection is True
+
+
+# ── Rate limits ─────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+async def rate_limited_provider(monkeypatch: pytest.MonkeyPatch):
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(429, headers={"retry-after": "7"})
+        ),
+    )
+    monkeypatch.setattr(ocr_client, "_http_client", client)
+    yield
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_429_is_raised_for_deferral(rate_limited_provider) -> None:
+    with pytest.raises(ocr_rate_limit.OCRRateLimited) as exc:
+        await ocr_client.extract_invoice(SCAN)
+    assert exc.value.retry_after == 7
+
+
+@pytest.mark.asyncio
+async def test_provider_429_degrades_when_deferral_is_off(rate_limited_provider) -> None:
+    result = await ocr_client.extract_invoice(SCAN, defer_when_unavailable=False)
+
+    assert result.confidence == 0.0
+    assert result.raw_text is None
+
+
+# ── Retries, circuit breaker, failure classification ────────────────────────────
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch: pytest.MonkeyPatch) -> CircuitBreaker:
+    breaker = CircuitBreaker("ocr_provider_test", failure_threshold=3, reset_timeout=30)
+    monkeypatch.setattr(ocr_client, "_breaker", breaker)
+    monkeypatch.setattr(settings, "OCR_RETRY_BASE_DELAY_SECONDS", 0.0)
+    return breaker
+
+
+def _scripted_provider(monkeypatch: pytest.MonkeyPatch, *responses) -> list[httpx.Request]:
+    """Install a MockTransport answering with `responses` in order (exceptions are raised)."""
+    seen: list[httpx.Request] = []
+    queue = list(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        outcome = queue.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(
+        ocr_client, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return seen
+
+
+def _ok() -> httpx.Response:
+    return httpx.Response(200, json=_completion({"invoice_number": "INV-1", "confidence": 0.9}))
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = _scripted_provider(monkeypatch, httpx.ConnectError("reset"), httpx.Response(503), _ok())
+
+    result = await ocr_client.extract_invoice(SCAN)
+
+    assert len(seen) == 3
+    assert result.invoice_number == "INV-1"
+    assert result.failure is None
+    assert ocr_client._breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_defer_instead_of_degrading(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen = _scripted_provider(
+        monkeypatch, httpx.Response(502), httpx.Response(502), httpx.Response(502)
+    )
+
+    with pytest.raises(ocr_client.OCRProviderUnavailable) as exc:
+        await ocr_client.extract_invoice(SCAN)
+
+    assert len(seen) == settings.OCR_RETRY_MAX_ATTEMPTS
+    assert exc.value.reason == "http_5xx"
+
+
+@pytest.mark.asyncio
+async def test_no_attempt_is_started_too_close_to_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen = _scripted_provider(monkeypatch, _ok())
+
+    with pytest.raises(ocr_client.OCRProviderUnavailable) as exc:
+        await ocr_client.extract_invoice(SCAN, deadline=time.monotonic() + 1)
+
+    assert exc.value.reason == "deadline"
+    assert seen == []
+
+
+@pytest.mark.asyncio
+async def test_retries_and_request_timeout_stay_within_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    timeouts: list[float] = []
+
+    async def failing_post(body: bytes, timeout: float) -> httpx.Response:
+        timeouts.append(timeout)
+        return httpx.Response(502)
+
+    monkeypatch.setattr(ocr_client, "_post_chat_completion", failing_post)
+    monkeypatch.setattr(ocr_client, "_backoff_delay", lambda attempt: 1.0)
+    deadline = time.monotonic() + ocr_client._MIN_ATTEMPT_SECONDS + 0.5
+
+    with pytest.raises(ocr_client.OCRProviderUnavailable) as exc:
+        await ocr_client.extract_invoice(SCAN, deadline=deadline)
+
+    assert exc.value.reason == "http_5xx"
+    assert len(timeouts) == 1  # a second attempt would end past the deadline
+    assert timeouts[0] <= ocr_client._MIN_ATTEMPT_SECONDS + 0.5
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_short_circuits_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = _scripted_provider(monkeypatch, *(httpx.ReadTimeout("slow") for _ in range(3)))
+
+    with pytest.raises(ocr_client.OCRProviderUnavailable):
+        await ocr_client.extract_invoice(SCAN)
+    assert ocr_client._breaker.state == "open"
+
+    with pytest.raises(ocr_client.OCRProviderUnavailable) as exc:
+        await ocr_client.extract_invoice(SCAN)
+    assert exc.value.reason == "circuit_open"
+    assert 29 < exc.value.retry_after <= 30
+    assert len(seen) == 3  # the second call never reached the provider
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_the_breaker(
+    monkeypatch: pytest.MonkeyPatch, fresh_breaker: CircuitBreaker
+) -> None:
+    for _ in range(3):
+        fresh_breaker.record_failure()
+    fresh_breaker._opened_at -= 30  # reset timeout elapsed
+    _scripted_provider(monkeypatch, _ok())
+
+    result = await ocr_client.extract_invoice(SCAN)
+
+    assert result.invoice_number == "INV-1"
+    assert fresh_breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_frees_the_half_open_slot(
+    monkeypatch: pytest.MonkeyPatch, fresh_breaker: CircuitBreaker
+) -> None:
+    for _ in range(3):
+        fresh_breaker.record_failure()
+    fresh_breaker._opened_at -= 30
+    post = ocr_client._post_chat_completion
+    started = asyncio.Event()
+
+    async def hanging_post(body: bytes, timeout: float) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(3600)
+        raise AssertionError("unreachable")
+
+    monkeypatch.setattr(ocr_client, "_post_chat_completion", hanging_post)
+    probe = asyncio.create_task(ocr_client.extract_invoice(SCAN))
+    await started.wait()
+    assert fresh_breaker.state == "half_open"
+    probe.cancel()  # e.g. arq's job_timeout
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    _scripted_provider(monkeypatch, _ok())
+    monkeypatch.setattr(ocr_client, "_post_chat_completion", post)
+    result = await ocr_client.extract_invoice(SCAN)
+
+    assert result.invoice_number == "INV-1"
+    assert fresh_breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_breaker(fresh_breaker: CircuitBreaker) -> None:
+    for _ in range(3):
+        fresh_breaker.record_failure()
+    fresh_breaker._opened_at -= 30
+
+    fresh_breaker.before_call()
+    assert fresh_breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        fresh_breaker.before_call()  # only one probe at a time
+    fresh_breaker.record_failure()
+
+    assert fresh_breaker.state == "open"
+    assert fresh_breaker.retry_after() > 29
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(400, json={"error": {"message": "invalid image"}}),
+        httpx.Response(200, json={"choices": [{"message": {"content": "not json"}}]}),
+    ],
+)
+async def test_unreadable_documents_degrade_without_retrying(
+    monkeypatch: pytest.MonkeyPatch, response: httpx.Response
+) -> None:
+    seen = _scripted_provider(monkeypatch, response)
+
+    result = await ocr_client.extract_invoice(SCAN)
+
+    assert len(seen) == 1
+    assert result.failure == "unreadable"
+    assert result.confidence == 0.0
+    assert ocr_client._breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_auth_errors_are_not_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = _scripted_provider(monkeypatch, httpx.Response(401))
+
+    result = await ocr_client.extract_invoice(SCAN, defer_when_unavailable=False)
+
+    assert len(seen) == 1
+    assert result.failure == "provider"
+
+
+@pytest.mark.asyncio
+async def test_page_images_are_sent_instead_of_the_upload(
+    mock_provider: list[httpx.Request],
+) -> None:
+    await ocr_client.extract_invoice(b"%PDF-1.4 raw", page_images=[b"\xff\xd8one", b"\xff\xd8two"])
+
+    content = json.loads(mock_provider[0].content)["messages"][1]["content"]
+    assert [part["image_url"]["url"][:23] for part in content] == ["data:image/jpeg;base64,"] * 2
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_sent_with_their_own_media_type(
+    mock_provider: list[httpx.Request],
+) -> None:
+    await ocr_client.extract_invoice(b"\x89PNG\r\n\x1a\n scan")
+
+    content = json.loads(mock_provider[0].content)["messages"][1]["content"]
+    assert content[0]["image_url"]["url"].startswith("data:image/png;base64,")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("upload", [b"%PDF-1.4 raw", b"II*\x00 tiff scan"])
+async def test_pdf_or_tiff_without_page_images_is_unreadable(
+    mock_provider: list[httpx.Request], upload: bytes
+) -> None:
+    result = await ocr_client.extract_invoice(upload)
+
+    assert mock_provider == []  # the vision model would reject it
+    assert result.failure == "unreadable"
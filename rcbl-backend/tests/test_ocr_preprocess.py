@@ -0,0 +1,115 @@
+"""Tests for page selection and rasterisation before vision OCR."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from src.config import settings
+from src.core import executor
+from src.modules.invoices import ocr_preprocess
+from src.modules.invoices.ocr_preprocess import RasterOptions, rasterize, select_pages
+from tests.conftest import make_pdf
+
+OPTIONS = RasterOptions(dpi=100, max_edge_px=1024, jpeg_quality=75, grayscale=True, max_pages=2)
+
+
+def _multi_page_pdf() -> bytes:
+    pages = [[f"Page {n}", "Line items continued"] for n in range(1, 7)]
+    pages[0] = ["ACME GmbH", "Invoice No: INV-1"]
+    pages[3] = ["Subtotal 90.00", "Total 100.00 EUR"]
+    return make_pdf(pages)
+
+
+def _scanned_tiff(frames: int, dpi: int = 600) -> bytes:
+    images = []
+    for n in range(frames):
+        image = Image.effect_noise((2480, 3508), 40 + n)  # A4 at 300 DPI, noisy like a scan
+        images.append(image)
+    out = io.BytesIO()
+    images[0].save(out, format="TIFF", save_all=True, append_images=images[1:], dpi=(dpi, dpi))
+    return out.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("texts", "max_pages", "pages"),
+    [
+        ([], 2, []),
+        (["Invoice", "Total 10"], 2, [0, 1]),
+        (["Invoice Total 10"], 2, [0]),
+        (["Invoice Total 10", "Terms and conditions"], 2, [0]),
+        (["Invoice", "Total 10", "Terms and conditions"], 2, [0, 1]),
+        (["", "", ""], 2, [0, 2]),  # scan: assume the totals are on the last page
+        (["Invoice", "Total 10"], 1, [0]),
+    ],
+)
+def test_select_pages(texts: list[str], max_pages: int, pages: list[int]) -> None:
+    assert select_pages(texts, max_pages) == pages
+
+
+def test_pdf_renders_first_and_totals_page() -> None:
+    prepared = rasterize(_multi_page_pdf(), OPTIONS)
+
+    assert prepared.page_count == 6
+    assert prepared.pages == [0, 3]
+    for jpeg in prepared.images:
+        with Image.open(io.BytesIO(jpeg)) as image:
+            assert image.format == "JPEG"
+            assert image.mode == "L"
+            assert image.size == (791, 1024)  # US letter at 100 DPI, bounded to 1024 px
+
+
+def test_high_dpi_scan_is_downscaled_to_target_dpi() -> None:
+    tiff = _scanned_tiff(frames=3)
+
+    prepared = rasterize(tiff, OPTIONS)
+
+    assert prepared.pages == [0, 2]
+    with Image.open(io.BytesIO(prepared.images[0])) as image:
+        assert image.size == (413, 585)  # 600 → 100 DPI
+    assert prepared.sent_bytes < len(tiff) / 20
+
+
+def _small_png() -> bytes:
+    out = io.BytesIO()
+    Image.new("L", (40, 20), 255).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_prepare_keeps_image_uploads_when_renderings_are_not_smaller() -> None:
+    assert await ocr_preprocess.prepare_for_vision(_small_png()) is None
+
+
+@pytest.mark.asyncio
+async def test_pdfs_are_always_sent_as_renderings() -> None:
+    """The vision model takes no raw PDFs: a tiny PDF is rendered even if that is larger."""
+    tiny_pdf = make_pdf([["Invoice No: 1"]])
+
+    prepared = await ocr_preprocess.prepare_for_vision(tiny_pdf)
+
+    assert prepared is not None
+    assert prepared.pages == [0]
+    assert prepared.sent_bytes > len(tiny_pdf)
+
+
+@pytest.mark.asyncio
+async def test_prepare_falls_back_on_unreadable_files(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert await ocr_preprocess.prepare_for_vision(b"%PDF-1.4 truncated") is None
+    monkeypatch.setattr(settings, "OCR_RASTER_ENABLED", False)
+    assert await ocr_preprocess.prepare_for_vision(_small_png()) is None
+    # A TIFF cannot be sent as is, so it is rendered even with rasterising off.
+    assert await ocr_preprocess.prepare_for_vision(_scanned_tiff(frames=1)) is not None
+
+
+@pytest.mark.asyncio
+async def test_rendering_runs_in_the_process_pool() -> None:
+    executor.start_process_pool(1)
+    try:
+        prepared = await ocr_preprocess.prepare_for_vision(_scanned_tiff(frames=2))
+    finally:
+        executor.shutdown_process_pool()
+
+    assert prepared is not None
+    assert prepared.pages == [0, 1]
+    assert prepared.sent_bytes < prepared.original_bytes
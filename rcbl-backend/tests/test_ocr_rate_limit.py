@@ -0,0 +1,133 @@
+"""Unit tests for the shared OCR provider rate limiter.
+
+The Redis token buckets run on the in-process FakeRedis (Python ports of the
+limiter's Lua scripts in conftest), so no Redis server is needed.
+"""
+
+import time
+
+import httpx
+import pytest
+
+from src.clients import ocr_rate_limit
+from src.clients.ocr_rate_limit import OCRRateLimited
+from src.config import settings
+
+
+@pytest.fixture
+def limiter(fake_redis, monkeypatch: pytest.MonkeyPatch):
+    """Bind the limiter to FakeRedis with a small RPM and no real waiting."""
+    monkeypatch.setattr(settings, "OCR_RATE_LIMIT_RPM", 3)
+    monkeypatch.setattr(settings, "OCR_RATE_LIMIT_TPM", 30_000)
+    monkeypatch.setattr(settings, "OCR_ESTIMATED_TOKENS_PER_REQUEST", 2_000)
+    monkeypatch.setattr(settings, "OCR_RATE_LIMIT_MAX_WAIT_SECONDS", 0.5)
+    ocr_rate_limit.bind_redis(fake_redis)
+    yield fake_redis
+    ocr_rate_limit.bind_redis(None)
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [
+        ("20ms", 0.02),
+        ("1s", 1.0),
+        ("6m0s", 360.0),
+        ("1h2m3.5s", 3723.5),
+        ("soon", None),
+        ("", None),
+    ],
+)
+def test_parse_duration(value: str, seconds: float | None) -> None:
+    assert ocr_rate_limit.parse_duration(value) == seconds
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_a_noop_without_redis() -> None:
+    ocr_rate_limit.bind_redis(None)
+    for _ in range(100):
+        await ocr_rate_limit.acquire()
+
+
+@pytest.mark.asyncio
+async def test_acquire_defers_once_the_request_budget_is_spent(limiter) -> None:
+    for _ in range(3):
+        await ocr_rate_limit.acquire()
+
+    with pytest.raises(OCRRateLimited) as exc:
+        await ocr_rate_limit.acquire()
+    assert 19 < exc.value.retry_after <= 20  # one request refills every 20s at 3 RPM
+
+
+@pytest.mark.asyncio
+async def test_capacity_check_takes_nothing(limiter) -> None:
+    for _ in range(5):
+        await ocr_rate_limit.wait_for_capacity()
+    for _ in range(3):
+        await ocr_rate_limit.acquire()
+
+    with pytest.raises(OCRRateLimited) as exc:
+        await ocr_rate_limit.wait_for_capacity()
+    assert exc.value.reason == "limiter"
+
+
+@pytest.mark.asyncio
+async def test_acquire_charges_estimated_tokens(limiter, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "OCR_RATE_LIMIT_RPM", 1_000)
+    for _ in range(15):  # 15 x 2000 tokens = the whole 30k TPM bucket
+        await ocr_rate_limit.acquire()
+
+    with pytest.raises(OCRRateLimited):
+        await ocr_rate_limit.acquire()
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_short_refill(limiter, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "OCR_RATE_LIMIT_RPM", 6_000)  # one request per 10ms
+    limiter.hashes[ocr_rate_limit.RPM_KEY] = (0, int(time.time() * 1000))
+
+    start = time.monotonic()
+    await ocr_rate_limit.acquire()
+    assert time.monotonic() - start >= 0.005
+
+
+@pytest.mark.asyncio
+async def test_provider_429_pauses_every_caller(limiter) -> None:
+    response = httpx.Response(429, headers={"retry-after": "30"})
+
+    await ocr_rate_limit.observe(response)
+
+    assert ocr_rate_limit.retry_after(response) == 30
+    with pytest.raises(OCRRateLimited) as exc:
+        await ocr_rate_limit.acquire()
+    assert 29 < exc.value.retry_after <= 30
+
+
+@pytest.mark.asyncio
+async def test_exhausted_token_headers_pause_until_reset(limiter) -> None:
+    response = httpx.Response(
+        200,
+        headers={
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-remaining-tokens": "1200",
+            "x-ratelimit-reset-tokens": "6m0s",
+        },
+    )
+
+    await ocr_rate_limit.observe(response)
+
+    with pytest.raises(OCRRateLimited) as exc:
+        await ocr_rate_limit.acquire()
+    assert 359 < exc.value.retry_after <= 360
+
+
+@pytest.mark.asyncio
+async def test_healthy_headers_do_not_pause(limiter) -> None:
+    response = httpx.Response(
+        200,
+        headers={"x-ratelimit-remaining-requests": "499", "x-ratelimit-remaining-tokens": "29000"},
+    )
+
+    await ocr_rate_limit.observe(response)
+
+    assert ocr_rate_limit.PAUSE_KEY not in limiter.values
+    await ocr_rate_limit.acquire()
@@ -0,0 +1,42 @@
+"""Unit tests for the arq job helpers shared by the fair queue (src/core/queue.py)."""
+
+import uuid
+
+import pytest
+from arq.jobs import deserialize_job
+
+from src.core.queue import job_id, serialize_jobs
+from tests.conftest import make_mock_arq_pool
+
+
+def test_job_id_is_derived_from_the_item() -> None:
+    item_id = uuid.uuid4()
+
+    assert job_id("process_ocr", item_id) == f"process_ocr:{item_id}"
+    assert job_id("process_ocr", item_id) == job_id("process_ocr", str(item_id))
+
+
+def test_serialize_jobs_pairs_ids_with_arq_payloads() -> None:
+    pool = make_mock_arq_pool()
+    derived = [job_id("process_ocr", "item-1"), job_id("process_ocr", "item-2")]
+
+    ids, pairs = serialize_jobs(
+        pool, "process_ocr", [("item-1", "co-1"), ("item-2", "co-1")], derived, 1_000
+    )
+
+    assert ids == derived
+    assert pairs[0::2] == derived
+    job = deserialize_job(pairs[1])
+    assert job.function == "process_ocr"
+    assert job.args == ("item-1", "co-1")
+    assert job.enqueue_time.timestamp() == 1.0
+
+
+def test_serialize_jobs_generates_missing_ids() -> None:
+    ids, pairs = serialize_jobs(make_mock_arq_pool(), "process_ocr", [("a",), ("b",)], None, 0)
+
+    assert len(set(ids)) == 2
+    assert pairs[0::2] == ids
+
+    with pytest.raises(ValueError, match="same length"):
+        serialize_jobs(make_mock_arq_pool(), "process_ocr", [("a",), ("b",)], ids[:1], 0)
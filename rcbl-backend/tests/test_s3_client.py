@@ -0,0 +1,134 @@
+"""Unit tests for the S3 client wrapper.
+
+The aioboto3 client is replaced with an AsyncMock via patching `_s3_resource`,
+so no MinIO/S3 is needed.
+"""
+
+import io
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.clients import s3_client
+
+
+class _AsyncBytesReader:
+    """Minimal async reader over in-memory bytes (mimics UploadFile.read)."""
+
+    def __init__(self, data: bytes, fail_after: int | None = None) -> None:
+        self._buf = io.BytesIO(data)
+        self._reads = 0
+        self._fail_after = fail_after
+
+    async def read(self, size: int = -1) -> bytes:
+        self._reads += 1
+        if self._fail_after is not None and self._reads > self._fail_after:
+            raise OSError("client disconnected")
+        return self._buf.read(size)
+
+
+def _patched_client(mock_s3: AsyncMock):
+    @asynccontextmanager
+    async def _resource():
+        yield mock_s3
+
+    return patch("src.clients.s3_client._s3_resource", _resource)
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_small_file_uses_single_put() -> None:
+    mock_s3 = AsyncMock()
+    with _patched_client(mock_s3):
+        size = await s3_client.upload_stream(_AsyncBytesReader(b"%PDF-1.4 small"), "k.pdf")
+
+    assert size == len(b"%PDF-1.4 small")
+    mock_s3.put_object.assert_awaited_once()
+    mock_s3.create_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_large_file_uses_multipart(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(s3_client.settings, "S3_MULTIPART_PART_SIZE_BYTES", 4)
+    mock_s3 = AsyncMock()
+    mock_s3.create_multipart_upload.return_value = {"UploadId": "u-1"}
+    mock_s3.upload_part.side_effect = [{"ETag": f"e{i}"} for i in range(1, 4)]
+
+    with _patched_client(mock_s3):
+        size = await s3_client.upload_stream(_AsyncBytesReader(b"0123456789"), "k.pdf")
+
+    assert size == 10
+    assert [c.kwargs["Body"] for c in mock_s3.upload_part.call_args_list] == [
+        b"0123",
+        b"4567",
+        b"89",
+    ]
+    parts = mock_s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+    assert [p["PartNumber"] for p in parts] == [1, 2, 3]
+    mock_s3.put_object.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_multipart_on_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(s3_client.settings, "S3_MULTIPART_PART_SIZE_BYTES", 4)
+    mock_s3 = AsyncMock()
+    mock_s3.create_multipart_upload.return_value = {"UploadId": "u-1"}
+    mock_s3.upload_part.return_value = {"ETag": "e"}
+
+    with _patched_client(mock_s3), pytest.raises(OSError, match="disconnected"):
+        await s3_client.upload_stream(_AsyncBytesReader(b"0123456789", fail_after=1), "k.pdf")
+
+    mock_s3.abort_multipart_upload.assert_awaited_once()
+    mock_s3.complete_multipart_upload.assert_not_called()
+
+
+# ── Shared client lifecycle ─────────────────────────────────────────────────────
+
+
+class _CountingOpener:
+    """Stands in for `_open_client`, counting how many clients get created."""
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+
+    def __call__(self):
+        opener = self
+
+        @asynccontextmanager
+        async def _client():
+            opener.opened += 1
+            try:
+                yield AsyncMock()
+            finally:
+                opener.closed += 1
+
+        return _client()
+
+
+@pytest.mark.asyncio
+async def test_operations_reuse_the_started_client() -> None:
+    opener = _CountingOpener()
+    with patch("src.clients.s3_client._open_client", opener):
+        await s3_client.start_client()
+        try:
+            await s3_client.start_client()  # idempotent
+            await s3_client.head_bucket("rcbl-invoices")
+            await s3_client.get_presigned_url("k.pdf")
+            await s3_client.delete_object("k.pdf")
+            assert opener.opened == 1
+        finally:
+            await s3_client.close_client()
+
+    assert opener.closed == 1
+    assert s3_client._client is None
+
+
+@pytest.mark.asyncio
+async def test_operations_without_started_client_open_one_per_call() -> None:
+    opener = _CountingOpener()
+    with patch("src.clients.s3_client._open_client", opener):
+        await s3_client.head_bucket("rcbl-invoices")
+        await s3_client.head_bucket("rcbl-invoices")
+
+    assert opener.opened == opener.closed == 2
@@ -0,0 +1,162 @@
+"""Tests for multi-invoice PDF splitting.
+
+PDFs are generated in-test (tests.conftest.make_pdf); S3 uploads are patched,
+the child items are written to the test database.
+"""
+
+import io
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pypdf import PdfReader
+
+from src.modules.invoices import repository, splitting
+from src.modules.invoices.models import BatchUploadType, ItemStatus, UploadBatch, UploadItem
+from src.modules.invoices.splitting import find_invoice_boundaries, plan_split
+from tests.conftest import make_pdf
+
+
+def _invoice_page(number: str, *extra: str) -> list[str]:
+    return ["ACME GmbH", f"Invoice No: {number}", "Invoice Date: 01.06.2024", *extra]
+
+
+# ── Boundary detection ──────────────────────────────────────────────────────────
+
+
+def test_boundaries_split_on_new_invoice_number() -> None:
+    pages = [
+        "Invoice No: INV-1\nTotal 10,00 EUR",
+        "Invoice No: INV-2\nItems ...",
+        "continued\nTotal 20,00 EUR",  # no number: belongs to INV-2
+        "Invoice No: INV-2\nTerms",  # same number: still INV-2
+        "Invoice No: INV-3\nTotal 30,00 EUR",
+    ]
+    assert find_invoice_boundaries(pages) == [(0, 1), (1, 4), (4, 5)]
+
+
+def test_boundaries_split_on_page_one_marker() -> None:
+    pages = ["Page 1 of 2\nStatement", "Page 2 of 2", "Seite 1 von 1\nGutschrift"]
+    assert find_invoice_boundaries(pages) == [(0, 2), (2, 3)]
+
+
+def test_boundaries_single_invoice() -> None:
+    pages = ["Invoice No: INV-9\nItems", "Invoice No: INV-9\nTotal 99,00 EUR"]
+    assert find_invoice_boundaries(pages) == [(0, 2)]
+    assert find_invoice_boundaries([]) == []
+
+
+# ── Page extraction ─────────────────────────────────────────────────────────────
+
+
+def test_plan_split_cuts_one_pdf_per_invoice() -> None:
+    pdf = make_pdf(
+        [
+            _invoice_page("INV-1", "Total 10,00 EUR"),
+            _invoice_page("INV-2"),
+            ["Total 20,00 EUR continued from previous page"],
+            _invoice_page("INV-3", "Total 30,00 EUR"),
+        ]
+    )
+
+    plan = plan_split(pdf, max_pages=500)
+
+    assert plan.outcome == "split"
+    assert plan.page_count == 4
+    assert plan.segments == [(0, 1), (1, 3), (3, 4)]
+    page_counts = [len(PdfReader(io.BytesIO(doc)).pages) for doc in plan.documents]
+    assert page_counts == [1, 2, 1]
+    assert "INV-3" in PdfReader(io.BytesIO(plan.documents[2])).pages[0].extract_text()
+
+
+def test_plan_split_keeps_single_invoices_scans_and_long_documents_whole() -> None:
+    single = make_pdf([_invoice_page("INV-1"), ["Total 10,00 EUR"]])
+    assert plan_split(single, max_pages=500).outcome == "single"
+    assert plan_split(make_pdf([_invoice_page("INV-1")]), max_pages=500).outcome == "single"
+    assert plan_split(make_pdf([[""], [""]]), max_pages=500).outcome == "no_text"
+
+    many = make_pdf([_invoice_page(f"INV-{n}") for n in range(1, 4)])
+    plan = plan_split(many, max_pages=2)
+    assert plan.outcome == "too_long"
+    assert plan.documents == []
+
+
+# ── split_item ──────────────────────────────────────────────────────────────────
+
+
+async def _batch_with_item(db_session) -> tuple[UploadBatch, UploadItem]:
+    from src.modules.auth.models import Company, User
+
+    unique = uuid.uuid4().hex[:8]
+    company = Company(
+        id=uuid.uuid4(), name="Split Co", slug=f"split-{unique}", email=f"co-{unique}@split.test"
+    )
+    user = User(
+        id=uuid.uuid4(),
+        company_id=company.id,
+        email=f"user-{unique}@split.test",
+        password_hash="x",
+        name="Split User",
+    )
+    db_session.add_all([company, user])
+    await db_session.flush()
+    batch = await repository.create_batch(
+        db_session, company.id, user.id, BatchUploadType.single, total_files=1
+    )
+    item = await repository.create_item(
+        db_session,
+        batch.id,
+        company.id,
+        file_name="june.pdf",
+        file_url=f"invoices/{company.id}/x/june.pdf",
+        file_hash=None,
+        file_size_bytes=None,
+    )
+    await db_session.commit()
+    return batch, item
+
+
+@pytest.mark.asyncio
+async def test_split_item_creates_children_and_grows_batch(db_session) -> None:
+    batch, item = await _batch_with_item(db_session)
+    pdf = make_pdf([_invoice_page(f"INV-{n}", f"Total {n}0,00 EUR") for n in range(1, 4)])
+    upload_file = AsyncMock()
+
+    with patch("src.clients.s3_client.upload_file", upload_file):
+        child_ids, updated = await splitting.split_item(db_session, item, pdf)
+    await db_session.commit()
+
+    assert len(child_ids) == 3
+    assert updated.total_files == 3
+    assert upload_file.await_count == 3
+    children = [await repository.get_item_by_id(db_session, child_id) for child_id in child_ids]
+    assert [child.file_name for child in children] == [
+        "june (page 1).pdf",
+        "june (page 2).pdf",
+        "june (page 3).pdf",
+    ]
+    assert {child.parent_item_id for child in children} == {item.id}
+    assert {child.batch_id for child in children} == {batch.id}
+    assert {child.status for child in children} == {ItemStatus.queued.value}
+    assert all(len(child.file_hash) == 64 for child in children)
+    assert sorted(await repository.list_child_item_ids(db_session, item.id)) == sorted(child_ids)
+
+    await db_session.refresh(item)
+    assert item.status == ItemStatus.split_parent.value
+
+    # Child IDs depend only on the parent and page range, so a retried split is idempotent.
+    assert child_ids[0] == uuid.uuid5(item.id, "pages:0-1")
+
+
+@pytest.mark.asyncio
+async def test_split_item_skips_single_invoices_and_children(db_session) -> None:
+    _, item = await _batch_with_item(db_session)
+    single = make_pdf([_invoice_page("INV-1"), ["Total 10,00 EUR"]])
+    two = make_pdf([_invoice_page("INV-1"), _invoice_page("INV-2")])
+
+    with patch("src.clients.s3_client.upload_file", AsyncMock()) as upload_file:
+        assert await splitting.split_item(db_session, item, single) is None
+        assert await splitting.split_item(db_session, item, b"\x89PNG...") is None
+        item.parent_item_id = uuid.uuid4()
+        assert await splitting.split_item(db_session, item, two) is None
+    upload_file.assert_not_awaited()
@@ -0,0 +1,142 @@
+"""Tests for the PDF text-layer fast path and its deterministic field extractor.
+
+PDFs are generated in-test (tests.conftest.make_pdf), so no fixtures on disk
+are needed.
+"""
+
+import json
+
+import pytest
+
+from src.config import settings
+from src.modules.invoices import text_layer
+from src.modules.invoices.text_layer import parse_amount, parse_invoice_fields
+from tests.conftest import make_pdf
+
+GERMAN_INVOICE = """\
+ACME GmbH
+Musterstrasse 1, Berlin
+INVOICE
+Invoice No: INV-2024-0042
+Invoice Date: 01.06.2024
+Due Date: 30.06.2024
+Subtotal 1.000,00 EUR
+VAT 19% 190,00 EUR
+Total 1.190,00 EUR
+"""
+
+US_INVOICE = """\
+Globex Corp
+Invoice # 99817
+Date: June 3, 2024
+Payment terms: Net 30
+Sub total $2,400.00
+Tax $192.00
+Amount due $2,592.00
+"""
+
+
+# ── Field extraction ────────────────────────────────────────────────────────────
+
+
+def test_labelled_european_invoice() -> None:
+    fields = parse_invoice_fields(GERMAN_INVOICE)
+
+    assert fields == {
+        "invoice_number": "INV-2024-0042",
+        "amount": "1190.00",  # the total, not the subtotal or the VAT line
+        "currency": "EUR",
+        "invoice_date": "2024-06-01",
+        "due_date": "2024-06-30",
+        "confidence": 0.95,
+    }
+
+
+def test_due_date_from_payment_terms() -> None:
+    fields = parse_invoice_fields(US_INVOICE)
+
+    assert fields["invoice_number"] == "99817"
+    assert fields["amount"] == "2592.00"
+    assert fields["currency"] == "USD"
+    assert fields["due_date"] == "2024-07-03"
+    # A due date computed from the terms is not trusted without the vision model.
+    assert fields["confidence"] == 0.8
+    assert fields["confidence"] < settings.OCR_TEXT_LAYER_MIN_CONFIDENCE
+
+
+def test_bare_due_label() -> None:
+    text = "Invoice No: INV-9\nInvoice date: 2024-06-01\nDue 2024-06-30\nTotal 10.00 EUR"
+
+    fields = parse_invoice_fields(text)
+
+    assert fields["due_date"] == "2024-06-30"
+    assert fields["confidence"] == 0.95
+
+
+def test_payable_total_outranks_other_totals() -> None:
+    text = (
+        "Invoice No: INV-10\nInvoice date: 2024-06-01\nDue date: 2024-06-30\n"
+        "Total weight 2500 kg\nTotal 1,100.00\nTotal due $1,234.56\n"
+    )
+
+    fields = parse_invoice_fields(text)
+
+    assert (fields["amount"], fields["currency"]) == ("1234.56", "USD")
+
+
+def test_invoice_number_skips_date_shaped_tokens() -> None:
+    text = "Invoice 2024-06-01\nInvoice No: INV-77\nDue date: 2024-06-30\nTotal 10.00 EUR"
+
+    assert text_layer.find_invoice_number(text) == "INV-77"
+    assert parse_invoice_fields(text)["invoice_number"] == "INV-77"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Invoice 77\nIssued 2024-05-01\nTotal 99\n",  # no due date or terms
+        "Invoice No: 5\nInvoice date: 2024-06-30\nDue date: 2024-06-01\nTotal 10.00",
+        "Quote\nDate: 2024-06-01\nDue date: 2024-06-30\nTotal 10.00",  # no invoice number
+        # the only "number" after the label is a date
+        "Invoice 2024-06-01\nDue date: 2024-06-30\nTotal 10.00 EUR",
+        "Rechnung 01.06.2024\nDue date: 30.06.2024\nTotal 10,00 EUR",
+        # payable totals that disagree, and a bare total that is no money amount
+        "Invoice No: 5\nDate: 2024-06-01\nDue: 2024-06-30\nAmount due $10.00\nBalance due $9.00",
+        "Invoice No: 5\nDate: 2024-06-01\nDue: 2024-06-30\nTotal weight 2500 kg",
+    ],
+)
+def test_incomplete_or_inconsistent_text_escalates(text: str) -> None:
+    assert parse_invoice_fields(text) is None
+
+
+@pytest.mark.parametrize(
+    ("raw", "amount"),
+    [("1,234.56", "1234.56"), ("1.234,56", "1234.56"), ("1 234,56", "1234.56"), ("1,234", "1234")],
+)
+def test_parse_amount_formats(raw: str, amount: str) -> None:
+    assert str(parse_amount(raw)) == amount
+
+
+# ── PDF text layer ──────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_digital_pdf_is_read_without_the_vision_model() -> None:
+    result = await text_layer.extract_invoice(make_pdf([GERMAN_INVOICE.splitlines()]))
+
+    assert result is not None
+    assert result.invoice_number == "INV-2024-0042"
+    assert result.amount == 1190.0
+    assert result.confidence == 0.95
+    assert json.loads(result.raw_text)["source"] == "text_layer"
+
+
+@pytest.mark.asyncio
+async def test_pdf_without_text_layer_escalates() -> None:
+    assert await text_layer.extract_invoice(make_pdf([[]])) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_bytes", [b"\x89PNG\r\n\x1a\n", b"%PDF-1.4 truncated"])
+async def test_non_pdf_and_broken_files_escalate(file_bytes: bytes) -> None:
+    assert await text_layer.extract_invoice(file_bytes) is None
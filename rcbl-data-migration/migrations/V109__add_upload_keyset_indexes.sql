@@ -0,0 +1,16 @@
+-- Keyset (cursor) pagination indexes for upload batch and item listings.
+-- GET /api/invoices/upload/batches pages with
+--   WHERE company_id = ? AND (created_at, id) after the cursor
+--   ORDER BY created_at DESC, id
+-- and GET /api/invoices/upload/batches/{id}/items with
+--   WHERE batch_id = ? ... ORDER BY created_at, id
+-- so each page is an index range scan instead of an OFFSET scan-and-discard.
+--
+-- CONCURRENTLY avoids blocking uploads while the indexes build; Flyway runs
+-- these statements outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoice_upload_batches_company_created
+    ON invoice_upload_batches(company_id, created_at DESC, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoice_upload_items_batch_created
+    ON invoice_upload_items(batch_id, created_at, id);
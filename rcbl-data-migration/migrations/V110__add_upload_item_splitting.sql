@@ -0,0 +1,23 @@
+-- Multi-invoice PDF splitting.
+-- A PDF holding several invoices is split by the OCR worker into one child
+-- upload item per invoice, in the same batch. The original item keeps the
+-- uploaded file and moves to the new terminal status 'split'; each child
+-- references it through parent_item_id and is processed as its own OCR job.
+--
+-- Children are removed together with their parent.
+
+ALTER TABLE invoice_upload_items
+    ADD COLUMN IF NOT EXISTS parent_item_id UUID
+        REFERENCES invoice_upload_items(id) ON DELETE CASCADE;
+
+ALTER TABLE invoice_upload_items
+    DROP CONSTRAINT IF EXISTS invoice_upload_items_status_check;
+
+ALTER TABLE invoice_upload_items
+    ADD CONSTRAINT invoice_upload_items_status_check
+        CHECK (status IN ('queued', 'processing', 'ready', 'review_pending', 'accepted', 'rejected', 'failed', 'split'));
+
+-- Lookup of a split item's children (retries re-enqueue the ones still queued).
+CREATE INDEX IF NOT EXISTS idx_invoice_upload_items_parent
+    ON invoice_upload_items(parent_item_id)
+    WHERE parent_item_id IS NOT NULL;